@@ -13,8 +13,12 @@ import enemies
 import images
 import fonts
 import colors
+import dirty
+import layout
 
 import items
+import scheduler
+import occupancy
 
 # 行動ゲージがたまるまでにかかるフレーム
 def action_time(itg):
@@ -84,115 +88,100 @@ def player_action(player, enemy, item, select_player, press_button, picked_item,
             items.use(item[picked_item], player, enemy, select_player, press_button, health_disp, mana_disp)
 
 
-    # チャージ中の処理
-    player_charge(player, enemy, health_disp)
+# 敵のこうどう
+# planner があればプランナーで選び、選べなければ重みつきの抽選
+def enemy_action(player, enemy, health_disp, planner=None):
 
+    for i in range(len(enemy)):
 
-# チャージ中の処理
-def player_charge(player, enemy, health_disp):
+        # 敵の攻撃
+        if enemy[i].action >= 1000 and enemy[i].alive == True:
 
-    for i in range(len(player)):
+            before = len(enemy[i].attack)
 
-        # チャージ中の行動を消化
-        if player[i].charging == True and player[i].action >= 1000:
+            # こうどうを選ぶ
+            if planner is None or planner.choose(player, enemy, i) == False:
+                enemy[i].action_path.action_choice(enemy, i)
 
-            #print("charging", player[i].left_time)
+            # 攻撃のキューに増えた分を予定表に登録
+            schedule_enemy_attack(player, enemy[i], enemy[i].attack[before:], health_disp)
 
-            # 残りチャージ時間を減少
-            if player[i].left_time > 0:
 
-                player[i].left_time -= 1/lm.fps
+# 敵の攻撃を予定表に登録
+# 表示までの時間がたったら表示し、予備動作時間がたったら発動する
+# 予備動作時間が同じマスはまとめて１回で発動する
+def schedule_enemy_attack(player, enemy, points, health_disp):
 
-            else:
+    # 予備動作時間ごとにまとめる
+    volleys = {}
 
-                # こうげき
-                attack.player_attack(player, enemy, i, player[i].charge_command, health_disp)
+    for point in points:
 
-                # まほう
-                magic.player_attack(player, enemy, i, player[i].charge_command, health_disp)
+        if point.until_disp > 0:
+            scheduler.add(point.until_disp, reveal_enemy_attack, point)
 
+        volleys.setdefault(point.preliminary, []).append(point)
 
-# 敵のこうどう
-def enemy_action(player, enemy, health_disp):
+    for preliminary in volleys:
+        scheduler.add(preliminary, fire_enemy_attack, player, enemy, volleys[preliminary], occupancy.mask(volleys[preliminary]), health_disp)
 
-    for i in range(len(enemy)):
 
-        # 敵の攻撃
-        if enemy[i].action >= 1000 and enemy[i].alive == True:
-            
-            # こうどうを選ぶ
-            enemy[i].action_path.action_choice(enemy, i)
+# 攻撃予定を表示する
+def reveal_enemy_attack(point):
+    point.until_disp = 0
 
 
-        # 削除するやつを一時的に保持
-        pop_temp = []
+# 敵の攻撃を発動する
+# mask は攻撃するマスのビットをまとめたもの
+def fire_enemy_attack(player, enemy, points, mask, health_disp):
 
-        # 攻撃のキューを消化
-        for j in range(len(enemy[i].attack)):
+    # 敵の死亡で攻撃のキューが消えていたら何もしない
+    if enemy.alive == False:
+        return
 
-            
-            # 表示までの時間を消化
-            if enemy[i].attack[j].until_disp > 0:
-                enemy[i].attack[j].until_disp -= 1/lm.fps
+    # プレイヤーのいるマスに当たる攻撃
+    hits = mask & occupancy.current.occupied()
 
-            else:
-                
-                # 技名を表示
-                # 後で修正
-                if enemy[i].category == "boss":
-                    img_temp = pygame.transform.scale(images.img_enemy_thought_right, [(36+24*len(enemy[i].attack[j].name))*lm.resol[0]/1920, 64*lm.resol[1]/1080]).get_rect()
-                    img_temp.topleft = [700*lm.resol[0]/1920, 104*lm.resol[1]/1080]
-                    lm.screen.blit(pygame.transform.scale(images.img_enemy_thought_right, [(36+24*len(enemy[i].attack[j].name))*lm.resol[0]/1920, 64*lm.resol[1]/1080]), img_temp)
-
-                    action_txt = fonts.action_font.render(enemy[i].attack[j].name, True, colors.BLACK)
-                    action_place = action_txt.get_rect(center=((700+(36+24*len(enemy[i].attack[j].name))/2)*lm.resol[0]/1920, (118+12)*lm.resol[1]/1080))
-                    lm.screen.blit(action_txt, action_place)
-                
-                if enemy[i].category == "left":
-                    img_temp = pygame.transform.scale(images.img_enemy_thought, [(36+24*len(enemy[i].attack[j].name))*lm.resol[0]/1920, 64*lm.resol[1]/1080]).get_rect()
-                    img_temp.topright = [260*lm.resol[0]/1920, 104*lm.resol[1]/1080]
-                    lm.screen.blit(pygame.transform.scale(images.img_enemy_thought, [(36+24*len(enemy[i].attack[j].name))*lm.resol[0]/1920, 64*lm.resol[1]/1080]), img_temp)
-
-                    action_txt = fonts.action_font.render(enemy[i].attack[j].name, True, colors.BLACK)
-                    action_place = action_txt.get_rect(center=((260-(36+24*len(enemy[i].attack[j].name))/2)*lm.resol[0]/1920, (118+12)*lm.resol[1]/1080))
-                    lm.screen.blit(action_txt, action_place)
-
-                if enemy[i].category == "right":
-                    img_temp = pygame.transform.scale(images.img_enemy_thought_right, [(36+24*len(enemy[i].attack[j].name))*lm.resol[0]/1920, 64*lm.resol[1]/1080]).get_rect()
-                    img_temp.topleft = [700*lm.resol[0]/1920, 104*lm.resol[1]/1080]
-                    lm.screen.blit(pygame.transform.scale(images.img_enemy_thought_right, [(36+24*len(enemy[i].attack[j].name))*lm.resol[0]/1920, 64*lm.resol[1]/1080]), img_temp)
-
-                    action_txt = fonts.action_font.render(enemy[i].attack[j].name, True, colors.BLACK)
-                    action_place = action_txt.get_rect(center=((700+(36+24*len(enemy[i].attack[j].name))/2)*lm.resol[0]/1920, (118+12)*lm.resol[1]/1080))
-                    lm.screen.blit(action_txt, action_place)
+    if hits != 0:
 
+        for point in points:
 
-                # 攻撃エリアを表示
-                lm.screen.blit(pygame.transform.scale(pygame.image.load("./data_list/images/system/caution.png"), [96*lm.resol[0]/1920, 96*lm.resol[1]/1080]), [(264+enemy[i].attack[j].x*(96+16))*lm.resol[0]/1920, (552+enemy[i].attack[j].y*(96+16))*lm.resol[1]/1080])
-            
-            # 予備動作時間を減らす
-            enemy[i].attack[j].preliminary -= 1/lm.fps
-            
-            # 予備動作時間が終わったら
-            if enemy[i].attack[j].preliminary <= 0:
+            if occupancy.bit(point.x, point.y) & hits != 0:
 
                 # こうげき
-                if enemy[i].attack[j].category == 'attack':
-                    attack.enemy_attack(player, enemy[i], j, health_disp)
+                if point.category == 'attack':
+                    attack.enemy_attack(player, enemy, point, health_disp)
 
                 # ぼうぎょ
-                if enemy[i].attack[j].category == 'defense':
+                if point.category == 'defense':
                     print("defense")
 
                 # まほう
-                if enemy[i].attack[j].category == 'magic':
-                    magic.enemy_attack(player, enemy[i], j, health_disp)
-               
+                if point.category == 'magic':
+                    magic.enemy_attack(player, enemy, point, health_disp)
 
-                pop_temp.append(j)
+    # 攻撃が終わったら削除
+    done = set(id(point) for point in points)
+    enemy.attack = [a for a in enemy.attack if id(a) not in done]
+
+
+# 敵のこうどうを表示
+def disp_enemy_action(enemy):
+
+    for i in range(len(enemy)):
+
+        for j in range(len(enemy[i].attack)):
+
+            # 表示までの時間が過ぎたもの
+            if enemy[i].attack[j].until_disp <= 0:
+
+                # 技名を表示
+                # 後で修正
+                enemies.disp_bubble(enemy[i].category, enemy[i].attack[j].name, 104, fonts.action_font, ('action', i, j))
+
+                # 攻撃エリアを表示
+                cell = layout.get().cells[enemy[i].attack[j].y][enemy[i].attack[j].x]
+                lm.screen.blit(images.scale(images.img_caution, cell.size), cell)
 
-        # 後ろから削除するために逆順にする（インデックスエラーを起こさないために）
-        pop_temp.sort(reverse=True) 
-        # 攻撃が終わった奴は削除
-        for j in pop_temp:
-            enemy[i].attack.pop(j)
\ No newline at end of file
+                # 差分描画に報告
+                dirty.mark(('caution', i, j), cell, None)
@@ -0,0 +1,81 @@
+import pygame
+
+
+# テクスチャアトラス
+# 小さい画像をまとめて大きい画像（シート）に詰めて、名前ごとに部分画像（subsurface）を渡す
+# 描画元の画像がまとまるので、毎フレームのブリットが同じ画像を読むようになる
+
+# シートの横幅
+ATLAS_WIDTH = 1024
+
+# 画像どうしのすき間（拡大縮小でとなりの画像がにじまないように）
+PADDING = 1
+
+# 作ったシート
+# キーはグループの名前（PRELOAD のパターンの頭）
+sheets = {}
+
+
+# 画像を詰める位置を決める（棚詰め）
+# 高い順に左から並べて、横幅を超えたら次の段へ
+# 戻り値は（位置の辞書, シートの横幅, シートの縦幅）
+def place(imgs):
+
+    # 全部が１段に並ぶならその幅、ただし一番横長の画像は必ず入る幅にしておく
+    width = min(ATLAS_WIDTH, sum([img.get_width() + PADDING for img in imgs.values()]))
+    width = max([width] + [img.get_width() + PADDING for img in imgs.values()])
+
+    places = {}
+    x = 0
+    y = 0
+    shelf_height = 0
+
+    for name in sorted(imgs, key=lambda n: (-imgs[n].get_height(), -imgs[n].get_width(), n)):
+
+        img = imgs[name]
+
+        # 横幅を超えたら次の段
+        if x + img.get_width() > width:
+            x = 0
+            y += shelf_height + PADDING
+            shelf_height = 0
+
+        places[name] = [x, y]
+
+        x += img.get_width() + PADDING
+        shelf_height = max(shelf_height, img.get_height())
+
+    return places, width, y + shelf_height
+
+
+# 画像をシートにまとめる
+# imgs は {名前: 画像}、戻り値は {名前: シートの部分画像}
+def build(group, imgs):
+
+    if not imgs:
+        return {}
+
+    places, width, height = place(imgs)
+
+    # 透明な画像として作る（不透明な画像も不透明のまま入る）
+    sheet = pygame.Surface([width, height], pygame.SRCALPHA).convert_alpha()
+    sheet.fill((0, 0, 0, 0))
+
+    subs = {}
+
+    for name in imgs:
+
+        # 透明度ごとそのまま写す（透明なシートとの最大値＝元の画素）
+        sheet.blit(imgs[name], places[name], special_flags=pygame.BLEND_RGBA_MAX)
+
+        subs[name] = sheet.subsurface([places[name], imgs[name].get_size()])
+
+    sheets[group] = sheet
+
+    return subs
+
+
+# シートを削除
+def clear():
+
+    sheets.clear()
@@ -1,11 +1,16 @@
-import random
+import rng
 import math
 import pygame
 
 import fonts
 import colors
+import dirty
+import combat_text
 import lattitle_main as lm
 import element
+import effects
+import scheduler
+import occupancy
 
 # 位置によるダメージの調整
 # 最前列なら２倍、最後列なら０．５倍
@@ -25,39 +30,6 @@ def enemy_guard_adjustment(point):
 
 ### インデックスをドットに変える！！！ 　例：[0] -> .category
 
-# HPの変動を表示
-def disp_health_fluct(health_disp):
-    health_temp = []
-
-    # HPの変動を表示
-    for i in range(len(health_disp)):
-        # （ボスで表示サイズ変える？）
-        #if enemy[0].category == "boss":
-
-        if type(health_disp[i][0]) is str:
-
-            lm.screen.blit(fonts.damage_font.render(str(health_disp[i][0]), True, colors.RED), [health_disp[i][2], health_disp[i][3]+10*(health_disp[i][1])*math.sin(10*math.pi*(1-health_disp[i][1]))])
-
-        else:
-            # 正なら回復
-            if health_disp[i][0] > 0:
-                lm.screen.blit(fonts.damage_font.render(str(health_disp[i][0]), True, colors.GREEN), [health_disp[i][2], health_disp[i][3]-10*(1-health_disp[i][1])])
-            # 負ならダメージ
-            else:
-                lm.screen.blit(fonts.damage_font.render(str(-1*health_disp[i][0]), True, colors.RED), [health_disp[i][2], health_disp[i][3]+10*(health_disp[i][1])*math.sin(10*math.pi*(1-health_disp[i][1]))])
-        
-        health_disp[i][1] -= 1/lm.fps
-        if health_disp[i][1] <= 0:
-            health_temp.append(i)
-
-
-    # 後ろから削除するために逆順にする（インデックスエラーを起こさないために）
-    health_temp.sort(reverse=True)
-
-    # 一定時間経過したら表示は消える
-    for i in health_temp:
-        health_disp.pop(i)  
-
 # 攻撃関数
 def player_attack(player, enemy, select_player, press_button, health_disp):
 
@@ -76,138 +48,153 @@ def player_attack(player, enemy, select_player, press_button, health_disp):
             # チャージ中のコマンド
             player[select_player].charge_command = press_button
 
+            # チャージ完了を予約
+            scheduler.add(player[select_player].left_time, charge_done, player, enemy, select_player, health_disp)
+
         
         # 残りチャージ時間が０
         if player[select_player].left_time <= 0:
 
             resol = lm.resol
         
-            miss_count = 0
+            # 攻撃する列にいる敵
+            targets = occupancy.enemies_at(round(player[select_player].cur_location[0]))
 
-            for i in range(len(enemy)):
-
-                if round(player[select_player].cur_location[0]) in enemy[i].hit_box:
-                    
-                    # 自分の「こうげき」と相手の「ぼうぎょ」
-                    damage = [math.floor(22 * (player[select_player].Atk + 20) / (enemy[i].Def.defense + 20))]
+            for i in targets:
+                
+                # 自分の「こうげき」と相手の「ぼうぎょ」
+                damage = [math.floor(22 * (player[select_player].Atk + 20) / (enemy[i].Def.defense + 20))]
 
-                    # わざの威力
-                    damage[0] = math.floor(damage[0] * player[select_player].command[press_button].power / 50 + 5)
+                # わざの威力
+                damage[0] = math.floor(damage[0] * player[select_player].command[press_button].power / 50 + 5)
 
-                    # 属性の計算
-                    # （弱点なら２倍　耐性なら０．５倍）
-                    damage[0] = math.floor(damage[0] * element.element_damage(enemy[i].element, player[select_player].command[press_button].element))
+                # 属性の計算
+                # （弱点なら２倍　耐性なら０．５倍）
+                damage[0] = math.floor(damage[0] * element.element_damage(enemy[i].element, player[select_player].command[press_button].element))
 
-                    # 属性一致
-                    # （自分の属性とわざの属性が一致してたら１．５倍）
-                    if player[select_player].command[press_button].element in player[select_player].element:
-                        damage[0] = math.floor(damage[0] * 1.5)
+                # 属性一致
+                # （自分の属性とわざの属性が一致してたら１．５倍）
+                if player[select_player].command[press_button].element in player[select_player].element:
+                    damage[0] = math.floor(damage[0] * 1.5)
 
-                    # プレイヤーの位置
-                    damage[0] = math.floor(damage[0] * player_guard_adjustment(player[select_player].cur_location[1]))
-                    # 敵の位置
-                    damage[0] = math.floor(damage[0] * enemy_guard_adjustment(enemy[i].guard))
+                # プレイヤーの位置
+                damage[0] = math.floor(damage[0] * player_guard_adjustment(player[select_player].cur_location[1]))
+                # 敵の位置
+                damage[0] = math.floor(damage[0] * enemy_guard_adjustment(enemy[i].guard))
 
-                    # 0.85～1.0の乱数
-                    damage[0] = math.floor(damage[0] * (random.randrange(85, 100+1) / 100))
+                # 0.85～1.0の乱数
+                damage[0] = math.floor(damage[0] * (rng.randrange(85, 100+1) / 100))
 
-                    # バフ補正
+                # バフ補正
 
-                    # デバフ補正
+                # デバフ補正
 
-                    # 正負反転
-                    damage[0] *= -1
+                # 正負反転
+                damage[0] *= -1
 
-                    enemy[i].left_HP += damage[0]
-                else:
-                    miss_count += 1
+                enemy[i].left_HP += damage[0]
 
             # 全部ミスだったとき
-            if miss_count == len(enemy):
+            if not targets:
                 damage = ["miss"]
 
             player[select_player].action = 0
-            damage.append(1)
             # 横軸をプレイヤーの攻撃位置に
-            damage.extend([(264+player[select_player].cur_location[0]*(96+16)+random.randrange(96))*resol[0]/1920, (40+32+random.randrange(384-32))*resol[1]/1080])
-            health_disp.append(damage)
+            health_disp.add(damage[0], 1, combat_text.enemy_place(player[select_player].cur_location))
 
             # チャージ中を解除
             player[select_player].charging = False
 
 
-# 敵の攻撃
-def enemy_attack(player, enemy, index, health_disp):
-    
-    for i in range(len(player)):
+# チャージ完了
+# チャージしていたコマンドで攻撃する
+def charge_done(player, enemy, select_player, health_disp):
 
-        if player[i].alive == True:
+    if player[select_player].charging == True and player[select_player].action >= 1000:
 
-            # プレイヤーが攻撃範囲内に半分以上重なってたら？（あとで少しでもかすってたらにする？）
-            if round(player[i].cur_location[0]) == enemy.attack[index].x and round(player[i].cur_location[1]) == enemy.attack[index].y:
-                
-                # （ダメージ計算式は後で考える）
+        # 残りチャージ時間を０に
+        player[select_player].left_time = 0
 
-                # 敵の「こうげき」とプレイヤーの「ぼうぎょ」
-                damage = [math.floor(22 * (enemy.Atk + 20) / (player[i].Def.defense + 20))]
+        player_attack(player, enemy, select_player, player[select_player].charge_command, health_disp)
 
-                # ぼうぎょ補正
-                if player[i].Def.valid == True:
-                    damage[0] = math.floor(damage[0] * (100 - player[i].Def.reduce_percent) / 100 - player[i].Def.reduce_const)
 
-                
-                # 属性防御補正？？？
+# 敵の攻撃の乱数をかける前のダメージ
+# target は攻撃を受けるプレイヤー、point は攻撃（威力と属性）、y はプレイヤーの縦の位置
+# （敵のプランナーが予想の位置でのダメージを見積もるときにも使う）
+def enemy_base_damage(target, enemy, point, y):
 
+    # （ダメージ計算式は後で考える）
 
-                # わざの威力
-                damage[0] = math.floor(damage[0] * enemy.attack[index].power / 50 + 5)
+    # 敵の「こうげき」とプレイヤーの「ぼうぎょ」
+    damage = [math.floor(22 * (enemy.Atk + 20) / (target.Def.defense + 20))]
 
-                # 属性の計算
-                damage[0] = math.floor(damage[0] * element.element_damage(player[i].element, enemy.attack[index].element))
+    # ぼうぎょ補正
+    if target.Def.valid == True:
+        damage[0] = math.floor(damage[0] * (100 - target.Def.reduce_percent) / 100 - target.Def.reduce_const)
 
-                # 属性一致
-                if enemy.attack[index].element in enemy.element:
-                    damage[0] = math.floor(damage[0] * 1.5)
 
-                # プレイヤーの位置 
-                damage[0] = math.floor(damage[0] * player_guard_adjustment(player[i].cur_location[1]))
-                # 敵の位置
-                damage[0] = math.floor(damage[0] * enemy_guard_adjustment(enemy.guard))
+    # 属性防御補正？？？
 
-                # 0.85～1.0の乱数
-                damage[0] = math.floor(damage[0] * (random.randrange(85, 100+1) / 100))
 
-                # バフ補正
+    # わざの威力
+    damage[0] = math.floor(damage[0] * point.power / 50 + 5)
 
-                # デバフ補正
+    # 属性の計算
+    damage[0] = math.floor(damage[0] * element.element_damage(target.element, point.element))
 
-                # 正負反転
-                damage[0] *= -1
+    # 属性一致
+    if point.element in enemy.element:
+        damage[0] = math.floor(damage[0] * 1.5)
+
+    # プレイヤーの位置
+    damage[0] = math.floor(damage[0] * player_guard_adjustment(y))
+    # 敵の位置
+    damage[0] = math.floor(damage[0] * enemy_guard_adjustment(enemy.guard))
+
+    return damage[0]
 
-                player[i].left_HP += damage[0]
-
-                # 攻撃の追加効果
-                for j in range(len(enemy.attack[index].effect)):
-                    
-                    enemy.attack[index].effect[j].image = pygame.image.load("./data_list/images/effects/" + enemy.attack[index].effect[j].name + ".png")
-                    #print(vars(enemy.attack[index].effect[j]))
-                    player[i].effect.append(enemy.attack[index].effect[j])
-
-                # 音（ならないから修正）
-                # mutagenやplaysoundが使えない？
-                """
-                if enemy.attack[index].play_sound != 'None':
-
-                    filename = './data_list/enemies/' + enemy.No + '/sounds/' + enemy.attack[index].play_sound #再生したいmp3ファイル
-                    pygame.mixer.init()
-                    pygame.mixer.music.load(filename) #音源を読み込み
-                    #mp3_length = mp3(filename).info.length #音源の長さ取得
-                    pygame.mixer.music.play(1) #再生開始。1の部分を変えるとn回再生(その場合は次の行の秒数も×nすること)
-                    #time.sleep(mp3_length + 0.25) #再生開始後、音源の長さだけ待つ(0.25待つのは誤差解消)
-                    #pygame.mixer.music.stop() #音源の長さ待ったら再生停止
-                """
-
-                damage.append(1)
-                # 横軸をプレイヤーの位置に
-                damage.extend([(264+player[i].cur_location[0]*(96+16)+random.randrange(96))*lm.resol[0]/1920, (552+player[i].cur_location[1]*(96+16))*lm.resol[1]/1080])
-                health_disp.append(damage)
+
+# 敵の攻撃
+def enemy_attack(player, enemy, point, health_disp):
+    
+    # 攻撃するマスにいるプレイヤー（現在地を四捨五入したマス）
+    for i in occupancy.players_at(point.x, point.y):
+
+        if player[i].alive == True:
+
+            damage = [enemy_base_damage(player[i], enemy, point, player[i].cur_location[1])]
+
+            # 0.85～1.0の乱数
+            damage[0] = math.floor(damage[0] * (rng.randrange(85, 100+1) / 100))
+
+            # バフ補正
+
+            # デバフ補正
+
+            # 正負反転
+            damage[0] *= -1
+
+            player[i].left_HP += damage[0]
+
+            # 攻撃の追加効果
+            for j in range(len(point.effect)):
+                
+                #print(vars(point.effect[j]))
+                effects.apply(player[i], point.effect[j], health_disp)
+
+            # 音（ならないから修正）
+            # mutagenやplaysoundが使えない？
+            """
+            if point.play_sound != 'None':
+
+                filename = './data_list/enemies/' + enemy.No + '/sounds/' + point.play_sound #再生したいmp3ファイル
+                pygame.mixer.init()
+                pygame.mixer.music.load(filename) #音源を読み込み
+                #mp3_length = mp3(filename).info.length #音源の長さ取得
+                pygame.mixer.music.play(1) #再生開始。1の部分を変えるとn回再生(その場合は次の行の秒数も×nすること)
+                #time.sleep(mp3_length + 0.25) #再生開始後、音源の長さだけ待つ(0.25待つのは誤差解消)
+                #pygame.mixer.music.stop() #音源の長さ待ったら再生停止
+            """
+
+            # 横軸をプレイヤーの位置に
+            health_disp.add(damage[0], 1, combat_text.player_place(player[i].cur_location), player[i])
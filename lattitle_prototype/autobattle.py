@@ -0,0 +1,568 @@
+import io
+import os
+import sys
+import math
+import time
+import types
+import signal
+import pickle
+import random
+import argparse
+import importlib
+import multiprocessing
+
+import pygame
+
+import board
+import engine
+import rng
+import occupancy
+import pathfinding
+import combat_text
+
+import lattitle_main as lm
+
+
+# 自動戦闘（プレイヤー４人のこうどうと移動を自動で選ぶ）
+# デモ、放置での動作テスト、敵の強さを測るときの強いプレイヤーに使う
+#
+# モンテカルロ木探索で選ぶ
+# 今の戦闘を画面なしの戦闘（engine.Battle）として写し、選べるこうどうごとに少し先まで戦闘を進めて結果のよいものを選ぶ
+# 先のことは分からないので、写した戦闘の乱数はプレイアウトごとに新しい種にする（敵のこうどうや乱数を先読みしない）
+# プロセスごとに別々の木を作って探し、最後に根のこうどうの回数と点数を足し合わせる（根の並列化）
+#
+# 決めるのは次の２つのとき
+# ・行動ゲージがたまったプレイヤーがいる → そのプレイヤーのコマンド（＋となりのマスへの移動）
+# ・新しく表示された攻撃予定のマスにプレイヤー（の移動先）がいる → そのプレイヤーの移動
+
+# １回の判断に使える秒数（None なら回数だけで止める）
+BUDGET = 0.2
+
+# １回の判断でのプレイアウトの回数（None なら時間だけで止める）
+ITERATIONS = 100
+
+# 木の深さ（何回先の判断まで木にするか）
+DEPTH = 3
+
+# プレイアウトで進めるゲーム内の秒数（判断した時刻から）
+HORIZON = 5
+
+# UCB の探索の強さ
+EXPLORATION = 1.4
+
+# 探すプロセスの数（0 なら同じプロセスで探す）
+PROCESSES = multiprocessing.cpu_count()
+
+
+# 戦闘の写し
+# モジュール（敵のこうどうファイルなど）は名前で import しなおし、画像は持たず、
+# ダメージの表示は画面なしの記録（engine.Combat_log）にかえる
+class Snapshot_pickler(pickle.Pickler):
+
+    def reducer_override(self, obj):
+
+        if type(obj) is types.ModuleType:
+            return importlib.import_module, (obj.__name__,)
+
+        if isinstance(obj, pygame.Surface):
+            return type(None), ()
+
+        if isinstance(obj, combat_text.Combat_text):
+            return engine.Combat_log, ()
+
+        return NotImplemented
+
+
+# 戦闘を写す（バイト列　pickle.loads で何回でも戻せる）
+def snapshot(battle):
+
+    buffer = io.BytesIO()
+    Snapshot_pickler(buffer, pickle.HIGHEST_PROTOCOL).dump(battle)
+
+    return buffer.getvalue()
+
+
+# コマンドが使えるか
+# item はアイテムの番号（アイテムのコマンドのとき）
+def usable(battle, i, k, it):
+
+    player = battle.player[i]
+    command = player.command[k]
+
+    if command.category == 'attack':
+        return player.can_attack == True
+
+    if command.category == 'defense':
+        return True
+
+    if command.category == 'magic':
+        consume_MP = player.Mgc.left_MP * command.MP_percent / 100 + command.MP_const
+        return player.can_magic == True and player.Mgc.left_MP >= consume_MP
+
+    if command.category == 'item':
+        return player.can_item == True and battle.item[it].amount > 0
+
+    return False
+
+
+# 使えるコマンド [[ボタン, アイテムの番号], ...]（アイテムでなければ番号は -1）
+def commands(battle, i):
+
+    player = battle.player[i]
+
+    if player.alive == False or player.action < 1000 or player.can_action == False or player.charging == True:
+        return []
+
+    result = []
+
+    for k in range(len(player.command)):
+
+        if player.command[k].category == 'item':
+            for it in range(len(battle.item)):
+                if usable(battle, i, k, it):
+                    result.append([k, it])
+
+        elif usable(battle, i, k, -1):
+            result.append([k, -1])
+
+    return result
+
+
+# 移動先のとなりの空いているマス
+def free_neighbours(battle, i):
+
+    cell = battle.player[i].destination
+    result = []
+
+    for d in pathfinding.DIRECTIONS:
+        x = cell[0] + d[0]
+        y = cell[1] + d[1]
+        if board.inside(x, y) and battle.field_status[y][x].player_exists == False:
+            result.append((x, y))
+
+    return result
+
+
+# 次に決めること
+# 戻り値は（[プレイヤーの番号, コマンドを選ぶか]、表示中の攻撃予定のマス）
+# 決めることがなければ最初は None
+# handled はもう移動を決めた攻撃予定のマス
+def next_decision(battle, handled):
+
+    player = battle.player
+
+    hazards = pathfinding.hazard_mask(battle.enemy)
+
+    for i in range(len(player)):
+        if commands(battle, i):
+            return [i, True], hazards
+
+    for i in range(len(player)):
+        if player[i].alive == True and hazards & ~handled & occupancy.bit(player[i].destination[0], player[i].destination[1]):
+            return [i, False], hazards
+
+    return None, hazards
+
+
+# 選べるこうどう（プレイヤーの番号, ボタン, アイテムの番号, 移動先）のリスト
+# 移動先は None（動かない）かとなりの空いているマス
+def options(battle, decision):
+
+    i, choose_command = decision
+
+    goals = [None] + free_neighbours(battle, i)
+
+    if choose_command == False:
+        return [(i, -1, -1, goal) for goal in goals]
+
+    return [(i, k, it, goal) for k, it in commands(battle, i) for goal in goals]
+
+
+# こうどうの移動を行い、この回の入力（選択中のプレイヤー, 押したボタン, 決定中のアイテム）を返す
+def apply(battle, option):
+
+    i, k, it, goal = option
+
+    if goal is not None:
+        battle.move_player(i, [list(battle.player[i].destination), list(goal)])
+
+    if k == -1:
+        return -1, -1, -1
+
+    return i, k, it
+
+
+# 次に決めることがあるか終わりの時刻まで、入力なしで進める
+# 戻り値は（決めること, もう移動を決めた攻撃予定のマス）
+def advance(battle, handled, end):
+
+    while battle.steps < end and battle.finished() == False:
+
+        decision, hazards = next_decision(battle, handled)
+
+        # 消えた攻撃予定は忘れる
+        handled &= hazards
+
+        if decision is not None:
+            return decision, handled
+
+        battle.step()
+
+    return None, handled
+
+
+# 戦闘の点数（0～1）
+# 勝ちは１、負けは０、決着がついていなければ残りHPの割合の差
+def evaluate(battle):
+
+    if battle.game_clear == True:
+        return 1.0
+
+    if battle.game_over == True:
+        return 0.0
+
+    players_left = sum([max(p.left_HP, 0) / p.HP for p in battle.player]) / len(battle.player)
+    enemies_left = sum([max(e.left_HP, 0) / e.HP for e in battle.enemy]) / len(battle.enemy)
+
+    return 0.5 + 0.5 * (players_left - enemies_left)
+
+
+# 木の節（そこまでのこうどうの並び）
+# 乱数でこの先の状態が変わるので、節は状態ではなくこうどうの並びで区別する
+class Node:
+
+    __slots__ = ('children', 'visits', 'value')
+
+    def __init__(self):
+
+        # こうどうごとの次の節
+        self.children = {}
+
+        # 通った回数と点数の合計
+        self.visits = 0
+        self.value = 0.0
+
+    # UCB で次のこうどうを選ぶ（まだ試していないものがあれば先に）
+    def select(self, choices, exploration):
+
+        best = None
+        best_score = -math.inf
+
+        for option in choices:
+
+            child = self.children.get(option)
+
+            if child is None or child.visits == 0:
+                return option
+
+            score = child.value / child.visits + exploration * math.sqrt(math.log(self.visits) / child.visits)
+
+            if score > best_score:
+                best = option
+                best_score = score
+
+        return best
+
+
+# プレイアウトのこうどう
+# 攻撃予定のないマスにいられるものから、ランダムに選ぶ
+def rollout_option(battle, choices, rollout_rng):
+
+    hazards = pathfinding.hazard_mask(battle.enemy)
+    safe = []
+
+    for option in choices:
+
+        cell = option[3] if option[3] is not None else battle.player[option[0]].destination
+
+        if hazards & occupancy.bit(cell[0], cell[1]) == 0:
+            safe.append(option)
+
+    return rollout_rng.choice(safe if safe else choices)
+
+
+# 木を作って探す（プロセスごとに１回呼ぶ）
+# data は写した戦闘、size は盤面の大きさ、handled はもう移動を決めた攻撃予定のマス
+# settings は（秒数, 回数, 深さ, 進める秒数, 探索の強さ）
+# 戻り値は根のこうどうごとの [通った回数, 点数の合計]
+def search(data, size, handled, seed, settings):
+
+    budget, iterations, depth, horizon, exploration = settings
+
+    start = time.perf_counter()
+
+    board.configure(size)
+
+    search_rng = random.Random(seed)
+    root = Node()
+
+    count = 0
+
+    while (iterations is None or count < iterations) and (budget is None or time.perf_counter() - start < budget):
+
+        count += 1
+
+        battle = pickle.loads(data)
+
+        # 先の乱数は分からないものとして新しい種にする
+        battle.rng = rng.new(search_rng.random())
+
+        end = battle.steps + int(horizon * lm.fps)
+        seen = handled
+
+        # 根は決める時刻なのでそのまま
+        decision, seen = advance(battle, seen, end)
+
+        node = root
+        path = [root]
+        level = 0
+
+        # 木をたどる（新しい節を作ったらそこで終わり）
+        while decision is not None and level < depth:
+
+            choices = options(battle, decision)
+            option = node.select(choices, exploration)
+
+            if decision[1] == False:
+                seen |= pathfinding.hazard_mask(battle.enemy)
+
+            battle.step(*apply(battle, option))
+
+            expanded = option not in node.children
+
+            if expanded == True:
+                node.children[option] = Node()
+
+            node = node.children[option]
+            path.append(node)
+            level += 1
+
+            decision, seen = advance(battle, seen, end)
+
+            if expanded == True:
+                break
+
+        # プレイアウト
+        while decision is not None:
+
+            if decision[1] == False:
+                seen |= pathfinding.hazard_mask(battle.enemy)
+
+            battle.step(*apply(battle, rollout_option(battle, options(battle, decision), search_rng)))
+
+            decision, seen = advance(battle, seen, end)
+
+        value = evaluate(battle)
+
+        for n in path:
+            n.visits += 1
+            n.value += value
+
+    return {option: [root.children[option].visits, root.children[option].value] for option in root.children}
+
+
+# search をプロセスで呼ぶ（引数を１つにまとめたもの）
+def run_search(task):
+    return search(*task)
+
+
+# プロセスの初期化
+# 敵のパッシブなどの print を捨てる
+# pygame（SDL）が SIGTERM を横取りしたままだと Pool.terminate で終わらないので、元に戻す
+def worker_init():
+
+    sys.stdout = open(os.devnull, "w")
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+# 自動戦闘のボット
+class Bot:
+
+    # budget は１回の判断の秒数、iterations はプレイアウトの回数（両方あれば先に来たほうで止める）
+    # depth は木の深さ、horizon はプレイアウトで進めるゲーム内の秒数
+    # processes は探すプロセスの数（0 なら同じプロセスで探す）
+    # seed はボットの乱数の種（回数だけで止めれば同じ種で同じ結果になる）
+    def __init__(self, budget=BUDGET, iterations=ITERATIONS, depth=DEPTH, horizon=HORIZON, processes=PROCESSES, seed=None, exploration=EXPLORATION):
+
+        self.settings = (budget, iterations, depth, horizon, exploration)
+
+        self.processes = processes
+        self.pool = None
+
+        if processes > 0:
+            self.pool = multiprocessing.Pool(processes, initializer=worker_init)
+
+        self.rng = random.Random(seed)
+
+        # もう移動を決めた攻撃予定のマス
+        self.handled = 0
+
+        # 探している途中の結果（poll で使う）
+        self.pending = None
+
+        # 集計（決めた回数、プレイアウトの回数）
+        self.decisions = 0
+        self.iterations = 0
+
+    # プロセスを終わらせる
+    def close(self):
+
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    # 探す仕事（プロセスごと）
+    def tasks(self, battle):
+
+        data = snapshot(battle)
+        size = [board.width, board.height]
+
+        budget, iterations, depth, horizon, exploration = self.settings
+
+        count = max(self.processes, 1)
+
+        # 回数はプロセスで分ける
+        if iterations is not None:
+            iterations = math.ceil(iterations / count)
+
+        settings = (budget, iterations, depth, horizon, exploration)
+
+        return [(data, size, self.handled, self.rng.random(), settings) for n in range(count)]
+
+    # プロセスごとの結果を足し合わせて、一番多く通ったこうどうを選ぶ
+    def best(self, results):
+
+        total = {}
+
+        for result in results:
+            for option in result:
+                stats = total.setdefault(option, [0, 0.0])
+                stats[0] += result[option][0]
+                stats[1] += result[option][1]
+
+        self.decisions += 1
+        self.iterations += sum([total[option][0] for option in total])
+
+        if not total:
+            return None
+
+        return max(total, key=lambda option: (total[option][0], total[option][1]))
+
+    # 決めることがあれば探して決め、この回の入力（選択中のプレイヤー, 押したボタン, 決定中のアイテム）を返す
+    # 探し終わるまで待つ（画面なしの戦闘用）
+    def act(self, battle):
+
+        decision, hazards = next_decision(battle, self.handled)
+
+        self.handled &= hazards
+
+        if decision is None:
+            return -1, -1, -1
+
+        tasks = self.tasks(battle)
+
+        if decision[1] == False:
+            self.handled |= hazards
+
+        if self.pool is None:
+            option = self.best([run_search(task) for task in tasks])
+        else:
+            option = self.best(self.pool.map(run_search, tasks))
+
+        if option is None:
+            return -1, -1, -1
+
+        return apply(battle, option)
+
+    # balancer の方針として使う（アイテムは使わない）
+    def policy(self, battle, policy_rng):
+        return self.act(battle)[:2]
+
+    # 待たずに探す（画面のある戦闘用）
+    # 決めることがあればプロセスで探し始め、結果が届いた回にその入力を返す（それまでは入力なし）
+    # 探している間も戦闘は進むので、届いたこうどうが使えなくなっていたら使えるところだけ行う
+    # （プロセスを使わないボットは act と同じ）
+    def poll(self, battle):
+
+        if self.pool is None:
+            return self.act(battle)
+
+        if self.pending is not None:
+
+            if self.pending.ready() == False:
+                return -1, -1, -1
+
+            option = self.best(self.pending.get())
+            self.pending = None
+
+            if option is not None:
+                return apply(battle, still_valid(battle, option))
+
+        decision, hazards = next_decision(battle, self.handled)
+
+        self.handled &= hazards
+
+        if decision is not None:
+
+            tasks = self.tasks(battle)
+
+            if decision[1] == False:
+                self.handled |= hazards
+
+            self.pending = self.pool.map_async(run_search, tasks)
+
+        return -1, -1, -1
+
+
+# 探している間に変わったところを除いたこうどう
+# コマンドが使えなくなっていたら移動だけ、移動先がふさがっていたらコマンドだけにする
+def still_valid(battle, option):
+
+    i, k, it, goal = option
+
+    if goal is not None and goal not in free_neighbours(battle, i):
+        goal = None
+
+    if k != -1 and [k, it] not in commands(battle, i):
+        k = -1
+        it = -1
+
+    return (i, k, it, goal)
+
+
+if __name__ == '__main__':
+
+    # 使い方：python autobattle.py へび --iterations 100 -p 4
+    # 画面なしで自動戦闘を１回行い、結果と判断の回数を表示する
+    parser = argparse.ArgumentParser(description="自動戦闘を画面なしで１回行う")
+    parser.add_argument("enemies", nargs="*", default=["へび"], help="敵の名前")
+    parser.add_argument("-p", "--processes", type=int, default=PROCESSES, help="探すプロセスの数（0 なら同じプロセス）")
+    parser.add_argument("--budget", type=float, default=BUDGET, help="１回の判断の秒数（0 なら回数だけ）")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS, help="１回の判断でのプレイアウトの回数（0 なら時間だけ）")
+    parser.add_argument("--depth", type=int, default=DEPTH, help="木の深さ")
+    parser.add_argument("--horizon", type=float, default=HORIZON, help="プレイアウトで進めるゲーム内の秒数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数の種")
+    parser.add_argument("--max-seconds", type=float, default=300, help="打ち切るゲーム内の秒数")
+    args = parser.parse_args()
+
+    battle = engine.new_battle(['まお', 'しょう', 'ぽんきち', 'まさよし'], args.enemies, args.seed)
+
+    bot = Bot(args.budget if args.budget > 0 else None, args.iterations if args.iterations > 0 else None, args.depth, args.horizon, args.processes, args.seed)
+
+    start = time.perf_counter()
+
+    while battle.steps < args.max_seconds * lm.fps and battle.finished() == False:
+        battle.step(*bot.act(battle))
+
+    elapsed = time.perf_counter() - start
+
+    bot.close()
+
+    for p in battle.player:
+        print(p.name, round(p.left_HP, 2), p.alive)
+    for e in battle.enemy:
+        print(e.name, round(e.left_HP, 2), e.alive)
+
+    print("game time %.1f s" % (battle.steps / lm.fps), "game_clear", battle.game_clear, "game_over", battle.game_over)
+    print("decisions", bot.decisions, "playouts", bot.iterations, "%.1f s" % elapsed)
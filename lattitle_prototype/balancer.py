@@ -0,0 +1,324 @@
+import os
+import sys
+import random
+import argparse
+import multiprocessing
+
+import board
+import engine
+import autobattle
+
+import lattitle_main as lm
+
+
+# バランス調整用のシミュレーション
+# 敵ごとに何千回も戦闘を画面なしで回して、勝率や撃破時間などを集計する
+# 使い方：python balancer.py -n 2000 -p 8 --policy scripted へび ひょう,えん
+# --policy mcts は自動戦闘のボット（autobattle）で、敵の強さを強いプレイヤーで測るとき用（とても遅い）
+
+# 今回のプレイヤー（ゲームと同じ）
+DEFAULT_PLAYERS = ['まお', 'しょう', 'ぽんきち', 'まさよし']
+
+# 決着がつかないときに打ち切るゲーム内の秒数
+MAX_SECONDS = 300
+
+# 上下左右
+DIRECTIONS = [[1, 0], [-1, 0], [0, 1], [0, -1]]
+
+
+# 敵のこうどうが出た回数（プロセスごと）
+# キーはこうどうの名前（tail_rush など）
+action_counts = {}
+
+
+# 敵のこうどうの関数を、実際に出た回数を数える関数に置きかえる
+# action_choice は名前で関数を呼ぶので、モジュールの関数を差しかえれば数えられる
+# プランナーは ACTIONS の表から呼ぶので、表のほうも差しかえる
+# （魔力が足りずに出なかったときは攻撃のキューが増えないので数えない）
+def count_actions(enemy):
+
+    for i in range(len(enemy)):
+
+        module = enemy[i].action_path
+
+        for name in enemy[i].actions:
+
+            func = getattr(module, name, None)
+
+            if func is None or getattr(func, "counted", False):
+                continue
+
+            def counted(target, *args, name=name, func=func):
+                before = len(target.attack)
+                result = func(target, *args)
+                if len(target.attack) > before:
+                    action_counts[name] = action_counts.get(name, 0) + 1
+                return result
+
+            counted.counted = True
+            setattr(module, name, counted)
+
+            if name in getattr(module, "ACTIONS", {}):
+                module.ACTIONS[name] = counted
+
+
+# 攻撃予定のマス（表示済みのもの）
+def danger_cells(enemy):
+
+    cells = set()
+
+    for i in range(len(enemy)):
+        for j in range(len(enemy[i].attack)):
+            if enemy[i].attack[j].until_disp <= 0:
+                cells.add((int(enemy[i].attack[j].x), int(enemy[i].attack[j].y)))
+
+    return cells
+
+
+# となりの空いているマス
+def free_neighbours(battle, cell):
+
+    result = []
+
+    for d in DIRECTIONS:
+        x = cell[0] + d[0]
+        y = cell[1] + d[1]
+        if board.inside(x, y) and battle.field_status[y][x].player_exists == False:
+            result.append([x, y])
+
+    return result
+
+
+# ランダムに行動する
+# 行動できるプレイヤーからランダムに１人選んで、ランダムなコマンドを押す
+# ときどきとなりのマスへ移動する
+def random_policy(battle, policy_rng):
+
+    player = battle.player
+
+    # 移動
+    for i in range(len(player)):
+        if player[i].alive == True and not player[i].route and policy_rng.random() < 0.01:
+            cells = free_neighbours(battle, player[i].destination)
+            if cells:
+                battle.move_player(i, [list(player[i].destination), policy_rng.choice(cells)])
+
+    # 行動
+    ready = [i for i in range(len(player)) if player[i].alive == True and player[i].action >= 1000 and player[i].charging == False]
+
+    if ready:
+        return policy_rng.choice(ready), policy_rng.randrange(4)
+
+    return -1, -1
+
+
+# 決まった手順で行動する
+# 攻撃予定のマスにいたら安全なとなりのマスへ逃げる
+# 行動できるプレイヤーは最初の「こうげき」か「まほう」のコマンドを使う（魔力が足りなければ「こうげき」）
+def scripted_policy(battle, policy_rng):
+
+    player = battle.player
+    danger = danger_cells(battle.enemy)
+
+    # 回避
+    for i in range(len(player)):
+        if player[i].alive == True and not player[i].route and tuple(player[i].destination) in danger:
+            cells = [c for c in free_neighbours(battle, player[i].destination) if tuple(c) not in danger]
+            if cells:
+                battle.move_player(i, [list(player[i].destination), cells[0]])
+
+    # 行動
+    for i in range(len(player)):
+
+        if player[i].alive == True and player[i].action >= 1000 and player[i].charging == False:
+
+            attack_button = -1
+
+            for k in range(len(player[i].command)):
+
+                command = player[i].command[k]
+
+                if command.category == 'magic':
+                    consume_MP = player[i].Mgc.left_MP * command.MP_percent / 100 + command.MP_const
+                    if player[i].Mgc.left_MP >= consume_MP:
+                        return i, k
+
+                if command.category == 'attack' and attack_button == -1:
+                    attack_button = k
+
+            if attack_button != -1:
+                return i, attack_button
+
+    return -1, -1
+
+
+POLICIES = {"random": random_policy, "scripted": scripted_policy}
+
+
+# プロセスの初期化
+# 敵のパッシブなどの print を捨てる（結果の表示は親プロセスだけ）
+def worker_init():
+
+    sys.stdout = open(os.devnull, "w")
+
+
+# 戦闘を１回行う
+# task は（敵の名前のリスト, 方針の名前, 乱数の種, 最大ステップ数, 数値を配列で持つか, 盤面の大きさ, 敵のプランナーを使うか）
+def run_one(task):
+
+    current_enemy, policy_name, seed, max_steps, use_store, board_size, use_planner = task
+
+    # 戦闘ごとに乱数の種を決める（どのプロセスで動いても同じ結果になる）
+    # 戦闘の乱数とプレイヤーの方針の乱数は分けておく
+    # プランナーは時間制限なし（どのプロセスで動いても同じ結果になるように）
+    battle = engine.new_battle(DEFAULT_PLAYERS, current_enemy, seed, use_store, board_size, use_planner, None)
+    policy_rng = random.Random(seed)
+
+    count_actions(battle.enemy)
+
+    # ボットは状態を持つので戦闘ごとに作る
+    # プロセスの中なので同じプロセスで探し、時間ではなく回数で止める（どのプロセスで動いても同じ結果になる）
+    if policy_name == "mcts":
+        policy = autobattle.Bot(budget=None, processes=0, seed=seed).policy
+    else:
+        policy = POLICIES[policy_name]
+
+    counts_before = dict(action_counts)
+
+    # プレイヤーごとの受けたダメージ
+    damage_taken = [0.0] * len(battle.player)
+    prev_HP = [p.left_HP for p in battle.player]
+
+    while battle.steps < max_steps and battle.finished() == False:
+
+        # ボットが先読みで進めた戦闘のこうどうは数えない
+        counts_kept = dict(action_counts) if policy_name == "mcts" else None
+
+        select_player, press_button = policy(battle, policy_rng)
+
+        if counts_kept is not None:
+            action_counts.clear()
+            action_counts.update(counts_kept)
+
+        battle.step(select_player, press_button)
+
+        for i in range(len(battle.player)):
+            if battle.player[i].left_HP < prev_HP[i]:
+                damage_taken[i] += prev_HP[i] - battle.player[i].left_HP
+            prev_HP[i] = battle.player[i].left_HP
+
+    # この戦闘で出たこうどう
+    actions = {}
+    for name in action_counts:
+        n = action_counts[name] - counts_before.get(name, 0)
+        if n > 0:
+            actions[name] = n
+
+    # プランナーの集計（プランナーで選んだ回数、抽選にした回数、時間切れの回数、覚えていたダメージを使った回数、計算した回数）
+    if battle.planner is not None:
+        planner_counts = [battle.planner.planned, battle.planner.fallback, battle.planner.timeout, battle.planner.hits, battle.planner.misses]
+    else:
+        planner_counts = None
+
+    return {"win": battle.game_clear,
+            "lose": battle.game_over,
+            "steps": battle.steps,
+            "damage_taken": damage_taken,
+            "actions": actions,
+            "planner": planner_counts}
+
+
+# 結果を集計
+def summarize(results):
+
+    n = len(results)
+    wins = [r for r in results if r["win"] == True]
+    loses = [r for r in results if r["lose"] == True]
+
+    summary = {"battles": n,
+               "win_rate": len(wins) / n,
+               "lose_rate": len(loses) / n,
+               "timeout_rate": (n - len(wins) - len(loses)) / n,
+               "time_to_kill": sum([r["steps"] for r in wins]) / len(wins) / lm.fps if wins else None,
+               "damage_taken": [sum([r["damage_taken"][i] for r in results]) / n for i in range(len(DEFAULT_PLAYERS))],
+               "actions": {},
+               "planner": None}
+
+    for r in results:
+        for name in r["actions"]:
+            summary["actions"][name] = summary["actions"].get(name, 0) + r["actions"][name]
+
+        if r["planner"] is not None:
+            if summary["planner"] is None:
+                summary["planner"] = [0] * len(r["planner"])
+            for k in range(len(r["planner"])):
+                summary["planner"][k] += r["planner"][k]
+
+    return summary
+
+
+# 敵の組み合わせごとに戦闘を回す
+# 乱数の種は seed + 戦闘の番号
+def balance(matchups, battles, processes, policy_name, seed, max_seconds=MAX_SECONDS, use_store=False, board_size=None, use_planner=False):
+
+    max_steps = int(max_seconds * lm.fps)
+    summaries = []
+
+    with multiprocessing.Pool(processes, initializer=worker_init) as pool:
+
+        for current_enemy in matchups:
+
+            tasks = [(current_enemy, policy_name, seed + k, max_steps, use_store, board_size, use_planner) for k in range(battles)]
+            results = pool.map(run_one, tasks, chunksize=max(1, battles // (processes * 4)))
+
+            summaries.append((current_enemy, summarize(results)))
+
+    return summaries
+
+
+# 結果を表示
+def report(summaries):
+
+    for current_enemy, s in summaries:
+
+        print("==", "+".join(current_enemy), "==")
+        print("battles", s["battles"])
+        print("win %.1f%%  lose %.1f%%  timeout %.1f%%" % (100 * s["win_rate"], 100 * s["lose_rate"], 100 * s["timeout_rate"]))
+
+        if s["time_to_kill"] is not None:
+            print("time to kill %.1f s" % s["time_to_kill"])
+        else:
+            print("time to kill -")
+
+        for i in range(len(DEFAULT_PLAYERS)):
+            print("damage taken", DEFAULT_PLAYERS[i], "%.1f" % s["damage_taken"][i])
+
+        total = sum(s["actions"].values())
+        for name in sorted(s["actions"], key=lambda a: -s["actions"][a]):
+            print("action", name, s["actions"][name], "(%.1f%%)" % (100 * s["actions"][name] / total))
+
+        # プランナーを使ったとき
+        if s["planner"] is not None:
+            planned, fallback, timeout, hits, misses = s["planner"]
+            print("planner planned %d  fallback %d  timeout %d  cache hits %.1f%%" % (planned, fallback, timeout, 100 * hits / max(hits + misses, 1)))
+
+        print()
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="敵ごとに戦闘を画面なしで回して集計する")
+    parser.add_argument("enemies", nargs="*", default=["へび"], help="敵の組み合わせ（複数の敵はカンマ区切り　例：ひょう,えん）")
+    parser.add_argument("-n", "--battles", type=int, default=1000, help="組み合わせごとの戦闘回数")
+    parser.add_argument("-p", "--processes", type=int, default=multiprocessing.cpu_count(), help="プロセス数")
+    parser.add_argument("--policy", choices=sorted(POLICIES) + ["mcts"], default="scripted", help="プレイヤーの方針")
+    parser.add_argument("--seed", type=int, default=0, help="乱数の種")
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS, help="打ち切るゲーム内の秒数")
+    parser.add_argument("--store", action="store_true", help="数値を NumPy の配列で持つ（敵が多いとき）")
+    parser.add_argument("--board", type=int, nargs=2, default=None, metavar=("WIDTH", "HEIGHT"), help="盤面の大きさ（省略時はゲームと同じ）")
+    parser.add_argument("--planner", action="store_true", help="敵のこうどうをプランナーで選ぶ")
+    args = parser.parse_args()
+
+    matchups = [m.split(",") for m in args.enemies]
+
+    report(balance(matchups, args.battles, args.processes, args.policy, args.seed, args.max_seconds, args.store, args.board, args.planner))
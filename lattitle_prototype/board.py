@@ -0,0 +1,46 @@
+import lattitle_main as lm
+
+
+# 盤面の大きさ
+# 戦闘を作るときに設定（lattitle_main.board_size、engine.new_battle の board_size）から決める
+# 盤面を扱うモジュール（索引・攻撃パターン・移動・画面の配置）はここの大きさを読む
+
+# 敵のデータ（当たり判定の列）を作ったときの盤面の大きさ
+DESIGN_WIDTH = 4
+DESIGN_HEIGHT = 4
+
+# 一番小さい盤面（プレイヤー４人が斜めに並ぶ）
+MIN_SIZE = 4
+
+# 今の盤面の大きさ
+width = DESIGN_WIDTH
+height = DESIGN_HEIGHT
+
+
+# 盤面の大きさを決める
+# size は [横, 縦]（None なら lattitle_main.board_size）
+def configure(size=None):
+
+    global width, height
+
+    if size is None:
+        size = lm.board_size
+
+    width = max(int(size[0]), MIN_SIZE)
+    height = max(int(size[1]), MIN_SIZE)
+
+
+# 盤面の中か
+def inside(x, y):
+    return 0 <= x < width and 0 <= y < height
+
+
+# 盤面の状態の入れ物　[ｙ軸][ｘ軸]
+def grid(make):
+    return [[make() for x in range(width)] for y in range(height)]
+
+
+# 敵の当たり判定の列（設計の盤面の列）を今の盤面の列に広げる
+# 横に広い盤面では設計の１列が何列かになる
+def design_column(x):
+    return x * DESIGN_WIDTH // width
@@ -1,32 +1,17 @@
-import lattitle_main as lm
-import random
+import classes
 
-# スピードアップ
-def speed_up(target, index):
-    
-    if target.effect[index].time > 0:
-        # ２度実行しないために
-        if target.effect[index].other_arg[0] == 0:
-
-            # 第２引数に増加倍率
-            target.Spd *= ((100 + target.effect[index].other_arg[1]) / 100)
-
-            # 第１引数はフラグの代わり
-            target.effect[index].other_arg[0] = 1
-
-            #　ステータス変動の配列をそれぞれ用意する
-            # クラスは名前，固定／倍率，数値の要素
-            # もしくはバフ系は直接操作しちゃってもいいかな
-
-    else:
-
-        # 元のスピードに戻す
-        target.Spd /= ((100 + target.effect[index].other_arg[1]) / 100)
+# バフの種類
+# 効果は effects が種類の設定から計算する（能力値の倍率は状態異常がかかったときと解けたときだけ計算し直す）
 
 
+# スピードアップ
+# 第２引数に増加率（％）
+def speed_up(effect):
+    return {'Spd': (100 + effect.percent) / 100}
 
-# バフ選択
-def buff_choice(player, enemy, target, index, health_disp, mana_disp):
 
-    if target.effect[index].name == 'speed_up':
-        speed_up(target, index)
\ No newline at end of file
+# 名前と種類
+# 第１引数は以前の二重実行防止のフラグで、今は使わない
+KINDS = {
+    'speed_up': classes.Effect_kind('buff', ['flag', 'percent'], modify=speed_up),
+}
@@ -1,3 +1,5 @@
+import tween
+
 class Mouse:
     def __init__(self, list):
         self.x = list[0]
@@ -17,53 +19,61 @@ class Player:
     # プレイヤー
     role = 'player'
 
-    # 生存しているか
-    alive = True
+    # 使う属性（インスタンスごとの辞書を作らない）
+    __slots__ = ('alive', 'cur_location', 'prev_location', 'route', 'segment', 'destination', 'defense', 'action', 'can_move', 'can_action', 'can_attack', 'can_defense', 'can_magic', 'can_item', 'color', 'image', 'name', 'No', 'img', 'HP', 'Atk', 'Def', 'Mgc', 'Spd', 'Itg', 'Itg_Spd', 'base_stats', 'left_time', 'charging', 'charge_command', 'left_HP', 'HP_tween', 'element', 'command', 'effect')
 
-    # 現在地
-    cur_location = [0.0, 0.0]
+    # ステータス初期化
+    def __init__(self, list):
 
-    # 移動経路
-    route = []
+        # 生存しているか
+        self.alive = True
 
-    # 目的地
-    destination = [0, 0]
+        # 現在地
+        self.cur_location = [0.0, 0.0]
 
-    # ぼうぎょ （軽減率, 軽減数, 防御時移動補正）
-    defense = [False, 0, 0, 100]
+        # 前回のロジックの更新時の現在地（描画の補間用）
+        self.prev_location = [0.0, 0.0]
 
-    # 現在の行動ゲージ
-    action = 0.0
+        # 移動経路
+        self.route = []
 
-    # 動けるか
-    can_move = True
+        # 移動中の区間（move.Segment）
+        self.segment = None
 
-    # 行動できるか
-    can_action = True
+        # 目的地
+        self.destination = [0, 0]
 
-    # 攻撃できるか
-    can_attack = True
+        # ぼうぎょ （軽減率, 軽減数, 防御時移動補正）
+        self.defense = [False, 0, 0, 100]
 
-    # 防御できるか
-    can_defense = True
+        # 現在の行動ゲージ
+        self.action = 0.0
 
-    # 魔法が使えるか
-    can_magic = True
+        # 動けるか
+        self.can_move = True
 
-    # アイテムが使えるか
-    can_item = True
+        # 行動できるか
+        self.can_action = True
 
-    # プレイヤーカラー
-    color = (0, 0, 0)
+        # 攻撃できるか
+        self.can_attack = True
 
-    # プレイヤー画像
-    image = None
+        # 防御できるか
+        self.can_defense = True
 
-    
-    
+        # 魔法が使えるか
+        self.can_magic = True
 
-    # ステータス初期化
-    def __init__(self, list):
+        # アイテムが使えるか
+        self.can_item = True
+
+        # プレイヤーカラー
+        self.color = (0, 0, 0)
+
+        # プレイヤー画像
+        self.image = None
+
+        # ステータス
         self.name = str(list[0][0])
         self.No = str(list[0][1])
         self.img = str(list[1][0])
@@ -75,6 +85,9 @@ class Player:
         self.Itg = int(list[7][0])
         self.Itg_Spd = float(list[7][1])
 
+        # 状態異常で変わる前の能力値
+        self.base_stats = {'Spd': self.Spd, 'Atk': self.Atk}
+
         # バフ，デバフ用の配列？を作る。
 
 
@@ -91,8 +104,8 @@ class Player:
         # 残りHP
         self.left_HP = self.HP
 
-        # 表示用HP
-        self.disp_HP = self.HP
+        # 表示用HPの動き
+        self.HP_tween = tween.Tween(self.HP)
 
         # 属性
         self.element = [str(s) for s in list[8]]
@@ -117,8 +130,20 @@ class Player:
         self.effect = []
 
 
+    # 表示用HP（残りHPに時間で近づく　表示するときに計算する）
+    @property
+    def disp_HP(self):
+        return tween.follow(self.HP_tween, self.left_HP)
+
+    @disp_HP.setter
+    def disp_HP(self, value):
+        self.HP_tween.rest(value)
+
+
 class Defense:
-    
+
+    __slots__ = ('defense', 'valid', 'reduce_percent', 'reduce_const', 'speed', 'element_percent', 'element_const')
+
     def __init__(self, list):
         
         self.defense = int(list[0])
@@ -133,6 +158,9 @@ class Defense:
         
 
 class Magic:
+
+    __slots__ = ('MP', 'recover', 'efficiency', 'left_MP')
+
     def __init__(self, list):
 
         # 最大魔力
@@ -248,6 +276,8 @@ class Command_item:
 
 class Buff_Debuff:
 
+    __slots__ = ('category', 'name', 'time', 'other_arg')
+
     def __init__(self, list):
 
         # 分類
@@ -269,6 +299,64 @@ class Buff_Debuff:
         
         # その他引数
         self.other_arg = [float(s) for s in list[3:]]
+
+
+# 状態異常の種類
+# 名前ごとに１つ作って effects.registry に登録する
+class Effect_kind:
+
+    def __init__(self, category, fields, tick=None, modify=None, blocks=(), immune=()):
+
+        # 分類（buff / debuff）
+        self.category = category
+
+        # その他引数の名前（前から順に）
+        self.fields = fields
+
+        # 定期的な処理（戻り値は次の処理までの秒数）
+        # 最初の処理は first 秒後
+        self.tick = tick
+
+        # 能力値の倍率を返す関数（例：{'Spd': 1.5}）
+        self.modify = modify
+
+        # できなくなること（例：['can_move']）
+        self.blocks = blocks
+
+        # かからない属性
+        self.immune = immune
+
+
+# かかっている状態異常
+# Buff_Debuff（攻撃やアイテムの追加効果）から、かけられた人ごとに作る
+class Effect:
+
+    def __init__(self, template, kind):
+
+        # 分類
+        self.category = template.category
+
+        # 名前
+        self.name = template.name
+
+        # 効果時間（制限時間がない場合は True、解除されたら False）
+        self.time = template.time
+
+        # 種類
+        self.kind = kind
+
+        # その他引数に名前をつける
+        for i in range(len(kind.fields)):
+            if i < len(template.other_arg):
+                setattr(self, kind.fields[i], template.other_arg[i])
+            else:
+                setattr(self, kind.fields[i], 0.0)
+
+        # かかっているか
+        self.active = True
+
+        # 効果時間の終了の予定
+        self.end = None
         
 
 class Enemy:
@@ -276,26 +364,34 @@ class Enemy:
     # 敵
     role = 'enemy'
 
-    # 生存しているか
-    alive = True
+    # 使う属性（インスタンスごとの辞書を作らない）
+    __slots__ = ('alive', 'image', 'attack', 'action', 'action_path', 'passive_path', 'cool_down', 'name', 'No', 'img', 'HP', 'Atk', 'Def', 'Mgc', 'Itg', 'base_stats', 'category', 'guard', 'hit_box', 'left_HP', 'HP_tween', 'element', 'passive', 'actions', 'weight')
 
-    # 画像
-    image = None
+    # ステータス初期化
+    def __init__(self, list):
 
-    # 攻撃のキュー
-    attack = []
+        # 生存しているか
+        self.alive = True
 
-    # 現在の行動ゲージ
-    action = 0.0
+        # 画像
+        self.image = None
 
-    # こうどうファイル
-    action_path = None
+        # 攻撃のキュー
+        self.attack = []
 
-    # 行動後クールダウン
-    cool_down = 0
+        # 現在の行動ゲージ
+        self.action = 0.0
 
-    # ステータス初期化
-    def __init__(self, list):
+        # こうどうファイル
+        self.action_path = None
+
+        # パッシブファイル
+        self.passive_path = None
+
+        # 行動後クールダウン
+        self.cool_down = 0
+
+        # ステータス
         self.name = str(list[0][0])
         self.No = str(list[0][1])
         self.img = str(list[1][0])
@@ -304,6 +400,10 @@ class Enemy:
         self.Def = Defense(list[4])
         self.Mgc = Magic(list[5])
         self.Itg = int(list[6][0])
+
+        # 状態異常で変わる前の能力値
+        # 敵はまだ状態異常にかからないので空（Atk を入れるとパッシブのだっぴで上げた値が effects.recompute で戻ってしまう）
+        self.base_stats = {}
         
         # 分類
         self.category = str(list[7][0])
@@ -315,8 +415,8 @@ class Enemy:
         # 残りHP
         self.left_HP = self.HP
 
-        # 表示用HP
-        self.disp_HP = self.HP
+        # 表示用HPの動き
+        self.HP_tween = tween.Tween(self.HP)
 
         # 属性
         self.element = [str(s) for s in list[9]]
@@ -334,8 +434,20 @@ class Enemy:
             self.weight.append(float(list[12+i][1]))
 
 
+    # 表示用HP（残りHPに時間で近づく　表示するときに計算する）
+    @property
+    def disp_HP(self):
+        return tween.follow(self.HP_tween, self.left_HP)
+
+    @disp_HP.setter
+    def disp_HP(self, value):
+        self.HP_tween.rest(value)
+
+
 class Enemy_passive:
 
+    __slots__ = ('name', 'valid', 'disp', 'disp_name')
+
     def __init__(self, string):
 
         # パッシブ名
@@ -351,6 +463,9 @@ class Enemy_passive:
         self.disp_name = ""
 
 class Enemy_attack:
+
+    __slots__ = ('category', 'name', 'power', 'element', 'x', 'y', 'preliminary', 'until_disp', 'play_sound', 'effect')
+
     def __init__(self, list):
 
         # 分類
@@ -390,4 +505,41 @@ class Enemy_attack:
     def trans_all(lists):
     
         for i in range(len(lists)):
-            lists[i] = Enemy_attack(lists[i])
\ No newline at end of file
+            lists[i] = Enemy_attack(lists[i])
+
+
+# パターンから作る敵の攻撃（patterns.Pattern.place が作る）
+# Enemy_attack と同じ属性を持ち、追加効果はパターンのものを共有する
+class Attack_cell:
+
+    __slots__ = ('category', 'name', 'power', 'element', 'x', 'y', 'preliminary', 'until_disp', 'play_sound', 'effect')
+
+    def __init__(self, pattern, x, y, preliminary, until_disp, play_sound):
+
+        # 分類
+        self.category = pattern.category
+
+        # 名前
+        self.name = pattern.name
+
+        # 威力
+        self.power = pattern.power
+
+        # 属性
+        self.element = pattern.element
+
+        # 座標
+        self.x = x
+        self.y = y
+
+        # 予備動作時間
+        self.preliminary = preliminary
+
+        # 表示まで
+        self.until_disp = until_disp
+
+        # 音
+        self.play_sound = play_sound
+
+        # 追加効果のリスト
+        self.effect = pattern.effect
@@ -0,0 +1,160 @@
+import pygame
+import rng
+import tween
+
+import fonts
+import dirty
+import layout
+
+import lattitle_main as lm
+
+
+# ダメージや回復量のポップアップ表示
+# 決まった数の入れ物を使い回して、毎フレームのリストの作り直しや削除をしない
+# 表示を始めた時刻と消える時刻を覚えておき、動きは表示するときに時刻から計算する（tween）
+
+# ポップアップの最大数
+CAPACITY = 64
+
+# 同じ相手への同じ向き（回復/ダメージ）の表示を、この秒数以内ならまとめる
+MERGE_TIME = 0.5
+
+
+# ポップアップ１個分
+class Popup:
+
+    __slots__ = ("value", "end", "x", "y", "target", "start", "surface")
+
+    def __init__(self):
+        self.value = 0
+        self.end = 0
+        self.x = 0
+        self.y = 0
+        self.target = None
+        self.start = 0
+        self.surface = None
+
+
+# ポップアップの入れ物
+# records の先頭 count 個が表示中、それより後ろは空き
+class Combat_text:
+
+    # heal_color は回復、damage_color はダメージ（とミス）の色
+    def __init__(self, heal_color, damage_color):
+        self.heal_color = heal_color
+        self.damage_color = damage_color
+        self.records = [Popup() for i in range(CAPACITY)]
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    # 表示を追加
+    # value は数値（正なら回復、負ならダメージ）か文字列、life は表示時間
+    # place は表示位置、target は相手（同じ相手の表示をまとめる。None ならまとめない）
+    def add(self, value, life, place, target=None):
+
+        now = tween.now()
+
+        # まとめられる表示があれば足す
+        if target is not None and type(value) is not str:
+            for i in range(self.count):
+                rec = self.records[i]
+                if rec.target is target and type(rec.value) is not str and (rec.value > 0) == (value > 0) and now - rec.start < MERGE_TIME:
+                    rec.value += value
+                    rec.end = max(rec.end, now + life)
+                    rec.start = now
+                    self.render(rec)
+                    return
+
+        # 空きがあれば使う
+        if self.count < CAPACITY:
+            rec = self.records[self.count]
+            self.count += 1
+
+        # いっぱいなら残り時間が一番短いものを上書き
+        else:
+            rec = min(self.records, key=lambda r: r.end)
+
+        rec.value = value
+        rec.end = now + life
+        rec.x = place[0]
+        rec.y = place[1]
+        rec.target = target
+        rec.start = now
+        self.render(rec)
+
+    # 数字の画像を作っておく（毎フレーム文字を描かない）
+    def render(self, rec):
+
+        if type(rec.value) is str:
+            rec.surface = fonts.render(fonts.damage_font, rec.value, True, self.damage_color)
+        elif rec.value > 0:
+            rec.surface = fonts.render(fonts.damage_font, str(rec.value), True, self.heal_color)
+        else:
+            rec.surface = fonts.render(fonts.damage_font, str(-1*rec.value), True, self.damage_color)
+
+    # 消える時刻を過ぎた表示を空きにする
+    def update(self):
+
+        now = tween.now()
+
+        i = 0
+
+        while i < self.count:
+
+            rec = self.records[i]
+
+            # 一定時間経過したら表示は消える
+            # 最後の表示と入れ替えて空きにする
+            if rec.end - now <= 0:
+                self.count -= 1
+                rec.target = None
+                self.records[i] = self.records[self.count]
+                self.records[self.count] = rec
+            else:
+                i += 1
+
+    # 表示
+    def disp(self):
+
+        now = tween.now()
+
+        for i in range(self.count):
+
+            rec = self.records[i]
+
+            # 残りの表示時間
+            remaining = rec.end - now
+
+            # 回復は上に流れる、ダメージとミスは揺れる
+            if type(rec.value) is not str and rec.value > 0:
+                dirty.add(lm.screen.blit(rec.surface, [rec.x, rec.y+tween.float_up(remaining)]))
+            else:
+                dirty.add(lm.screen.blit(rec.surface, [rec.x, rec.y+tween.shake(remaining)]))
+
+    # 全部消す
+    def clear(self):
+
+        for i in range(self.count):
+            self.records[i].target = None
+
+        self.count = 0
+
+
+# プレイヤーの位置の表示位置（横はマスの中でばらつかせる）
+def player_place(loc):
+
+    lay = layout.get()
+    place = lay.board_pos(loc)
+
+    return [place[0]+rng.randrange(round(lay.cell_design))*lay.sx, place[1]]
+
+
+# プレイヤーが攻撃した敵側の表示位置（横はプレイヤーの列、縦は敵の画像の中でばらつかせる）
+def enemy_place(loc):
+
+    lay = layout.get()
+    place = lay.board_pos(loc)
+
+    return [place[0]+rng.randrange(round(lay.cell_design))*lay.sx, (40+32+rng.randrange(384-32))*lay.sy]
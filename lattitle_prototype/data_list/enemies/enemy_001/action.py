@@ -1,5 +1,6 @@
-import random
-import classes
+import rng
+import board
+import patterns
 
 # 予備動作時間にわざ名を表示したい
 
@@ -7,22 +8,16 @@ import classes
 # しっぽうち
 # 威力 150 予備動作時間 5秒 クールダウン 5秒
 # 縦一列に攻撃
-def tail_rush(enemy):
+TAIL_RUSH = patterns.Pattern('attack', 'しっぽうち', 150, 'Normal', patterns.column, 5)
 
-    # 攻撃する横の列
-    scope = random.randrange(4)
+def tail_rush(enemy, scope=None):
 
-    # 攻撃
-    point = [['attack', 'しっぽうち', 150, 'Normal', scope, 0, 5, 0, None],
-             ['attack', 'しっぽうち', 150, 'Normal', scope, 1, 5, 0, None],
-             ['attack', 'しっぽうち', 150, 'Normal', scope, 2, 5, 0, None],
-             ['attack', 'しっぽうち', 150, 'Normal', scope, 3, 5, 0, None]]
+    # 攻撃する横の列
+    if scope is None:
+        scope = rng.randrange(board.width)
 
-    # 型変換
-    classes.Enemy_attack.trans_all(point)
-    
-    # 攻撃キューに連結
-    enemy.attack.extend(point)
+    # 攻撃キューに追加
+    TAIL_RUSH.place(enemy, scope, 0)
 
     # クールダウン５秒
     enemy.cool_down += 5.0
@@ -34,28 +29,30 @@ def tail_rush(enemy):
 # へびダッシュ
 # 威力 75 予備動作時間 5秒 クールダウン 5秒 
 # 盤面を縦横無尽にかけまわる
-def snake_dash(enemy):
+def snake_dash_cells(width, height):
 
-    # 攻撃
-    point = []
+    cells = []
 
     # ジグザグに攻撃
-    for i in range(4):
-        
+    for i in range(height):
+
         # 偶数行は順方向
         if i % 2 == 0:
-            for j in range(4):
-                point.append(['attack', 'へびダッシュ', 75, 'Normal', j, i, 5+j*0.05+i*0.20, j*0.05+i*0.20, None])
+            for j in range(width):
+                cells.append([j, i, j*0.05+i*0.20])
         # 奇数行は逆方向
         else:
-            for j in range(4-1, -1, -1):
-                point.append(['attack', 'へびダッシュ', 75, 'Normal', j, i, 5+(3-j)*0.05+i*0.20, (3-j)*0.05+i*0.20, None])
+            for j in range(width-1, -1, -1):
+                cells.append([j, i, (width-1-j)*0.05+i*0.20])
 
-    # 型変換
-    classes.Enemy_attack.trans_all(point)
-    
-    # 攻撃キューに連結
-    enemy.attack.extend(point)
+    return cells
+
+SNAKE_DASH = patterns.Pattern('attack', 'へびダッシュ', 75, 'Normal', snake_dash_cells, 5)
+
+def snake_dash(enemy):
+
+    # 攻撃キューに追加
+    SNAKE_DASH.place(enemy, 0, 0)
 
     # クールダウン５秒
     enemy.cool_down += 5.0
@@ -68,27 +65,21 @@ def snake_dash(enemy):
 # 威力 50 予備動作時間 5秒 クールダウン 5秒
 # 命中したプレイヤーをしっぽで拘束する
 # 命中したプレイヤーは数秒間移動も行動もできず、スリップダメージを受ける
-def tightening(enemy):
+# 移動不可 10秒
+# 行動不可 10秒
+# スリップ？ 10秒
+TIGHTENING = patterns.Pattern('attack', 'しめつけ', 50, 'Normal', [[0, 0]], 5,
+                              effect=[['debuff', 'cant_move', 10], ['debuff', 'cant_action', 10], ['debuff', 'slip', 10, 1, 1, 10]])
+
+def tightening(enemy, scope_x=None, scope_y=None):
     
     # 攻撃する位置
-    scope_x = random.randrange(4)
-    scope_y = random.randrange(4)
-
-    # 移動不可 10秒
-    # 行動不可 10秒
-    # スリップ？ 10秒
+    if scope_x is None:
+        scope_x = rng.randrange(board.width)
+        scope_y = rng.randrange(board.height)
 
-    # 攻撃
-    # バフデバフはリストで末尾につける？
-    # 攻撃は２次元配列で与える
-    point = [['attack', 'しめつけ', 50, 'Normal', scope_x, scope_y, 5, 0, None, ['debuff', 'cant_move', 10], ['debuff', 'cant_action', 10], ['debuff', 'slip', 10, 1, 1, 10]]]
-    
-    
-    # 型変換
-    classes.Enemy_attack.trans_all(point)
-    
-    # 攻撃キューに連結
-    enemy.attack.extend(point)
+    # 攻撃キューに追加
+    TIGHTENING.place(enemy, scope_x, scope_y)
 
     # クールダウン５秒
     enemy.cool_down += 5.0
@@ -97,12 +88,32 @@ def tightening(enemy):
     enemy.action = 0
 
 
+# こうどうの名前と関数
+ACTIONS = {'tail_rush': tail_rush, 'snake_dash': snake_dash, 'tightening': tightening}
+
+
+# プランナー用の候補
+# [こうどうの名前, 引数, [[パターン, 基準のｘ, 基準のｙ, 時間のずれ], ...]] を１つずつ返す
+# （プランナーが１つ受け取るごとに時間を調べられるように、まとめて作らない）
+# score_cell はマスごとの点数（候補をしぼるときに使う）
+def candidates(enemy, score_cell):
+
+    for x in range(board.width):
+        yield ['tail_rush', [x], [[TAIL_RUSH, x, 0, 0]]]
+
+    yield ['snake_dash', [], [[SNAKE_DASH, 0, 0, 0]]]
+
+    for x in range(board.width):
+        for y in range(board.height):
+            yield ['tightening', [x, y], [[TIGHTENING, x, y, 0]]]
+
+
 # こうどうを選ぶ
 # 敵リストと行動中の敵インデックスを引数に？
 def action_choice(enemy, index):
 
     # こうどうをランダムに選ぶ
-    name = random.choices(enemy[index].actions, k = 1, weights = enemy[index].weight)[0]
+    name = rng.choices(enemy[index].actions, k = 1, weights = enemy[index].weight)[0]
 
     if name == 'tail_rush':
 
@@ -114,4 +125,10 @@ def action_choice(enemy, index):
 
     elif name == 'tightening':
 
-        tightening(enemy[index])
\ No newline at end of file
+        tightening(enemy[index])
+
+
+# プランナーが選んだこうどうを実行する
+# args は候補の引数（攻撃する列や位置）
+def perform(enemy, index, name, args):
+    ACTIONS[name](enemy[index], *args)
@@ -1,26 +1,22 @@
-import random
-import classes
+import rng
+import board
+import patterns
 
 # ヘイルプリズム
 # 威力 80 予備動作時間 3秒 クールダウン 3秒
 # ランダムに４か所を攻撃
 # 命中したプレイヤーにしもやけを付与
-def hail_prism(enemy):
+HAIL_PRISM = patterns.Pattern('attack', 'ヘイルプリズム', 80, 'Ice', [[0, 0]], 3, effect=[['debuff', 'frostbite', True, 1]])
 
-    # 攻撃する場所
-    scope = random.sample(range(0,16), 4)
+def hail_prism(enemy, scope=None):
 
-    # 攻撃
-    point = [['attack', 'ヘイルプリズム', 80, 'Ice', scope[0]%4, scope[0]/4, 3, 0, None, ['debuff', 'frostbite', True, 1]],
-             ['attack', 'ヘイルプリズム', 80, 'Ice', scope[1]%4, scope[1]/4, 3, 0, None, ['debuff', 'frostbite', True, 1]],
-             ['attack', 'ヘイルプリズム', 80, 'Ice', scope[2]%4, scope[2]/4, 3, 0, None, ['debuff', 'frostbite', True, 1]],
-             ['attack', 'ヘイルプリズム', 80, 'Ice', scope[3]%4, scope[3]/4, 3, 0, None, ['debuff', 'frostbite', True, 1]]]
+    # 攻撃する場所（マスの番号）
+    if scope is None:
+        scope = rng.sample(range(0, board.width*board.height), 4)
 
-    # 型変換
-    classes.Enemy_attack.trans_all(point)
-    
-    # 攻撃キューに連結
-    enemy.attack.extend(point)
+    # 攻撃キューに追加
+    for c in scope:
+        HAIL_PRISM.place(enemy, c%board.width, c//board.width)
 
     # クールダウン３秒
     enemy.cool_down += 3.0
@@ -33,48 +29,47 @@ def hail_prism(enemy):
 # 威力 75*2 予備動作時間 3秒 クールダウン 5秒
 # 縦横斜めの１列攻撃を２回
 # 命中したプレイヤーにしもやけを付与
-def ice_sword(enemy):
-
-    point = []
-
-    # ２回攻撃
+# 列の向きごとのパターン
+def ice_sword_pattern(cells):
+    return patterns.Pattern('attack', 'アイスソード', 75, 'Ice', cells, 3, sound='ice_sword.mp3', effect=[['debuff', 'frostbite', True, 1]])
+
+ICE_SWORD = {'column': ice_sword_pattern(patterns.column),
+             'row': ice_sword_pattern(patterns.row),
+             'diagonal': ice_sword_pattern(patterns.diagonal),
+             'anti_diagonal': ice_sword_pattern(patterns.anti_diagonal)}
+
+# 攻撃する列のパターンと基準のマス
+# 横の大きさを w、縦の大きさを h とすると
+# 0～w-1 は縦方向、w～w+h-1 は横方向、w+h は左上から右下、w+h+1 は右上から左下
+def ice_sword_lane(lane):
+
+    # 縦方向の攻撃
+    if lane < board.width:
+        return ICE_SWORD['column'], [lane, 0]
+    # 横方向の攻撃
+    elif lane < board.width + board.height:
+        return ICE_SWORD['row'], [0, lane-board.width]
+    # 左上から右下の攻撃
+    elif lane == board.width + board.height:
+        return ICE_SWORD['diagonal'], [0, 0]
+    # 右上から左下の攻撃
+    else:
+        return ICE_SWORD['anti_diagonal'], [0, 0]
+
+def ice_sword(enemy, lanes=None):
+
+    # ２回攻撃（２回目は１秒遅れる）
     for i in range(2):
 
         # 攻撃する列
-        lane = random.randrange(10)
-
-        # 縦方向の攻撃
-        if 0 <= lane <= 3:
-            attack = [['attack', 'アイスソード', 75, 'Ice', lane, 0, 3+i, i, 'ice_sword.mp3', ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', lane, 1, 3+i, i, None, ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', lane, 2, 3+i, i, None, ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', lane, 3, 3+i, i, None, ['debuff', 'frostbite', True, 1]]]
-        # 横方向の攻撃
-        elif 4 <= lane <= 7:
-            attack = [['attack', 'アイスソード', 75, 'Ice', 0, lane-4, 3+i, i, 'ice_sword.mp3', ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', 1, lane-4, 3+i, i, None, ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', 2, lane-4, 3+i, i, None, ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', 3, lane-4, 3+i, i, None, ['debuff', 'frostbite', True, 1]]]
-        # 左上から右下の攻撃
-        elif lane == 8:
-            attack = [['attack', 'アイスソード', 75, 'Ice', 0, 0, 3+i, i, 'ice_sword.mp3', ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', 1, 1, 3+i, i, None, ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', 2, 2, 3+i, i, None, ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', 3, 3, 3+i, i, None, ['debuff', 'frostbite', True, 1]]]
-        # 右上から左下の攻撃
-        elif lane == 9:
-            attack = [['attack', 'アイスソード', 75, 'Ice', 3, 0, 3+i, i, 'ice_sword.mp3', ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', 2, 1, 3+i, i, None, ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', 1, 2, 3+i, i, None, ['debuff', 'frostbite', True, 1]],
-                      ['attack', 'アイスソード', 75, 'Ice', 0, 3, 3+i, i, None, ['debuff', 'frostbite', True, 1]]]
-
-        point.extend(attack)
-
-    # 型変換
-    classes.Enemy_attack.trans_all(point)
-    
-    # 攻撃キューに連結
-    enemy.attack.extend(point)
+        if lanes is None:
+            lane = rng.randrange(board.width + board.height + 2)
+        else:
+            lane = lanes[i]
+
+        # 攻撃キューに追加
+        pattern, anchor = ice_sword_lane(lane)
+        pattern.place(enemy, anchor[0], anchor[1], i)
 
     # クールダウン５秒
     enemy.cool_down += 5.0
@@ -87,23 +82,16 @@ def ice_sword(enemy):
 # 威力 120 予備動作時間 5秒 クールダウン 5秒
 # 左側２列を攻撃
 # 命中したプレイヤーにしもやけと凍結を付与
+def avalanche_cells(width, height):
+    return [[x, y] for x in range(2) for y in range(height)]
+
+AVALANCHE = patterns.Pattern('attack', 'ゆきなだれ', 120, 'Ice', avalanche_cells, 5,
+                             effect=[['debuff', 'frostbite', True, 1], ['debuff', 'frozen', True, 1]])
+
 def avalanche(enemy):
 
-    # 攻撃
-    point = [['attack', 'ゆきなだれ', 120, 'Ice', 0, 0, 5, 0, None, ['debuff', 'frostbite', True, 1], ['debuff', 'frozen', True, 1]],
-             ['attack', 'ゆきなだれ', 120, 'Ice', 0, 1, 5, 0, None, ['debuff', 'frostbite', True, 1], ['debuff', 'frozen', True, 1]],
-             ['attack', 'ゆきなだれ', 120, 'Ice', 0, 2, 5, 0, None, ['debuff', 'frostbite', True, 1], ['debuff', 'frozen', True, 1]],
-             ['attack', 'ゆきなだれ', 120, 'Ice', 0, 3, 5, 0, None, ['debuff', 'frostbite', True, 1], ['debuff', 'frozen', True, 1]],
-             ['attack', 'ゆきなだれ', 120, 'Ice', 1, 0, 5, 0, None, ['debuff', 'frostbite', True, 1], ['debuff', 'frozen', True, 1]],
-             ['attack', 'ゆきなだれ', 120, 'Ice', 1, 1, 5, 0, None, ['debuff', 'frostbite', True, 1], ['debuff', 'frozen', True, 1]],
-             ['attack', 'ゆきなだれ', 120, 'Ice', 1, 2, 5, 0, None, ['debuff', 'frostbite', True, 1], ['debuff', 'frozen', True, 1]],
-             ['attack', 'ゆきなだれ', 120, 'Ice', 1, 3, 5, 0, None, ['debuff', 'frostbite', True, 1], ['debuff', 'frozen', True, 1]]]
-
-    # 型変換
-    classes.Enemy_attack.trans_all(point)
-    
-    # 攻撃キューに連結
-    enemy.attack.extend(point)
+    # 攻撃キューに追加
+    AVALANCHE.place(enemy, 0, 0)
 
     # クールダウン５秒
     enemy.cool_down += 5.0
@@ -112,12 +100,39 @@ def avalanche(enemy):
     enemy.action = 0
 
 
+# こうどうの名前と関数
+ACTIONS = {'hail_prism': hail_prism, 'ice_sword': ice_sword, 'avalanche': avalanche}
+
+
+# プランナー用の候補
+# [こうどうの名前, 引数, [[パターン, 基準のｘ, 基準のｙ, 時間のずれ], ...]] を１つずつ返す
+# （プランナーが１つ受け取るごとに時間を調べられるように、まとめて作らない）
+# score_cell はマスごとの点数（候補をしぼるときに使う）
+def candidates(enemy, score_cell):
+
+    # ヘイルプリズムは点数の高い４マス
+    cells = sorted(range(board.width*board.height), key=lambda c: -score_cell(HAIL_PRISM, c%board.width, c//board.width, 0))[:4]
+    yield ['hail_prism', [cells], [[HAIL_PRISM, c%board.width, c//board.width, 0] for c in cells]]
+
+    # アイスソードは２回の列の組み合わせ
+    lanes = board.width + board.height + 2
+    for first in range(lanes):
+        for second in range(lanes):
+            placements = []
+            for i, lane in enumerate([first, second]):
+                pattern, anchor = ice_sword_lane(lane)
+                placements.append([pattern, anchor[0], anchor[1], i])
+            yield ['ice_sword', [[first, second]], placements]
+
+    yield ['avalanche', [], [[AVALANCHE, 0, 0, 0]]]
+
+
 # こうどうを選ぶ
 # 敵リストと行動中の敵インデックスを引数に？
 def action_choice(enemy, index):
 
     # こうどうをランダムに選ぶ
-    name = random.choices(enemy[index].actions, k = 1, weights = enemy[index].weight)[0]
+    name = rng.choices(enemy[index].actions, k = 1, weights = enemy[index].weight)[0]
 
     if name == 'hail_prism':
 
@@ -129,4 +144,10 @@ def action_choice(enemy, index):
 
     elif name == 'avalanche':
 
-        avalanche(enemy[index])
\ No newline at end of file
+        avalanche(enemy[index])
+
+
+# プランナーが選んだこうどうを実行する
+# args は候補の引数（攻撃する列や位置）
+def perform(enemy, index, name, args):
+    ACTIONS[name](enemy[index], *args)
@@ -1,11 +1,14 @@
-import random
-import classes
+import rng
+import board
+import patterns
 
 
 # デトネーション
 # 威力 150 予備動作時間 5秒 クールダウン 5秒
 # 十字型の爆発を起こす
-def detonation(enemy):
+DETONATION = patterns.Pattern('magic', 'デトネーション', 150, 'Fire', [[0, 0], [-1, 0], [1, 0], [0, -1], [0, 1]], 5)
+
+def detonation(enemy, scope_x=None, scope_y=None):
 
     # 魔力消費 50
     consume_MP = 50
@@ -13,29 +16,12 @@ def detonation(enemy):
     if enemy.Mgc.left_MP >= consume_MP:
 
         # 攻撃する場所
-        scope_x = random.randrange(4)
-        scope_y = random.randrange(4)
-
-        # 攻撃
-        point = [['magic', 'デトネーション', 150, 'Fire', scope_x, scope_y, 5, 0, None]]
-
-        # 横方向（端じゃなければ）
-        if scope_x > 0:
-            point.append(['magic', 'デトネーション', 150, 'Fire', scope_x-1, scope_y, 5, 0, None])
-        if scope_x < 3:
-            point.append(['magic', 'デトネーション', 150, 'Fire', scope_x+1, scope_y, 5, 0, None])
-
-        # 縦方向（端じゃなければ）
-        if scope_y > 0:
-            point.append(['magic', 'デトネーション', 150, 'Fire', scope_x, scope_y-1, 5, 0, None])
-        if scope_y < 3:
-            point.append(['magic', 'デトネーション', 150, 'Fire', scope_x, scope_y+1, 5, 0, None])
-
-        # 型変換
-        classes.Enemy_attack.trans_all(point)
-        
-        # 攻撃キューに連結
-        enemy.attack.extend(point)
+        if scope_x is None:
+            scope_x = rng.randrange(board.width)
+            scope_y = rng.randrange(board.height)
+
+        # 攻撃キューに追加（盤面の端では外にはみ出すマスを除く）
+        DETONATION.place(enemy, scope_x, scope_y)
 
         # クールダウン５秒
         enemy.cool_down += 5.0
@@ -50,27 +36,21 @@ def detonation(enemy):
 # ヘルフレイム
 # 威力 100 予備動作時間 3秒 クールダウン 3秒
 # 縦一列に攻撃
-def hell_flame(enemy):
+HELL_FLAME = patterns.Pattern('magic', 'ヘルフレイム', 100, 'Fire', patterns.column, 3, effect=[['debuff', 'on_fire', 10, 0.25]])
+
+def hell_flame(enemy, scope=None):
 
     # 魔力消費 50
     consume_MP = 50
 
     if enemy.Mgc.left_MP >= consume_MP:
 
-        # 攻撃する列
-        scope = random.randrange(2)
-
-        # 攻撃
-        point = [['magic', 'ヘルフレイム', 100, 'Fire', scope+2, 0, 3, 0, None, ['debuff', 'on_fire', 10, 0.25]],
-                 ['magic', 'ヘルフレイム', 100, 'Fire', scope+2, 1, 3, 0, None, ['debuff', 'on_fire', 10, 0.25]],
-                 ['magic', 'ヘルフレイム', 100, 'Fire', scope+2, 2, 3, 0, None, ['debuff', 'on_fire', 10, 0.25]],
-                 ['magic', 'ヘルフレイム', 100, 'Fire', scope+2, 3, 3, 0, None, ['debuff', 'on_fire', 10, 0.25]]]
+        # 攻撃する列（右側２列のどちらか）
+        if scope is None:
+            scope = rng.randrange(2)
 
-        # 型変換
-        classes.Enemy_attack.trans_all(point)
-        
-        # 攻撃キューに連結
-        enemy.attack.extend(point)
+        # 攻撃キューに追加
+        HELL_FLAME.place(enemy, scope+board.width-2, 0)
 
         # クールダウン３秒
         enemy.cool_down += 3.0
@@ -85,7 +65,9 @@ def hell_flame(enemy):
 # だいふんか
 # 威力 200 予備動作時間 5秒 クールダウン 5秒
 # 2*2の範囲に噴火を起こす
-def eruption(enemy):
+ERUPTION = patterns.Pattern('magic', 'だいふんか', 200, 'Fire', [[0, 0], [1, 0], [0, 1], [1, 1]], 5)
+
+def eruption(enemy, scope_x=None, scope_y=None):
 
     # 魔力消費 50
     consume_MP = 50
@@ -93,21 +75,13 @@ def eruption(enemy):
     if enemy.Mgc.left_MP >= consume_MP:
 
         # 攻撃する場所
-        scope_x = random.randrange(3)
-        scope_y = random.randrange(3)
-
+        if scope_x is None:
+            scope_x = rng.randrange(board.width-1)
+            scope_y = rng.randrange(board.height-1)
 
-        # 攻撃
-        point = [['magic', 'だいふんか', 200, 'Fire', scope_x, scope_y, 5, 0, None],
-                 ['magic', 'だいふんか', 200, 'Fire', scope_x+1, scope_y, 5, 0, None],
-                 ['magic', 'だいふんか', 200, 'Fire', scope_x, scope_y+1, 5, 0, None],
-                 ['magic', 'だいふんか', 200, 'Fire', scope_x+1, scope_y+1, 5, 0, None]]
 
-        # 型変換
-        classes.Enemy_attack.trans_all(point)
-        
-        # 攻撃キューに連結
-        enemy.attack.extend(point)
+        # 攻撃キューに追加
+        ERUPTION.place(enemy, scope_x, scope_y)
 
         # クールダウン５秒
         enemy.cool_down += 5.0
@@ -120,12 +94,38 @@ def eruption(enemy):
 
 
 
+# こうどうの名前と関数
+ACTIONS = {'detonation': detonation, 'hell_flame': hell_flame, 'eruption': eruption}
+
+
+# プランナー用の候補
+# [こうどうの名前, 引数, [[パターン, 基準のｘ, 基準のｙ, 時間のずれ], ...]] を１つずつ返す
+# （プランナーが１つ受け取るごとに時間を調べられるように、まとめて作らない）
+# score_cell はマスごとの点数（候補をしぼるときに使う）
+# どのまほうも魔力を 50 使うので、足りなければ候補なし
+def candidates(enemy, score_cell):
+
+    if enemy.Mgc.left_MP < 50:
+        return
+
+    for x in range(board.width):
+        for y in range(board.height):
+            yield ['detonation', [x, y], [[DETONATION, x, y, 0]]]
+
+    for scope in range(2):
+        yield ['hell_flame', [scope], [[HELL_FLAME, scope+board.width-2, 0, 0]]]
+
+    for x in range(board.width-1):
+        for y in range(board.height-1):
+            yield ['eruption', [x, y], [[ERUPTION, x, y, 0]]]
+
+
 # こうどうを選ぶ
 # 敵リストと行動中の敵インデックスを引数に？
 def action_choice(enemy, index):
 
     # こうどうをランダムに選ぶ
-    name = random.choices(enemy[index].actions, k = 1, weights = enemy[index].weight)[0]
+    name = rng.choices(enemy[index].actions, k = 1, weights = enemy[index].weight)[0]
 
     if name == 'detonation':
 
@@ -137,4 +137,10 @@ def action_choice(enemy, index):
 
     elif name == 'eruption':
 
-        eruption(enemy[index])
\ No newline at end of file
+        eruption(enemy[index])
+
+
+# プランナーが選んだこうどうを実行する
+# args は候補の引数（攻撃する列や位置）
+def perform(enemy, index, name, args):
+    ACTIONS[name](enemy[index], *args)
@@ -1,207 +1,114 @@
 import lattitle_main as lm
-import random
+import rng
 
+import classes
+import combat_text
 
-# 移動不可
-def cant_move(target, index):
 
-    if target.effect[index].time > 0:
-        
-        # 移動不可
-        target.can_move = False
+# デバフの種類
+# 定期的な処理は戻り値の秒数ごとに予定表から呼ばれる
+# 移動・行動できなくなる効果と、かかる前の解除・効果時間の終了は effects が種類の設定から行う
 
-    # 効果解除
-    else:
-        target.can_move = True
-    
 
-# 行動不可
-def cant_action(target, index):
-
-    if target.effect[index].time > 0:
-        
-        # 行動不可
-        target.can_action = False
-
-    # 効果解除
-    else:
-        target.can_action = True
-
-
-# スリップダメージ 
+# スリップダメージ
 # 判定ごとにダメージを受ける
-# 引数は経過時間と判定時間と定数ダメージ
-def slip(target, index, health_disp):
+# 引数は最初の判定までの時間（first）と判定時間（span）と定数ダメージ（damage）
+def slip(target, effect, health_disp):
 
     if target.alive == True:
 
-        if target.effect[index].time > 0:
-            
-            # 第１引数はダメージを与えるスパン
-            if target.effect[index].other_arg[0] > 0:
-
-                # 与えるまでの時間を消費
-                target.effect[index].other_arg[0] -= 1 / lm.fps
+        # 定数ダメージを与える
+        target.left_HP -= effect.damage
 
-            else:
+        # プレイヤーの場合
+        if target.role == 'player':
+            health_disp.add(-1 * int(effect.damage), effect.span, combat_text.player_place(target.cur_location), target)
 
-                # 第３引数はを与える定数ダメージ
-                # 定数ダメージを与える
-                target.left_HP -= target.effect[index].other_arg[2]
-
-                # プレイヤーの場合
-                if target.role == 'player':  
-                    health_disp.append([-1 * int(target.effect[index].other_arg[2]), target.effect[index].other_arg[1], (264+target.cur_location[0]*(96+16)+random.randrange(96))*lm.resol[0]/1920, (552+target.cur_location[1]*(96+16))*lm.resol[1]/1080])
-
-                # 第２引数は元の残り時間
-                # 元の残り時間まで戻す
-                target.effect[index].other_arg[0] = target.effect[index].other_arg[1]
+    # 次の判定まで
+    return effect.span
 
 
 # しもやけ
 # １秒ごとに最大HPの３％のダメージを受ける
 # 判定ごとに２０％の確率で解除
-# 引数は経過時間
-def frostbite(target, index, health_disp):
+# 引数は最初の判定までの時間（first）
+def frostbite(target, effect, health_disp):
 
     if target.alive == True:
 
-        if target.effect[index].time == True:
-
-            # 炎属性ならしもやけにならない
-            # 効果時間即終了
-            if 'Fire' in target.element:
-                target.effect[index].time = 0
-            
-
-            # 第１引数はダメージを与えるスパン
-            if target.effect[index].other_arg[0] > 0:
-
-                # 与えるまでの時間を消費
-                target.effect[index].other_arg[0] -= 1 / lm.fps
+        # 氷属性の場合は回復する
+        if 'Ice' in target.element:
+            target.left_HP += target.HP * 3 / 100
+            if target.role == 'player':
+                health_disp.add(int(target.HP * 3 / 100), 1, combat_text.player_place(target.cur_location), target)
+        # ３％の割合ダメージを与える
+        else :
+            target.left_HP -= target.HP * 3 / 100
+            if target.role == 'player':
+                health_disp.add(-1 * int(target.HP * 3 / 100), 1, combat_text.player_place(target.cur_location), target)
 
-            else:
+        # ２０％の確率で解除
+        if rng.randrange(100) < 20:
 
-                # 氷属性の場合は回復する
-                if 'Ice' in target.element:
-                    target.left_HP += target.HP * 3 / 100
-                    if target.role == 'player':  
-                        health_disp.append([int(target.HP * 3 / 100), 1, (264+target.cur_location[0]*(96+16)+random.randrange(96))*lm.resol[0]/1920, (552+target.cur_location[1]*(96+16))*lm.resol[1]/1080])
-                # ３％の割合ダメージを与える
-                else :
-                    target.left_HP -= target.HP * 3 / 100
-                    if target.role == 'player':  
-                        health_disp.append([-1 * int(target.HP * 3 / 100), 1, (264+target.cur_location[0]*(96+16)+random.randrange(96))*lm.resol[0]/1920, (552+target.cur_location[1]*(96+16))*lm.resol[1]/1080])
-            
+            effect.time = False
 
-                # 残り時間を１秒まで戻す
-                target.effect[index].other_arg[0] = 1.0
-                
+    # 次の判定は１秒後
+    return 1.0
 
-                # ２０％の確率で解除
-                if random.randrange(100) < 20:
-                    
-                    target.effect[index].time = False
 
-        
 # 凍結
 # 移動、行動不可になる
 # １秒ごとに解除の判定
 # 判定ごとに２０％の確率で解除
-# 引数は経過時間
-def frozen(target, index):
+# 引数は最初の判定までの時間（first）
+def frozen(target, effect, health_disp):
 
-    if target.effect[index].time == True:
+    # ２０％の確率で解除
+    if rng.randrange(100) < 20:
 
-        # 移動不可
-        target.can_move = False
-
-        # 行動不可
-        target.can_action = False
-
-        # 炎属性か氷属性なら凍結にならない
-        # 効果時間即終了
-        if 'Fire' in target.element or 'Ice' in target.element:
-            target.effect[index].time = False
-            target.can_move = True
-            target.can_action = True
-        
-
-        # 第１引数は凍結解除までの判定時間
-        if target.effect[index].other_arg[0] > 0:
-
-            # 与えるまでの時間を消費
-            target.effect[index].other_arg[0] -= 1 / lm.fps
-
-        else:
-
-            # 残り時間を１秒まで戻す
-            target.effect[index].other_arg[0] = 1.0
-            
-
-            # ２０％の確率で解除
-            if random.randrange(100) < 20:
-                
-                target.effect[index].time = False
-                target.can_move = True
-                target.can_action = True
+        effect.time = False
 
+    # 次の判定は１秒後
+    return 1.0
 
 
 # 炎上
 # 0.25秒ごとに2ダメージを受ける
-# 引数は経過時間
-def on_fire(target, index, health_disp):
+# 引数は最初の判定までの時間（first）
+def on_fire(target, effect, health_disp):
 
     if target.alive == True:
 
-        if target.effect[index].time > 0:
-
-            # 第１引数はダメージを与えるスパン
-            if target.effect[index].other_arg[0] > 0:
-
-                # 与えるまでの時間を消費
-                target.effect[index].other_arg[0] -= 1 / lm.fps
-
-            else:
-
-                # 炎属性の場合は2回復
-                if 'Fire' in target.element:
-                    if target.left_HP < target.HP:
-                        target.left_HP += 2
-                        if target.left_HP > target.HP:
-                            target.left_HP = target.HP
-                        if target.role == 'player':  
-                            health_disp.append([int(2), 0.25, (264+target.cur_location[0]*(96+16)+random.randrange(96))*lm.resol[0]/1920, (552+target.cur_location[1]*(96+16))*lm.resol[1]/1080])
-                # 氷属性か草属性は4ダメージ
-                elif 'Ice' in target.element or 'Leaf' in target.element :
-                    target.left_HP -= 4
-                    if target.role == 'player':  
-                        health_disp.append([-1 * int(4), 0.25, (264+target.cur_location[0]*(96+16)+random.randrange(96))*lm.resol[0]/1920, (552+target.cur_location[1]*(96+16))*lm.resol[1]/1080])
-                else:
-                    target.left_HP -= 2
-                    if target.role == 'player':  
-                        health_disp.append([-1 * int(2), 0.25, (264+target.cur_location[0]*(96+16)+random.randrange(96))*lm.resol[0]/1920, (552+target.cur_location[1]*(96+16))*lm.resol[1]/1080])
-            
-
-
-                # 残り時間を0.25秒まで戻す
-                target.effect[index].other_arg[0] = 0.25
-            
-
-
-# デバフ選択
-def debuff_choice(player, enemy, target, index, health_disp, mana_disp):
-
-    if target.effect[index].name == 'cant_move':
-        cant_move(target, index)
-    if target.effect[index].name == 'cant_action':
-        cant_action(target, index)
-    if target.effect[index].name == 'slip':
-        slip(target, index, health_disp)
-    if target.effect[index].name == 'frostbite':
-        frostbite(target, index, health_disp)
-    if target.effect[index].name == 'frozen':
-        frozen(target, index)
-    if target.effect[index].name == 'on_fire':
-        on_fire(target, index, health_disp)
+        # 炎属性の場合は2回復
+        if 'Fire' in target.element:
+            if target.left_HP < target.HP:
+                target.left_HP += 2
+                if target.left_HP > target.HP:
+                    target.left_HP = target.HP
+                if target.role == 'player':
+                    health_disp.add(int(2), 0.25, combat_text.player_place(target.cur_location), target)
+        # 氷属性か草属性は4ダメージ
+        elif 'Ice' in target.element or 'Leaf' in target.element :
+            target.left_HP -= 4
+            if target.role == 'player':
+                health_disp.add(-1 * int(4), 0.25, combat_text.player_place(target.cur_location), target)
+        else:
+            target.left_HP -= 2
+            if target.role == 'player':
+                health_disp.add(-1 * int(2), 0.25, combat_text.player_place(target.cur_location), target)
+
+    # 次の判定は0.25秒後
+    return 0.25
+
+
+# 名前と種類
+KINDS = {
+    'cant_move': classes.Effect_kind('debuff', [], blocks=['can_move']),
+    'cant_action': classes.Effect_kind('debuff', [], blocks=['can_action']),
+    'slip': classes.Effect_kind('debuff', ['first', 'span', 'damage'], tick=slip),
+    # 炎属性ならしもやけにならない
+    'frostbite': classes.Effect_kind('debuff', ['first'], tick=frostbite, immune=['Fire']),
+    # 炎属性か氷属性なら凍結にならない
+    'frozen': classes.Effect_kind('debuff', ['first'], tick=frozen, blocks=['can_move', 'can_action'], immune=['Fire', 'Ice']),
+    'on_fire': classes.Effect_kind('debuff', ['first'], tick=on_fire),
+}
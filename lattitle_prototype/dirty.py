@@ -0,0 +1,93 @@
+import pygame
+
+import lattitle_main as lm
+
+
+# 差分描画
+# 各部分が変化した範囲だけを画面に反映する
+# lattitle_main.dirty_rect が True のときだけ有効
+
+# 今回のフレームで更新する範囲
+rects = []
+
+# 前回のフレームで更新した範囲（消し残しがないようにもう一度更新する）
+prev_rects = []
+
+# 各部分の前回の状態と範囲
+# キーは部分の名前、値は（状態, 範囲）
+states = {}
+
+# 今回のフレームで報告された部分
+marked = set()
+
+# 次のフレームは画面全体を更新するか
+full = True
+
+
+# 次のフレームは画面全体を更新する
+# 画面の切り替えや画面モードの変更時に呼ぶ
+def full_update():
+
+    global full
+
+    full = True
+
+
+# 範囲を今回の更新に加える
+def add(rect):
+
+    if lm.dirty_rect == True:
+        rects.append(pygame.Rect(rect))
+
+
+# 部分の状態を報告する
+# 状態か範囲が前回と違えば、前回と今回の範囲を更新する
+def mark(key, rect, state):
+
+    if lm.dirty_rect == False:
+        return
+
+    rect = pygame.Rect(rect)
+    marked.add(key)
+
+    prev = states.get(key)
+
+    if prev is None:
+        rects.append(rect)
+
+    elif prev[0] != state or prev[1] != rect:
+        rects.append(prev[1])
+        rects.append(rect)
+
+    else:
+        return
+
+    states[key] = (state, rect)
+
+
+# 画面更新
+def flip():
+
+    global rects
+    global prev_rects
+    global full
+
+    # 差分描画を使わない
+    if lm.dirty_rect == False:
+        pygame.display.update()
+        return
+
+    # 今回報告されなかった部分は消えたので、その範囲を更新する
+    for key in list(states):
+        if key not in marked:
+            rects.append(states.pop(key)[1])
+    marked.clear()
+
+    if full == True:
+        pygame.display.update()
+        full = False
+    else:
+        pygame.display.update(rects + prev_rects)
+
+    prev_rects = rects
+    rects = []
@@ -5,78 +5,170 @@ import lattitle_main as lm
 
 import fonts
 import colors
+import images
+import dirty
+import layout
 
+import classes
 import buff
 import debuff
+import scheduler
 
-def player_effect(player, enemy, health_disp, mana_disp, side_display):
+# 状態異常の名前と種類（最初に使うときに buff と debuff の KINDS を登録する）
+# debuff から import が始まったときは KINDS がまだないので、import したときには読まない
+registry = {}
+
+# 登録されていない状態異常（何もしない）
+NO_EFFECT = classes.Effect_kind(None, [])
+
+
+# 名前から状態異常の種類を取得する
+def kind_of(name):
+
+    if not registry:
+        registry.update(buff.KINDS)
+        registry.update(debuff.KINDS)
+
+    return registry.get(name, NO_EFFECT)
+
+
+# 状態異常から能力値と行動制限を計算し直す
+# 状態異常がかかったときと解けたときだけ呼ぶ
+def recompute(target):
+
+    rate = {}
+    can_move = True
+    can_action = True
+
+    for effect in target.effect:
+
+        # 能力値の倍率
+        if effect.kind.modify is not None:
+            mods = effect.kind.modify(effect)
+            for stat in mods:
+                rate[stat] = rate.get(stat, 1) * mods[stat]
+
+        # 移動不可・行動不可
+        if 'can_move' in effect.kind.blocks:
+            can_move = False
+        if 'can_action' in effect.kind.blocks:
+            can_action = False
+
+    for stat in target.base_stats:
+        if stat in rate:
+            setattr(target, stat, target.base_stats[stat] * rate[stat])
+        else:
+            setattr(target, stat, target.base_stats[stat])
+
+    target.can_move = can_move
+    target.can_action = can_action
+
+
+# 状態異常をかける
+# template は攻撃やアイテムの追加効果（classes.Buff_Debuff）で、かけられた人ごとに classes.Effect を作る
+# 効果時間の終了と定期的な処理は予定表に登録し、毎回のロジックでは何もしない
+def apply(target, template, health_disp):
+
+    kind = kind_of(template.name)
+
+    # 属性によってはかからない
+    for e in kind.immune:
+        if e in target.element:
+            return
+
+    effect = classes.Effect(template, kind)
+
+    target.effect.append(effect)
+    recompute(target)
+
+    # 制限時間がある場合は終了を予約
+    if type(effect.time) == float:
+        effect.end = scheduler.add(effect.time, remove, target, effect)
+
+    # 定期的な処理を予約
+    if kind.tick is not None:
+        scheduler.add(effect.first, tick, target, effect, health_disp)
+
+
+# 状態異常を解除する
+def remove(target, effect):
+
+    # すでに解除されている
+    if effect.active == False:
+        return
+
+    effect.active = False
+    target.effect.remove(effect)
+
+    # 終了を予約していたら取り消す
+    if effect.end is not None:
+        scheduler.cancel(effect.end)
+
+    recompute(target)
+
+
+# 状態異常の定期的な処理
+def tick(target, effect, health_disp):
+
+    # すでに解除されている
+    if effect.active == False:
+        return
+
+    span = effect.kind.tick(target, effect, health_disp)
+
+    # 条件を満たして解除された
+    if effect.time == False:
+        remove(target, effect)
+
+    # 次の処理を予約（最低でもロジック１回分あける）
+    else:
+        scheduler.add(max(span, 1 / lm.fps), tick, target, effect, health_disp)
+
+
+# 状態異常の残り時間（秒）
+def time_left(effect):
+    return scheduler.left(effect.end)
+
+
+# 状態異常のアイコン画像
+def effect_image(effect):
+    return images.get("images/effects/" + effect.name + ".png")
+
+
+# 状態異常のアイコンを表示
+def disp_effect(player, side_display):
+
+    # サイドメニューがプレイヤーのときだけ
+    if side_display != 'players':
+        return
+
+    lay = layout.get()
 
     for i in range(len(player)):
-        
-        # 削除するやつを一時的に保存
-        pop_temp = []
-
-        # 状態異常を消化
-        for j in range(len(player[i].effect)):
-        
-            # （残り時間が存在しない状態異常のことも考える）
-            
-            # バフ発動
-            if player[i].effect[j].category == 'buff':
-                buff.buff_choice(player, enemy, player[i], j,  health_disp, mana_disp)
-
-            # デバフを発動
-            if player[i].effect[j].category == 'debuff':
-                debuff.debuff_choice(player, enemy, player[i], j,  health_disp, mana_disp)
-
-            # 制限時間がある場合
+
+        # 表示中のエフェクト（差分描画用）
+        disp_state = []
+
+        # ９個までは画像を表示
+        for j in range(min(len(player[i].effect), 9)):
+
+            # 制限時間がある場合は残り時間も表示
             if type(player[i].effect[j].time) == float:
-                
-                # 効果時間が残ってる
-                if player[i].effect[j].time > 0:
-
-                    # 残り時間を減らす
-                    player[i].effect[j].time -= 1 / lm.fps
-
-                    # 画像を表示
-                    if side_display == 'players':
-                        if j < 9: # ９個までは画像を表示
-                            
-                            # エフェクトの画像を表示
-                            lm.screen.blit(pygame.transform.scale(player[i].effect[j].image, [64*lm.resol[0]/1920, 64*lm.resol[1]/1080]), [(1520+(j%5)*(64+8))*lm.resol[0]/1920, (240+int(j/5)*(64+8)+i*(168+48))*lm.resol[1]/1080])
-                        
-                            # 残り時間を表示
-                            time_txt = fonts.effect_time_font.render(str(math.ceil(player[i].effect[j].time)), True, colors.BLACK)
-                            lm.screen.blit(time_txt, time_txt.get_rect(bottomright=((1520+64+(j%5)*(64+8))*lm.resol[0]/1920, (240+64+int(j/5)*(64+8)+i*(168+48))*lm.resol[1]/1080)))
-
-                # 効果時間終了時
-                else:
-                    
-                    # 削除する配列に加える
-                    pop_temp.append(j)
-
-            # 条件を満たすまで終わらない場合
-            else:
-
-                # 効果が有効
-                if player[i].effect[j].time == True:
-
-                    # 画像を表示
-                    if side_display == 'players':
-                        if j < 9: # ９個までは画像を表示
-                            
-                            # エフェクトの画像を表示
-                            lm.screen.blit(pygame.transform.scale(player[i].effect[j].image, [64*lm.resol[0]/1920, 64*lm.resol[1]/1080]), [(1520+(j%5)*(64+8))*lm.resol[0]/1920, (240+int(j/5)*(64+8)+i*(168+48))*lm.resol[1]/1080])
-
-                # 効果終了時
-                else:
-                    
-                    # 削除する配列に加える
-                    pop_temp.append(j)
-                    
-        
-        # 後ろから削除するために逆順にする（インデックスエラーを起こさないために）
-        pop_temp.sort(reverse=True) 
-        # 攻撃が終わった奴は削除
-        for j in pop_temp:
-            player[i].effect.pop(j)
\ No newline at end of file
+
+                # エフェクトの画像を表示
+                lm.screen.blit(images.scale(effect_image(player[i].effect[j]), lay.effect_slots[i][j].size), lay.effect_slots[i][j])
+
+                # 残り時間を表示
+                time_txt = fonts.render(fonts.effect_time_font, str(math.ceil(time_left(player[i].effect[j]))), True, colors.BLACK)
+                disp_state.append((player[i].effect[j].name, math.ceil(time_left(player[i].effect[j]))))
+                lm.screen.blit(time_txt, time_txt.get_rect(bottomright=lay.effect_slots[i][j].bottomright))
+
+            # 条件を満たすまで終わらない場合は有効な間だけ
+            elif player[i].effect[j].time == True:
+
+                # エフェクトの画像を表示
+                lm.screen.blit(images.scale(effect_image(player[i].effect[j]), lay.effect_slots[i][j].size), lay.effect_slots[i][j])
+                disp_state.append((player[i].effect[j].name, None))
+
+        # 差分描画に報告
+        dirty.mark(('effect', i), lay.effect_areas[i], tuple(disp_state))
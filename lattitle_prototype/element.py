@@ -1,126 +1,84 @@
-# 属性の補正計算
-def cul(target, strong, weak, invalid):
-    mag = 1
-    
-    for t in target:
-        if t in strong:
-            mag *= 2
-        
-        if t in weak:
-            mag /= 2
-        
-        if t in invalid:
-            mag = 0
+import numpy as np
 
-    return mag
-
-
-# 無属性が攻撃
-# 攻撃面　弱点０　耐性０　防御面　弱点０　耐性０
-def Normal(target):
-
-    strong = []
-    weak = []
-    invalid = []
 
-    return cul(target, strong, weak, invalid)
+# 属性の相性表
+# data_list/elements/elements.csv の行が攻撃の属性、列が防御の属性で、値はダメージの倍率
+# （弱点なら２倍　耐性なら０．５倍　無効なら０倍）
+# 読みこみ時に行列にしておき、防御側が複数の属性を持つときは各属性の倍率の積にする
+#
+# 炎属性が攻撃　攻撃面　弱点２　耐性３　防御面　弱点２　耐性３
+# 水属性が攻撃　攻撃面　弱点１　耐性２　防御面　弱点２　耐性２
+# 雷属性が攻撃　攻撃面　弱点２　耐性１　無効１　防御面　弱点１　耐性１
+# 草属性が攻撃　攻撃面　弱点２　耐性３　防御面　弱点３　耐性３
+# 風属性が攻撃　攻撃面　弱点３　耐性１　防御面　弱点２　耐性３　無効１
+# 氷属性が攻撃　攻撃面　弱点３　耐性２　防御面　弱点１　耐性１
+# 地属性が攻撃　攻撃面　弱点１　耐性１　無効１　防御面　弱点３　耐性１　無効１
 
-# 炎属性が攻撃
-# 攻撃面　弱点２　耐性３　防御面　弱点２　耐性３
-def Fire(target):
+# 相性表のファイル
+CHART_PATH = './data_list/elements/elements.csv'
 
-    strong = ["Leaf", "Ice"]
-    weak = ["Fire", "Water", "Wind"]
-    invalid = []
 
-    return cul(target, strong, weak, invalid)
+# ファイルから相性表を読みこむ
+# 戻り値は属性名のリストと倍率の行列（[攻撃][防御]）
+def read_file(path=CHART_PATH):
 
-# 水属性が攻撃
-# 攻撃面　弱点１　耐性２　防御面　弱点２　耐性２
-def Water(target):
-    strong = ["Fire"]
-    weak = ["Water", "Leaf"]
-    invalid = []
+    with open(path, 'r', encoding='utf-8') as f:
+        temp = f.read().split("\n")
 
-    return cul(target, strong, weak, invalid)
+    data = [temp[i].split(",") for i in range(len(temp)) if temp[i] != ""]
 
-# 雷属性が攻撃
-# 攻撃面　弱点２　耐性１　無効１　防御面　弱点１　耐性１
-def Electric(target):
-    strong = ["Water", "Wind"]
-    weak = ["Electric"]
-    invalid = ["Ground"]
+    # １行目は防御の属性名
+    names = data[0][1:]
 
-    return cul(target, strong, weak, invalid)
+    matrix = np.ones((len(names), len(names)))
 
-# 草属性が攻撃
-# 攻撃面　弱点２　耐性３　防御面　弱点３　耐性３
-def Leaf(target):
-    strong = ["Water", "Ground"]
-    weak = ["Fire", "Leaf", "Wind"]
-    invalid = []
+    for row in data[1:]:
+        for j in range(len(names)):
+            matrix[names.index(row[0])][j] = float(row[1+j])
 
-    return cul(target, strong, weak, invalid)
+    return names, matrix
 
-# 風属性が攻撃
-# 攻撃面　弱点３　耐性１　防御面　弱点２　耐性３　無効１
-def Wind(target):
-    strong = ["Fire", "Leaf", "Ground"]
-    weak = ["Wind"]
-    invalid = []
 
-    return cul(target, strong, weak, invalid)
+# 属性名と行列
+names, matrix = read_file()
 
-# 氷属性が攻撃
-# 攻撃面　弱点３　耐性２　防御面　弱点１　耐性１
-def Ice(target):
-    strong = ["Leaf", "Wind", "Ground"]
-    weak = ["Fire", "Ice"]
-    invalid = []
+# 属性名から行列の番号
+index = {names[i]: i for i in range(len(names))}
 
-    return cul(target, strong, weak, invalid)
+# 計算済みの倍率（キーは（攻撃の属性, 防御の属性のタプル））
+cache = {}
 
-# 地属性が攻撃
-# 攻撃面　弱点１　耐性１　無効１　防御面　弱点３　耐性１　無効１
-def Ground(target):
-    strong = ["Electric"]
-    weak = ["Ground"]
-    invalid = ["Wind"]
 
-    return cul(target, strong, weak, invalid)
-
-
-# 属性倍率計算
-def element_damage(target, attack):
+# 相性表を読みこみ直す（相性表を調整したとき）
+def reload(path=CHART_PATH):
 
-    if attack == 'Normal':
+    global names, matrix, index
 
-        return Normal(target)
+    names, matrix = read_file(path)
+    index = {names[i]: i for i in range(len(names))}
+    cache.clear()
 
-    elif attack == 'Fire':
 
-        return Fire(target)
+# 倍率を計算する
+# 表にない防御の属性は等倍
+def lookup(attack, target):
 
-    elif attack == 'Water':
+    row = matrix[index[attack]]
 
-        return Water(target)
+    return float(np.prod([row[index[t]] for t in target if t in index]))
 
-    elif attack == 'Electric':
 
-        return Electric(target)
-
-    elif attack == 'Leaf':
-
-        return Leaf(target)
-
-    elif attack == 'Wind':
-
-        return Wind(target)
+# 属性倍率計算
+# target は防御側の属性のリスト、attack は攻撃の属性
+# ２回目からは辞書を１回引くだけ
+def element_damage(target, attack):
 
-    elif attack == 'Ice':
+    key = (attack, tuple(target))
 
-        return Ice(target)
+    mag = cache.get(key)
 
-    elif attack == 'Ground':
+    if mag is None:
+        mag = lookup(attack, target)
+        cache[key] = mag
 
-        return Ground(target)
\ No newline at end of file
+    return mag
@@ -0,0 +1,302 @@
+import sys
+import time
+
+import field
+import board
+import colors
+import rng
+import scheduler
+import occupancy
+import pathfinding
+import planner
+import store
+
+import players
+import enemies
+
+import move
+import action
+
+import lattitle_main as lm
+
+
+# 画面なしで戦闘を進める
+# 画像・フォント・画面は使わないので、スクリプトやテストから呼べる
+# （data_list を相対パスで読むので lattitle_prototype で実行する）
+
+
+# 画面なしのときのダメージ・回復量の記録
+# combat_text.Combat_text の代わりに渡す（表示はせず合計だけ数える）
+class Combat_log:
+
+    def __init__(self):
+        self.heal = 0
+        self.damage = 0
+        self.miss = 0
+        self.count = 0
+
+    def add(self, value, life, place, target=None):
+
+        self.count += 1
+
+        if type(value) is str:
+            self.miss += 1
+        elif value > 0:
+            self.heal += value
+        else:
+            self.damage -= value
+
+    def update(self):
+        pass
+
+
+# 戦闘
+# プレイヤー・敵・アイテム・盤面の状態をまとめて持ち、ロジックを１回ずつ進める
+class Battle:
+
+    # seed は乱数の種（None なら毎回ちがう）
+    def __init__(self, player, enemy, item, field_status, health_disp, mana_disp, seed=None):
+        self.player = player
+        self.enemy = enemy
+        self.item = item
+        self.field_status = field_status
+        self.health_disp = health_disp
+        self.mana_disp = mana_disp
+
+        # この戦闘の乱数
+        self.seed = seed
+        self.rng = rng.new(seed)
+
+        # この戦闘の予定表（敵の攻撃、状態異常、チャージ完了）
+        self.scheduler = scheduler.Scheduler()
+
+        # 盤面のどこに誰がいるかの索引
+        self.occupancy = occupancy.Occupancy(player, enemy)
+
+        # 敵のこうどうを選ぶプランナー（None なら重みつきの抽選だけ）
+        self.planner = None
+
+        # 数値の配列（use_store を呼んだときだけ使う）
+        self.player_store = None
+        self.enemy_store = None
+
+        # 進めた回数
+        self.steps = 0
+
+        # ゲームクリア / ゲームオーバー
+        self.game_clear = False
+        self.game_over = False
+
+    # プレイヤーと敵の数値を NumPy の配列で持ち、毎回の更新を配列の演算でまとめて行う
+    # 敵が多い戦闘や一括シミュレーション向け（結果は１体ずつ更新するときと同じになる）
+    def use_store(self):
+
+        self.player_store = store.attach(self.player)
+        self.enemy_store = store.attach(self.enemy)
+
+        # view に置きかえたので索引も作り直す
+        self.occupancy = occupancy.Occupancy(self.player, self.enemy)
+
+    # 決着がついたか
+    def finished(self):
+        return self.game_clear == True or self.game_over == True
+
+    # ロジックを１回（1/lm.fps 秒）進める
+    # select_player は選択中のプレイヤー、press_button は押されたコマンド、picked_item は決定中のアイテム
+    def step(self, select_player=-1, press_button=-1, picked_item=-1):
+
+        player = self.player
+        enemy = self.enemy
+
+        # この戦闘の乱数・予定表・索引を使う
+        rng.use(self.rng)
+        scheduler.use(self.scheduler)
+        occupancy.use(self.occupancy)
+
+        # 補間用に現在地を保存
+        players.save_location(player)
+
+        # プレイヤーの移動
+        move.move(player)
+
+        # 移動したので索引を作り直す（使われたときに）
+        self.occupancy.invalidate()
+
+        # プレイヤーの行動
+        action.player_action(player, enemy, self.item, select_player, press_button, picked_item, self.health_disp, self.mana_disp)
+
+
+        # プレイヤー行動ゲージチャージ
+        # 敵行動ゲージチャージ
+        if self.player_store is not None:
+            self.player_store.player_charge(player)
+            self.enemy_store.enemy_charge()
+        else:
+            action.player_action_chaege(player)
+            action.enemy_action_charge(enemy)
+
+        # 敵の行動を選ぶ
+        action.enemy_action(player, enemy, self.health_disp, self.planner)
+
+        # 時間が来た予定を実行（敵の攻撃の表示と発動、状態異常の効果と終了、チャージ完了）
+        self.scheduler.run()
+
+        # 敵のパッシブ
+        enemies.enemy_passive(enemy)
+
+        # HPの変動の表示時間を進める
+        # （表示用HPは tween.follow で表示するときに計算する）
+        self.health_disp.update()
+
+        # MPの自動回復
+        if self.player_store is not None:
+            self.player_store.MP_heal()
+            self.enemy_store.MP_heal()
+        else:
+            players.MP_heal(player)
+            enemies.MP_heal(enemy)
+
+        # MPの変動の表示時間を進める
+        self.mana_disp.update()
+
+
+        if self.player_store is not None:
+
+            # 敵の死亡判定
+            for i in self.enemy_store.dying():
+                enemies.kill(enemy, i)
+
+            # プレイヤーの死亡判定
+            for i in self.player_store.dying():
+                players.kill(player, i, self.field_status)
+
+            # 全滅したらゲームクリア / ゲームオーバー
+            self.game_clear = not self.enemy_store.alive.any()
+            self.game_over = not self.player_store.alive.any()
+
+        else:
+
+            # 敵の死亡判定
+            enemies.enemy_death(enemy)
+
+            # プレイヤーの死亡判定
+            players.player_death(player, self.field_status)
+
+            # 敵が全滅したらゲームクリア
+            self.game_clear = True
+            for i in range(len(enemy)):
+                if enemy[i].alive == True:
+                    self.game_clear = False
+                    break
+
+            # プレイヤーが全滅したらゲームオーバー
+            self.game_over = True
+            for i in range(len(player)):
+                if player[i].alive == True:
+                    self.game_over = False
+                    break
+
+        self.steps += 1
+
+    # プレイヤーを経路にそって移動させる
+    # route は今いるマスから始まるマスのリスト（例：[[0, 0], [0, 1]]）
+    def move_player(self, index, route):
+
+        if self.player[index].alive == True and route and route[0] == self.player[index].destination:
+            move.left_released(self.player, self.field_status, route[0], [list(r) for r in route])
+
+    # プレイヤーを目的のマスまで最短経路で移動させる
+    # avoid_hazards なら攻撃が表示されているマスをできるだけよける
+    # 戻り値は移動する経路（移動できないなら []）
+    def move_to(self, index, goal, avoid_hazards=True):
+
+        player = self.player[index]
+
+        if player.alive == False:
+            return []
+
+        hazards = pathfinding.hazard_mask(self.enemy) if avoid_hazards == True else 0
+
+        route = pathfinding.route(self.field_status, player.destination, goal, hazards)
+
+        if len(route) >= 2:
+            self.move_player(index, route)
+            return route
+
+        return []
+
+
+# 盤面の状態を作る（今の盤面の大きさ）
+def new_field_status():
+    return board.grid(field.Field_status)
+
+
+# data_list から戦闘を作る
+# use_store なら数値を NumPy の配列で持つ（Battle.use_store）
+# board_size は盤面の大きさ [横, 縦]（None なら lattitle_main.board_size）
+# use_planner なら敵のこうどうをプランナーで選ぶ（planner_budget は１回の判断に使える秒数　-1 なら planner.BUDGET、None なら制限なし）
+# （planner は import の途中でこのモジュールを読むことがあるので、planner.BUDGET は呼ばれたときに読む）
+def new_battle(current_player, current_enemy, seed=None, use_store=False, board_size=None, use_planner=False, planner_budget=-1):
+
+    # 盤面の大きさ（敵の攻撃パターンや索引はこの大きさで作る）
+    board.configure(board_size)
+
+    field_status = new_field_status()
+
+    # プレイヤー
+    player_data = []
+    players.read_file(player_data)
+
+    player = []
+    players.player_choice(player, player_data, current_player, field_status)
+    colors.init(player)
+
+    # 敵
+    enemy_data = []
+    enemies.read_file(enemy_data)
+
+    enemy = []
+    enemies.enemy_choice(enemy, enemy_data, current_enemy)
+
+    battle = Battle(player, enemy, [], field_status, Combat_log(), Combat_log(), seed)
+
+    if use_store == True:
+        battle.use_store()
+
+    if use_planner == True:
+        if planner_budget == -1:
+            planner_budget = planner.BUDGET
+        battle.planner = planner.Planner(planner_budget)
+
+    return battle
+
+
+# 決着がつくか上限まで進める
+# 戻り値は進めた回数
+def run(battle, max_steps):
+
+    while battle.steps < max_steps and battle.finished() == False:
+        battle.step()
+
+    return battle.steps
+
+
+if __name__ == '__main__':
+
+    # 使い方：python engine.py [秒数]
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+
+    battle = new_battle(['まお', 'しょう', 'ぽんきち', 'まさよし'], ["へび"])
+
+    start = time.perf_counter()
+    steps = run(battle, int(seconds * lm.fps))
+    elapsed = time.perf_counter() - start
+
+    for p in battle.player:
+        print(p.name, round(p.left_HP, 2), p.alive)
+    for e in battle.enemy:
+        print(e.name, round(e.left_HP, 2), e.alive)
+
+    print("steps", steps, "game_clear", battle.game_clear, "game_over", battle.game_over)
+    print("damage", battle.health_disp.damage, "heal", battle.health_disp.heal)
+    print("%.0f steps/s" % (steps / max(elapsed, 1e-9)))
@@ -2,6 +2,9 @@ import pygame
 
 import colors
 import images
+import dirty
+import layout
+import board
 
 import lattitle_main as lm
 
@@ -9,6 +12,8 @@ import lattitle_main as lm
 # フィールド状態用クラス
 class Field_status:
 
+    __slots__ = ('player_exists', 'effect')
+
     def __init__(self):
 
         # プレイヤーがいるか
@@ -19,48 +24,47 @@ class Field_status:
 
 
 # 盤面初期化
+# 渡されたリストを今の盤面の大きさ（board）で作り直す
 def init(field_location, field_status):
 
-    # フィールド状態をクラスに変更
-    for i in range(4):
-        for j in range(4):
-            field_status[j][i] = Field_status()
+    # フィールド状態
+    field_status[:] = board.grid(Field_status)
 
-    # （座標は左上だけ決めて、他はfor文で初期化する）
+    # 座標は画面の配置から取る
     # field_location[ｙ軸][ｘ軸][始点/終点/サイズ][ｘ/ｙ座標（サイズ）]
-    field_location[0][0][0] = [264*lm.resol[0]/1920, 552*lm.resol[1]/1080]
-    field_location[0][0][1] = [field_location[0][0][0][0]+96*lm.resol[0]/1920, field_location[0][0][0][1]+96*lm.resol[1]/1080]
-    field_location[0][0][2] = [96*lm.resol[0]/1920, 96*lm.resol[1]/1080]
+    lay = layout.get()
 
-    for i in range(4):
-        for j in range(4):
-            field_location[i][j][0] = [field_location[0][0][0][0]+j*(96+16)*lm.resol[0]/1920, field_location[0][0][0][1]+i*(96+16)*lm.resol[1]/1080]
-            field_location[i][j][1] = [field_location[i][j][0][0]+96*lm.resol[0]/1920, field_location[i][j][0][1]+96*lm.resol[1]/1080]
-            field_location[i][j][2] = [96*lm.resol[0]/1920, 96*lm.resol[1]/1080]
+    field_location[:] = [[[list(cell.topleft), list(cell.bottomright), list(cell.size)] for cell in row] for row in lay.cells]
 
 
 
 # 盤面表示　（後々変える？）
-def field_disp(field_location, field_status):
+# 背景に合成するので描く先の画像を受け取る
+def field_disp(surface, field_location):
 
     # 枠
-    pygame.draw.rect(lm.screen, colors.D_GLAY, [248*lm.resol[0]/1920, 536*lm.resol[1]/1080, 464*lm.resol[0]/1920, 464*lm.resol[1]/1080])
+    pygame.draw.rect(surface, colors.D_GLAY, layout.get().board)
 
-    for i in range(0, 4):
-        for j in range(0, 4):
+    for row in field_location:
+        for cell in row:
 
-            pygame.draw.rect(lm.screen, colors.SILVER, [field_location[i][j][0], field_location[i][j][2]])
+            pygame.draw.rect(surface, colors.SILVER, [cell[0], cell[2]])
 
 
 # カーソル位置
-def cursor_loc(field_location, mouse, cursor):
-
-    if field_location[0][0][0][0] <= mouse.x < field_location[3][3][1][0] and field_location[0][0][0][1] <= mouse.y < field_location[3][3][1][1]:
-        for i in range(4):
-            for j in range(4):
-                if field_location[i][j][0][0] <= mouse.x < field_location[i][j][1][0] and field_location[i][j][0][1] <= mouse.y < field_location[i][j][1][1]:
-                    cursor.x = j
-                    cursor.y = i
+# マウスの座標からマスを計算する（マスのすき間ではそのまま）
+def cursor_loc(mouse, cursor):
+
+    lay = layout.get()
+
+    if lay.on_board(mouse.x, mouse.y):
+
+        cell = lay.cell_at(mouse.x, mouse.y)
+
+        if cell is not None:
+            cursor.x = cell[0]
+            cursor.y = cell[1]
+
     else: # 枠外
         cursor.x = -1
         cursor.y = -1
@@ -68,9 +72,10 @@ def cursor_loc(field_location, mouse, cursor):
 
 # カーソル表示
 def cursor_disp(field_location, cursor):
-    
-    for i in range(0, 4):
-        for j in range(0, 4):
-            if cursor.x == j and cursor.y == i:
-                
-                lm.screen.blit(pygame.transform.scale(images.img_cursor, [96*lm.resol[0]/1920, 96*lm.resol[1]/1080]), field_location[cursor.y][cursor.x][0])
\ No newline at end of file
+
+    if cursor.x >= 0 and cursor.y >= 0:
+
+        lm.screen.blit(images.scale(images.img_cursor, field_location[cursor.y][cursor.x][2]), field_location[cursor.y][cursor.x][0])
+
+        # 差分描画に報告
+        dirty.mark('cursor', [field_location[cursor.y][cursor.x][0], field_location[cursor.y][cursor.x][2]], (cursor.x, cursor.y))
@@ -1,10 +1,69 @@
 import pygame
+from collections import OrderedDict
 
 import lattitle_main as lm
 
+
+# 描画した文字のキャッシュ
+# キーは（フォント, 文字列, アンチエイリアス, 色）
+text_cache = OrderedDict()
+
+# キャッシュの上限（古いものから捨てる）
+TEXT_CACHE_MAX = 256
+
+# キャッシュに当たった回数と外れた回数
+render_hits = 0
+render_misses = 0
+
+
+# 文字のキャッシュを削除
+def clear_text():
+
+    global render_hits
+    global render_misses
+
+    text_cache.clear()
+    render_hits = 0
+    render_misses = 0
+
+
+# 文字を描画する
+# 同じフォント、文字列、色ならキャッシュを返す
+def render(font, text, antialias, color):
+
+    global render_hits
+    global render_misses
+
+    key = (font, text, antialias, color)
+    txt = text_cache.get(key)
+
+    if txt is None:
+
+        render_misses += 1
+
+        txt = font.render(text, antialias, color)
+        text_cache[key] = txt
+
+        # 上限を超えたら一番使われていないものを捨てる
+        if len(text_cache) > TEXT_CACHE_MAX:
+            text_cache.popitem(last=False)
+
+    else:
+
+        render_hits += 1
+
+        # 最近使ったものを後ろに
+        text_cache.move_to_end(key)
+
+    return txt
+
+
 def init():
 
     resol = lm.resol
+
+    # フォントを作り直すので文字のキャッシュも捨てる
+    clear_text()
     
     # コマンドフォント
     global com_font
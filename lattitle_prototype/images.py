@@ -1,51 +1,192 @@
 import pygame
+import glob
+from collections import OrderedDict
+
+import atlas
+
+import lattitle_main as lm
+
+
+# 読みこんだ画像
+# キーは data_list からのパス（例："images/system/caution.png"）
+assets = {}
+
+# 起動時にまとめて読みこむ画像
+PRELOAD = ["images/system/*.png",
+           "images/effects/*.png",
+           "items/images/*.png",
+           "enemies/enemy_*/images/*.png",
+           "players/player_*/images/*.png"]
+
+# アトラス（１枚のシート）にまとめる画像
+# 毎フレームたくさん描く小さい画像だけ
+ATLAS = ["images/system/*.png",
+         "images/effects/*.png",
+         "items/images/*.png"]
+
+# 起動後に読みこんだ回数（ゲーム中にディスクを読んでいないか確認する用）
+late_loads = 0
+
+
+# 拡大縮小した画像のキャッシュ
+# キーは（元画像, 横幅, 縦幅）
+scaled_cache = OrderedDict()
+
+# キャッシュを作ったときの解像度
+scaled_resol = []
+
+# キャッシュの上限（古いものから捨てる）
+SCALED_CACHE_MAX = 512
+
+
+# 拡大縮小した画像のキャッシュを削除
+# 解像度や画面モードが変わったときに呼ぶ
+def clear_scaled():
+
+    global scaled_resol
+
+    scaled_cache.clear()
+    scaled_resol = list(lm.resol)
+
+
+# 画像を拡大縮小する
+# 同じ画像と同じサイズならキャッシュを返す
+def scale(img, size):
+
+    # 解像度が変わっていたらキャッシュを作り直す
+    if scaled_resol != lm.resol:
+        clear_scaled()
+
+    # pygame.transform.scale と同じく小数点以下は切り捨て
+    width = int(size[0])
+    height = int(size[1])
+
+    key = (img, width, height)
+    scaled = scaled_cache.get(key)
+
+    if scaled is None:
+
+        scaled = pygame.transform.scale(img, [width, height])
+        scaled_cache[key] = scaled
+
+        # 上限を超えたら一番使われていないものを捨てる
+        if len(scaled_cache) > SCALED_CACHE_MAX:
+            scaled_cache.popitem(last=False)
+
+    else:
+
+        # 最近使ったものを後ろに
+        scaled_cache.move_to_end(key)
+
+    return scaled
+
+
+# 画像を読みこんで画面と同じ形式に変換する
+def load_file(name):
+
+    img = pygame.image.load("./data_list/" + name)
+
+    # 透明度があるなら convert_alpha、ないなら convert
+    if img.get_flags() & pygame.SRCALPHA:
+        return img.convert_alpha()
+    else:
+        return img.convert()
+
+
+# 起動時に画像をまとめて読みこむ
+def preload():
+
+    for pattern in PRELOAD:
+
+        imgs = {}
+
+        for p in glob.glob("./data_list/" + pattern):
+            name = p[len("./data_list/"):].replace("\\", "/")
+            imgs[name] = load_file(name)
+
+        # アトラスにまとめて、部分画像を登録する
+        if pattern in ATLAS:
+            imgs = atlas.build(pattern, imgs)
+
+        assets.update(imgs)
+
+
+# 名前から画像を取得する
+# 読みこんでいなければ読みこんで、回数を数える
+def get(name):
+
+    global late_loads
+
+    img = assets.get(name)
+
+    if img is None:
+        late_loads += 1
+        img = load_file(name)
+        assets[name] = img
+
+    return img
+
 
 def init():
 
+    global late_loads
+
+    # 拡大縮小した画像のキャッシュを初期化
+    clear_scaled()
+
+    # 画像をまとめて読みこむ
+    atlas.clear()
+    preload()
+    late_loads = 0
+
     # ゲージ類画像
     global img_hp_gauge
-    img_hp_gauge = pygame.image.load("./data_list/images/system/hp_gauge.png")
+    img_hp_gauge = get("images/system/hp_gauge.png")
 
     global img_mp_gauge
-    img_mp_gauge = pygame.image.load("./data_list/images/system/mp_gauge.png")
+    img_mp_gauge = get("images/system/mp_gauge.png")
 
     global img_action_gauge
-    img_action_gauge = pygame.image.load("./data_list/images/system/action_gauge.png")
+    img_action_gauge = get("images/system/action_gauge.png")
 
     # カーソル画像
     global img_cursor
-    img_cursor = pygame.image.load("./data_list/images/system/cursor.png")
+    img_cursor = get("images/system/cursor.png")
 
     # 選択中画像
     global img_ready
-    img_ready = pygame.image.load("./data_list/images/system/ready_frame.png")
+    img_ready = get("images/system/ready_frame.png")
     
     global img_stay
-    img_stay = pygame.image.load("./data_list/images/system/stay_frame.png")
+    img_stay = get("images/system/stay_frame.png")
 
     # アイテム選択中画像
     global img_item_frame
-    img_item_frame = pygame.image.load("./data_list/images/system/item_frame.png")
+    img_item_frame = get("images/system/item_frame.png")
     
     global img_picked_item_frame
-    img_picked_item_frame = pygame.image.load("./data_list/images/system/picked_item_frame.png")
+    img_picked_item_frame = get("images/system/picked_item_frame.png")
 
     # ぼうぎょ時画像（後で変更）
     global img_defense
-    img_defense = pygame.image.load("./data_list/images/system/defense.png")
+    img_defense = get("images/system/defense.png")
 
     # 名前背景画像
     global img_name_back
-    img_name_back = pygame.image.load("./data_list/images/system/name_back.png")
+    img_name_back = get("images/system/name_back.png")
 
     # コマンド背景画像
     global img_command_back
-    #img_command_back = pygame.image.load("./data_list/images/system/pop_up_back.png")
-    img_command_back = pygame.image.load("./data_list/images/system/command_back.png")
+    #img_command_back = get("images/system/pop_up_back.png")
+    img_command_back = get("images/system/command_back.png")
 
     # 敵思考枠画像
     global img_enemy_thought
-    img_enemy_thought = pygame.image.load("./data_list/images/system/enemy_thought.png")
+    img_enemy_thought = get("images/system/enemy_thought.png")
 
     global img_enemy_thought_right
-    img_enemy_thought_right = pygame.image.load("./data_list/images/system/enemy_thought_right.png")
\ No newline at end of file
+    img_enemy_thought_right = get("images/system/enemy_thought_right.png")
+
+    # 攻撃範囲の警告画像
+    global img_caution
+    img_caution = get("images/system/caution.png")
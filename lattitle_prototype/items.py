@@ -2,13 +2,16 @@
 from data_list.items import addition
 
 import pygame
-import random
 
 import fonts
 import images
+import dirty
+import combat_text
+import layout
 import colors
 import buttons
 import classes
+import effects
 import lattitle_main as lm
 
 #addition.sushi.hi()
@@ -20,7 +23,7 @@ class Item:
         self.name = str(list[0])
         self.disp_name = str(list[1])
         self.amount = int(list[2])
-        self.image = pygame.image.load("./data_list/items/images/" + self.name + ".png")
+        self.image = images.get("items/images/" + self.name + ".png")
 
 # アイテム一括型変換（初期化）
 def init(item):
@@ -30,35 +33,35 @@ def init(item):
 
 
 # アイテムメニューのページ関連を表示
+# （ページめくり用のボタンは背景に合成済み）
 def page_disp(side_page, side_page_max):
-    # ページめくり用のボタン
-    pygame.draw.rect(lm.screen, colors.SILVER, buttons.side_left_button)
-    pygame.draw.rect(lm.screen, colors.SILVER, buttons.side_right_button)
 
     # ページ数の表示
     page_txt = str(side_page) + ' / ' + str(side_page_max)
-    page_txt = fonts.side_button_font.render(page_txt, True, colors.BLACK)
-    page_place = page_txt.get_rect(center=(1440*lm.resol[0]/1920, 984*lm.resol[1]/1080))
+    page_txt = fonts.render(fonts.side_button_font, page_txt, True, colors.BLACK)
+    page_place = page_txt.get_rect(center=layout.get().page_text)
     lm.screen.blit(page_txt, page_place)
 
+    # 差分描画に報告
+    dirty.mark('page', layout.get().page_area, (side_page, side_page_max))
+
 
 # アイテム選択
 def choice(item, page, mouse):
 
+    lay = layout.get()
+
     # 現在のページのみ
     for i in range(len(item)%20):
         
-        # アイテムの画像の範囲変数
-        item_left = (1056+(i%5)*(96+72))*lm.resol[0]/1920
-        item_right = (1056+(i%5)*(96+72)+96)*lm.resol[0]/1920
-        item_top = (264+int(i/5)*(96+72))*lm.resol[1]/1080
-        item_bottom = (264+int(i/5)*(96+72)+96)*lm.resol[1]/1080
-        
         # 選択中のアイテム
-        if item_left <= mouse.x < item_right and item_top <= mouse.y < item_bottom:
+        if lay.item_slots[i].collidepoint(mouse.x, mouse.y):
             
             # 選択中のアイテムの枠を表示
-            lm.screen.blit(pygame.transform.scale(images.img_item_frame, [128*lm.resol[0]/1920, 128*lm.resol[1]/1080]), [(1056+(i%5)*(96+72)-16)*lm.resol[0]/1920, (264+int(i/5)*(96+72)-16)*lm.resol[1]/1080])
+            lm.screen.blit(images.scale(images.img_item_frame, lay.item_frames[i].size), lay.item_frames[i])
+
+            # 差分描画に報告
+            dirty.mark('item_choice', lay.item_frames[i], i)
 
             # カーソルが選んでいるアイテム番号を返す
             return i + (page - 1) * 20
@@ -67,14 +70,19 @@ def choice(item, page, mouse):
 # アイテム表示
 def disp(item, page):
 
+    lay = layout.get()
+
     # 現在のページのみ表示
     for i in range(len(item)%20):
         # アイテム画像表示
-        lm.screen.blit(pygame.transform.scale(item[i+(page-1)*20].image, [96*lm.resol[0]/1920, 96*lm.resol[1]/1080]), [(1056+(i%5)*(96+72))*lm.resol[0]/1920, (264+int(i/5)*(96+72))*lm.resol[1]/1080])
+        lm.screen.blit(images.scale(item[i+(page-1)*20].image, lay.item_slots[i].size), lay.item_slots[i])
         
         # 右下にアイテムの個数表示
-        amount_txt = fonts.item_amount_font.render(str(item[i+(page-1)*20].amount), True, colors.BLACK)
-        lm.screen.blit(amount_txt, amount_txt.get_rect(bottomright=((1056+96+(i%5)*(96+72))*lm.resol[0]/1920, (264+96+int(i/5)*(96+72))*lm.resol[1]/1080)))
+        amount_txt = fonts.render(fonts.item_amount_font, str(item[i+(page-1)*20].amount), True, colors.BLACK)
+        lm.screen.blit(amount_txt, amount_txt.get_rect(bottomright=lay.item_slots[i].bottomright))
+
+    # 差分描画に報告　アイテムの個数が変わったときだけ更新
+    dirty.mark('items', lay.items_area, (page, tuple(item[i].amount for i in range(len(item)))))
 
 
 # アイテム使用
@@ -139,10 +147,8 @@ def potion(player, select_player, health_disp):
     over_HP_cut(player[select_player])
 
 
-    heal.append(1)
     # 横軸をプレイヤーの位置に
-    heal.extend([(264+player[select_player].cur_location[0]*(96+16)+random.randrange(96))*lm.resol[0]/1920, (552+player[select_player].cur_location[1]*(96+16))*lm.resol[1]/1080])
-    health_disp.append(heal)
+    health_disp.add(heal[0], 1, combat_text.player_place(player[select_player].cur_location), player[select_player])
 
 
 # マナポーション
@@ -158,19 +164,16 @@ def mana_potion(player, select_player, mana_disp):
     over_MP_cut(player[select_player])
 
 
-    heal.append(1)
     # 横軸をプレイヤーの位置に
-    heal.extend([(264+player[select_player].cur_location[0]*(96+16)+random.randrange(96))*lm.resol[0]/1920, (552+player[select_player].cur_location[1]*(96+16))*lm.resol[1]/1080])
-    mana_disp.append(heal)
+    mana_disp.add(heal[0], 1, combat_text.player_place(player[select_player].cur_location), player[select_player])
 
 
 # ハヤブサの羽
-def falcon_feather(player, select_player):
+def falcon_feather(player, select_player, health_disp):
 
 
     # すばやさを上げる
-    player[select_player].effect.append(classes.Buff_Debuff(['buff', 'speed_up', 10, 0, 50]))
-    player[select_player].effect[len(player[select_player].effect)-1].image = pygame.image.load("./data_list/images/effects/speed_up.png")
+    effects.apply(player[select_player], classes.Buff_Debuff(['buff', 'speed_up', 10, 0, 50]), health_disp)
 
 
 
@@ -186,4 +189,4 @@ def item_exe(player, enemy, select_player, name, health_disp, mana_disp):
 
     elif name == 'falcon_feather':
 
-        falcon_feather(player, select_player)
\ No newline at end of file
+        falcon_feather(player, select_player, health_disp)
\ No newline at end of file
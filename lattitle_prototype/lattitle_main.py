@@ -23,6 +23,9 @@ import buttons
 import field
 
 import effects
+import combat_text
+import dirty
+import layout
 
 import players
 import enemies
@@ -31,16 +34,39 @@ import items
 
 import main_menu
 import side_menu
+import layers
+import sim_clock
+import engine
+import replay
+import board
+import planner
+import autobattle
 
 print('!')
 
-# １秒当たりのフレーム数
+# １秒当たりのロジックの更新回数（ゲームの時間はこの間隔で進む）
 fps = 90
 
+# １秒当たりの描画回数の上限（60や30に下げてもゲームの進み方は変わらない）
+render_fps = 90
+
 # 解像度
 resol = [1440, 810]
 
-screen = pygame.display.set_mode(resol)
+# 盤面の大きさ　[横, 縦]（４以上　6*6 や 8*8 も使える）
+board_size = [4, 4]
+
+# 敵のこうどうをプランナーで選ぶ（False なら重みつきの抽選）
+enemy_planner = False
+
+# 自動戦闘　プレイヤーをボットが動かす（デモや放置での動作テスト用）
+auto_battle = False
+
+# 差分描画　変化した範囲だけ画面を更新する（低スペック向け）
+dirty_rect = False
+
+# 画面（main で作る　import しただけでは画面を開かない）
+screen = None
 
 # 表示中の画面
 current_display = "main_menu"
@@ -49,14 +75,16 @@ current_display = "main_menu"
 side_display = "players"
 
 
-def main():
-    pygame.init()
-    pygame.display.set_caption("ラティトル")
-    
+# record_path は入力を記録するファイル、replay_path は再生するファイル
+def main(record_path=None, replay_path=None):
     global screen
     global current_display
     global side_display
 
+    pygame.init()
+    screen = pygame.display.set_mode(resol)
+    pygame.display.set_caption("ラティトル")
+
     clock = pygame.time.Clock()
     
     # フォント初期化
@@ -71,27 +99,30 @@ def main():
     # ゲーム終了後の余韻
     afterglow = -1
 
+    # 自動戦闘のボット（戦闘を始めるときに作る）
+    bot = None
+
     # カーソル位置
     cursor = classes.Cursor()
 
     # マウスカーソル
     mouse = classes.Mouse(pygame.mouse.get_pos())
 
+    # 盤面の大きさ
+    board.configure(board_size)
+
     # 盤面の状態　cursorとはx,yが逆　（位置は同じだけどインデックスが逆）
     # （追加効果をつける）
-    field_status = [[0, 0, 0, 0],
-                    [0, 0, 0, 0],
-                    [0, 0, 0, 0],
-                    [0, 0, 0, 0]]
-    
+    field_status = []
+
     # 盤面の各マスの座標　cursorとx,yが逆　（位置は同じだけどインデックスが逆）
-    field_location = [[[[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]]],
-                      [[[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]]],
-                      [[[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]]],
-                      [[[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]]]]
-    
-    # 盤面初期化    
+    field_location = []
+
+    # 盤面初期化（盤面の大きさで作る）
     field.init(field_location, field_status)
+
+    # 背景初期化
+    layers.init(field_location)
     
     
     # データを格納
@@ -119,6 +150,7 @@ def main():
 
     # 今回のプレイヤーを追加
     players.player_choice(player, player_data, current_player, field_status)  
+    players.load_images(player)
 
     # プレイヤーカラー初期化
     colors.init(player)
@@ -132,10 +164,10 @@ def main():
     
 
     # HPの増減を表示
-    health_disp = []
+    health_disp = combat_text.Combat_text(colors.GREEN, colors.RED)
 
     # MPの増減を表示
-    mana_disp = []
+    mana_disp = combat_text.Combat_text(colors.BLUEVIOLET, colors.BLUEVIOLET)
 
     # 押しているボタン
     press_button = -1
@@ -157,6 +189,10 @@ def main():
     # アイテムの型変更（初期化）
     items.init(item)
 
+    # 前回のフレームの画面（差分描画用）
+    prev_display = None
+    prev_side_display = None
+
     # アイテム追加（チュートリアル用）
     items.add(item, ['falcon_feather', 'ハヤブサの羽', 2])
 
@@ -167,41 +203,74 @@ def main():
 
     # （アイテム２０個以上のデバッグはしてない）
 
+    # 入力の記録と再生
+    recorder = None
+    replayer = None
+
+    if replay_path is not None:
+        replayer = replay.Replayer(replay_path)
+        # 記録したときと同じ乱数の種
+        seed = replayer.seed
+    else:
+        # 戦闘の乱数の種
+        seed = random.randrange(2**32)
+        if record_path is not None:
+            recorder = replay.Recorder(record_path, seed)
+
+    # ゲームの時間を初期化
+    sim_clock.reset()
+
     while True:
         tmr = tmr + 1  
 
-        # 外枠
-        screen.fill(colors.BLACK)
-        pygame.draw.rect(screen, colors.WHITE, [[0, 0], resol])
+        # 今回のフレームで進めるロジックの回数
+        steps = sim_clock.advance()
 
-        # マウスカーソル
-        mouse.update(pygame.mouse.get_pos())
+        # 再生中は記録のとおりに進める（記録が終わったら終了）
+        if replayer is not None:
+            if replayer.next_frame() == False:
+                if bot is not None:
+                    bot.close()
+                pygame.quit()
+                sys.exit()
+            steps = replayer.steps()
 
-        # マウスクリック
-        m_btnl, m_btnm, m_btnr = pygame.mouse.get_pressed()
+        # 背景（外枠、サイドメニュー、盤面などの変わらない部分は合成済み）
+        if current_display == "game_play":
+            screen.blit(layers.background("game_play_" + side_display), [0, 0])
+        else:
+            screen.blit(layers.background(current_display), [0, 0])
+
+        # マウスの位置とボタン（再生中は記録から）
+        if replayer is not None:
+            mouse_pos = replayer.mouse_pos()
+            mouse_pressed = replayer.mouse_pressed()
+        else:
+            mouse_pos = pygame.mouse.get_pos()
+            mouse_pressed = pygame.mouse.get_pressed()
 
+        # マウスカーソル
+        mouse.update(mouse_pos)
 
-        # メインメニュー
-        if current_display == "main_menu":
+        # マウスクリック
+        m_btnl, m_btnm, m_btnr = mouse_pressed
 
-            # メインメニューを表示
-            main_menu.disp_main_menu()
 
         # 設定画面
         if current_display == "title_option":
 
-            option_txt = fonts.option_font.render("設定", True, colors.BLACK)
+            option_txt = fonts.render(fonts.option_font, "設定", True, colors.BLACK)
             option_place = option_txt.get_rect(center=(960*resol[0]/1920, 330*resol[1]/1080))
             screen.blit(option_txt, option_place)
 
         # 結果
         if current_display == "result":
 
-            if game_clear == True:
-                result_txt = fonts.result_font.render("ゲームクリア", True, colors.BLACK)
+            if battle.game_clear == True:
+                result_txt = fonts.render(fonts.result_font, "ゲームクリア", True, colors.BLACK)
 
-            if game_over == True:
-                result_txt = fonts.result_font.render("ゲームオーバー", True, colors.BLACK)
+            if battle.game_over == True:
+                result_txt = fonts.render(fonts.result_font, "ゲームオーバー", True, colors.BLACK)
 
             result_place = result_txt.get_rect(center=(960*resol[0]/1920, 330*resol[1]/1080))
             screen.blit(result_txt, result_place)
@@ -209,31 +278,57 @@ def main():
 
         if current_display == "game_play":
 
-            # サイドメニューを表示
-            side_menu.disp_side_menu()
+            # ロジック　決まった間隔で進める（描画のフレームレートとは関係ない）
+            # 押されたボタンは最初の１回だけ使う
+            step_button = press_button
+
+            for step in range(steps):
+
+                # 戦闘を１回進める（自動戦闘ならボットの入力で）
+                if bot is not None:
+                    battle.step(*bot.poll(battle))
+                else:
+                    battle.step(select_player, step_button, picked_item)
+                step_button = -1
+
+                # 選択中のプレイヤーが死んだら選択を外す
+                if select_player != -1 and player[select_player].alive == False:
+                    select_player = -1
+
+                # ゲームクリアかゲームオーバーで結果画面へ
+                if battle.finished() == True:
+                    
+                    if afterglow <= -1:
+
+                        afterglow = 5.0
+
+                    afterglow -= 1 / fps
+
+                    if afterglow <= 0:
+                    
+                        current_display = 'result'
+
+                        # 戦闘が終わったのでボットのプロセスも終わらせる
+                        if bot is not None:
+                            bot.close()
+                            bot = None
+
+                        break
+
+
+            # 描画
 
             # サイドメニュー プレイヤー
             if side_display == "players":
-                
-                # 選択時のボタン
-                pygame.draw.rect(screen, colors.BEIGE_CAMEO, buttons.players_button)
 
                 # プレイヤーアイコンを表示
                 players.disp_player_icon(player)
                 
                 # プレイヤーのゲージ類を表示
                 players.disp_gauge(player)
-            
-            
-            players_txt = fonts.side_button_font.render("プレイヤー", True, colors.BLACK)
-            players_place = players_txt.get_rect(center=(1104*resol[0]/1920, 152*resol[1]/1080))
-            screen.blit(players_txt, players_place)
 
             # サイドメニュー アイテム
             if side_display == "items":
-                
-                # 選択時のボタン
-                pygame.draw.rect(screen, colors.BEIGE_CAMEO, buttons.items_button)
 
                 # ページ関連を表示
                 items.page_disp(side_page, side_page_max)
@@ -243,16 +338,15 @@ def main():
 
                 # 決定中のアイテムの枠を表示
                 if picked_item != -1:
-                    screen.blit(pygame.transform.scale(images.img_picked_item_frame, [128*resol[0]/1920, 128*resol[1]/1080]), [(1056+(picked_item%5)*(96+72)-16)*resol[0]/1920, (264+int(picked_item/5)*(96+72)-16)*resol[1]/1080])
+                    picked_frame = layout.get().item_frames[picked_item%20]
+                    screen.blit(images.scale(images.img_picked_item_frame, picked_frame.size), picked_frame)
+
+                    # 差分描画に報告
+                    dirty.mark('picked_item', picked_frame, picked_item)
 
                 # アイテム表示
                 items.disp(item, side_page)
 
-
-            items_txt = fonts.side_button_font.render("アイテム", True, colors.BLACK)
-            items_place = items_txt.get_rect(center=(1368*resol[0]/1920, 152*resol[1]/1080))
-            screen.blit(items_txt, items_place)
-
             
             # 設定画面　設定画面を開いている間はゲームの時間を停止する
             #pygame.draw.rect(screen, colors.SILVER, buttons.game_option_button)
@@ -261,7 +355,7 @@ def main():
 
 
             # カーソル位置
-            field.cursor_loc(field_location, mouse, cursor)
+            field.cursor_loc(mouse, cursor)
 
             # 敵を表示
             enemies.disp_enemy(enemy)
@@ -276,13 +370,6 @@ def main():
             # コマンドポップアップ表示
             command.command_pop_up(player, select_player, mouse, item, picked_item)
 
-                
-            # 盤面
-            field.field_disp(field_location, field_status)
-            
-
-            # プレイヤーの移動
-            move.move(player)
 
             # プレイヤーの移動経路を表示
             move.disp_player_route(player)
@@ -291,40 +378,20 @@ def main():
             # プレイヤー表示
             players.disp_player(player, select_player)
 
-            # プレイヤーの行動　
-            action.player_action(player, enemy, item, select_player, press_button, picked_item, health_disp, mana_disp)
-
-
-            # プレイヤー行動ゲージチャージ
-            action.player_action_chaege(player)
+            # 敵のこうどうを表示
+            action.disp_enemy_action(enemy)
 
-            # 敵行動ゲージチャージ
-            action.enemy_action_charge(enemy)
+            # 敵のパッシブを表示
+            enemies.disp_passive(enemy)
 
-            # 敵の行動を実行
-            action.enemy_action(player, enemy, health_disp)
-
-            # 敵のパッシブ
-            enemies.enemy_passive(enemy)
-
-            # プレイヤーの状態異常
-            effects.player_effect(player, enemy, health_disp, mana_disp, side_display)
-
-            # 徐々にHPを変動
-            players.HP_fluct(player)
-
-            enemies.HP_fluct(enemy)
+            # プレイヤーの状態異常を表示
+            effects.disp_effect(player, side_display)
 
             # HPの変動を表示
-            attack.disp_health_fluct(health_disp)
-
-            # MPの自動回復
-            players.MP_heal(player)
-
-            enemies.MP_heal(enemy)
+            health_disp.disp()
 
             # MPの変動を表示
-            magic.disp_mana_fluct(mana_disp)
+            mana_disp.disp()
 
             # カーソル表示
             field.cursor_disp(field_location, cursor)
@@ -344,7 +411,7 @@ def main():
                 # プレイヤーを選択
                 if not m_line: # 経路選択中にカーソルが通っても選択されないように
                     for i in range(len(player)):
-                        if (264+player[i].cur_location[0]*(96+16))*resol[0]/1920 <= mouse.x < (264+player[i].cur_location[0]*(96+16)+96)*resol[0]/1920 and (552+player[i].cur_location[1]*(96+16))*resol[1]/1080 <= mouse.y < (552+player[i].cur_location[1]*(96+16)+96)*resol[1]/1080:
+                        if pygame.Rect(layout.get().board_rect(player[i].cur_location)).collidepoint(mouse.x, mouse.y):
                             if player[i].alive == True:
                                 select_player = i
 
@@ -359,62 +426,39 @@ def main():
                 m_line = []
                 start_point = []
 
-
-            # 敵の死亡判定
-            enemies.enemy_death(enemy)
-
-            # プレイヤーの死亡判定
-            players.player_death(player, field_status)
-            if select_player != -1 and player[select_player].alive == False:
-                select_player = -1
-
-            # ゲームクリアフラグ
-            game_clear = True
-
-            # ゲームオーバーフラグ
-            game_over = True
-
-            # 敵が全滅したらゲームクリア
-            for i in range(len(enemy)):
-
-                if enemy[i].alive == True:
-
-                    game_clear = False
-                    break
-
-            # プレイヤーが全滅したらゲームオーバー
-            for i in range(len(player)):
-
-                if player[i].alive == True:
-
-                    game_over = False
-                    break
-
-            # ゲームクリアかゲームオーバーで結果画面へ
-            if game_clear == True or game_over == True:
-                
-                if afterglow <= -1:
-
-                    afterglow = 5.0
-
-                afterglow -= 1 / fps
-
-                if afterglow <= 0:
-                
-                    current_display = 'result'
-
             
 
+        # 画面が切り替わったら全体を更新
+        if current_display != prev_display or side_display != prev_side_display:
+            dirty.full_update()
+            prev_display = current_display
+            prev_side_display = side_display
+
         # 画面更新
-        pygame.display.update()
+        dirty.flip()
 
-        # 押されたボタン
-        press_button = -1  
+        # 押されたボタン（ロジックで使ったら消す）
+        if steps > 0:
+            press_button = -1  
 
         # イベント類
         #events.func(player, mouse, select_player, side_page, side_page_max, choice_item)
-        for event in pygame.event.get():
+        events = pygame.event.get()
+
+        # 再生中は記録したイベントを使う
+        if replayer is not None:
+            events = replayer.events()
+
+        # 入力を記録
+        if recorder is not None:
+            recorder.frame(steps, mouse_pos, mouse_pressed, events)
+
+        for event in events:
             if event.type == pygame.QUIT:
+                if recorder is not None:
+                    recorder.save()
+                if bot is not None:
+                    bot.close()
                 pygame.quit()
                 sys.exit()
             
@@ -426,7 +470,26 @@ def main():
                     if buttons.game_play_button.collidepoint(event.pos):
                         current_display = "game_play"
                         enemies.enemy_choice(enemy, enemy_data, current_enemy)
+                        enemies.load_images(enemy)
+                        # 前の戦闘の表示を残さない
+                        health_disp.clear()
+                        mana_disp.clear()
+                        battle = engine.Battle(player, enemy, item, field_status, health_disp, mana_disp, seed)
+                        if enemy_planner == True:
+                            # 記録・再生中は時間制限なし（実行速度で敵のこうどうが変わると再生がずれる）
+                            if recorder is not None or replayer is not None:
+                                battle.planner = planner.Planner(None)
+                            else:
+                                battle.planner = planner.Planner()
+                        if auto_battle == True:
+                            # 記録・再生中は同じプロセスで回数だけで止める（探し終わる時間で入力がずれると再生がずれる）
+                            if recorder is not None or replayer is not None:
+                                bot = autobattle.Bot(budget=None, processes=0, seed=seed)
+                            else:
+                                bot = autobattle.Bot()
                         start_point = []
+                        # メニューにいた間の時間は進めない
+                        sim_clock.reset()
                     # 設定画面へ
                     #if buttons.title_option_button.collidepoint(event.pos):
                         #current_display = "title_option"
@@ -476,10 +539,31 @@ def main():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_F1:
                     screen = pygame.display.set_mode(resol, pygame.FULLSCREEN)
+                    # 拡大縮小した画像を作り直す
+                    images.clear_scaled()
+                    layers.clear()
+                    dirty.full_update()
                 if event.key == pygame.K_F2 or event.key == pygame.K_ESCAPE:
                     screen = pygame.display.set_mode(resol)
+                    # 拡大縮小した画像を作り直す
+                    images.clear_scaled()
+                    layers.clear()
+                    dirty.full_update()
 
-        clock.tick(fps)
+        clock.tick(render_fps)
 
 if __name__ == '__main__':
-    main()
+
+    # 使い方：python lattitle_main.py [--record ファイル] [--replay ファイル]
+    record_path = None
+    replay_path = None
+
+    if "--record" in sys.argv:
+        record_path = sys.argv[sys.argv.index("--record") + 1]
+    if "--replay" in sys.argv:
+        replay_path = sys.argv[sys.argv.index("--replay") + 1]
+
+    # 他のモジュールが import している lattitle_main の方で動かす
+    # （このファイルを直接実行すると __main__ と lattitle_main が別々にできるため）
+    import lattitle_main
+    lattitle_main.main(record_path, replay_path)
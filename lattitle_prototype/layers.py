@@ -0,0 +1,107 @@
+import pygame
+
+import colors
+import fonts
+import buttons
+
+import side_menu
+import main_menu
+import field
+import command
+
+import lattitle_main as lm
+
+
+# 毎フレーム変わらない背景を解像度ごとに１枚の画像に合成しておく
+# フレームの最初にこれを１回描くだけにする
+
+# 合成済みの背景
+# キーは背景の名前
+layer_cache = {}
+
+# 合成したときの解像度
+layer_resol = []
+
+# 盤面の各マスの座標
+field_location = None
+
+
+# 初期化
+def init(location):
+
+    global field_location
+
+    field_location = location
+
+    clear()
+
+
+# 合成済みの背景を削除
+# 解像度や画面モードが変わったときに呼ぶ
+def clear():
+
+    global layer_resol
+
+    layer_cache.clear()
+    layer_resol = list(lm.resol)
+
+
+# 背景を取得する（なければ合成する）
+def background(name):
+
+    # 解像度が変わっていたら作り直す
+    if layer_resol != lm.resol:
+        clear()
+
+    surface = layer_cache.get(name)
+
+    if surface is None:
+        surface = build(name)
+        layer_cache[name] = surface
+
+    return surface
+
+
+# 背景を合成する
+def build(name):
+
+    # 画面と同じ形式にしておく（描画が速くなる）
+    surface = pygame.Surface(lm.resol).convert()
+
+    # 外枠
+    surface.fill(colors.WHITE)
+
+    # メインメニュー
+    if name == "main_menu":
+        main_menu.disp_main_menu(surface)
+
+    # プレイ画面（サイドメニューの選択中のタブごとに作る）
+    if name == "game_play_players" or name == "game_play_items":
+
+        # サイドメニュー
+        side_menu.disp_side_menu(surface)
+
+        # 選択中のタブ
+        if name == "game_play_players":
+            pygame.draw.rect(surface, colors.BEIGE_CAMEO, buttons.players_button)
+        else:
+            pygame.draw.rect(surface, colors.BEIGE_CAMEO, buttons.items_button)
+
+            # ページめくり用のボタン
+            pygame.draw.rect(surface, colors.SILVER, buttons.side_left_button)
+            pygame.draw.rect(surface, colors.SILVER, buttons.side_right_button)
+
+        # タブの名前
+        players_txt = fonts.render(fonts.side_button_font, "プレイヤー", True, colors.BLACK)
+        surface.blit(players_txt, players_txt.get_rect(center=(1104*lm.resol[0]/1920, 152*lm.resol[1]/1080)))
+
+        items_txt = fonts.render(fonts.side_button_font, "アイテム", True, colors.BLACK)
+        surface.blit(items_txt, items_txt.get_rect(center=(1368*lm.resol[0]/1920, 152*lm.resol[1]/1080)))
+
+        # コマンドの背景
+        command.disp_back(surface)
+
+        # 盤面
+        field.field_disp(surface, field_location)
+
+    return surface
@@ -0,0 +1,199 @@
+import pygame
+import math
+
+import board
+
+import lattitle_main as lm
+
+
+# 画面の配置
+# 1920*1080 の設計座標から、解像度ごとに一度だけ計算しておく
+# 描画や当たり判定はここから座標を読む
+
+# 現在の配置
+current = None
+
+
+# 配置を取得する（解像度か盤面の大きさが変わっていたら作り直す）
+def get():
+
+    global current
+
+    if current is None or current.resol != lm.resol or current.board_size != [board.width, board.height]:
+        current = Layout(lm.resol)
+
+    return current
+
+
+class Layout:
+
+    def __init__(self, resol):
+
+        # 作ったときの解像度
+        self.resol = list(resol)
+
+        # 設計座標からの倍率
+        self.sx = resol[0] / 1920
+        self.sy = resol[1] / 1080
+
+        # 作ったときの盤面の大きさ
+        self.board_size = [board.width, board.height]
+
+        # 盤面
+        # 4*4 の盤面が 464*464 の枠に入る大きさを元に、マスの数が増えたら枠に入るようにマスを小さくする
+        # 盤面のマスの大きさの倍率（4*4 なら１）
+        self.cell_scale = (448 / max(board.width, board.height)) / (96+16)
+
+        # マスの大きさとすき間（設計座標）
+        self.cell_design = 96 * self.cell_scale
+        gap = 16 * self.cell_scale
+
+        # 左上のマスの座標、マスの大きさ、マスの間隔（マス＋すき間）
+        self.board_origin = [(248+gap) * self.sx, (536+gap) * self.sy]
+        self.cell_size = [self.cell_design * self.sx, self.cell_design * self.sy]
+        self.cell_pitch = [(self.cell_design+gap) * self.sx, (self.cell_design+gap) * self.sy]
+
+        # 盤面の枠
+        self.board = self.rect(248, 536, gap+board.width*(self.cell_design+gap), gap+board.height*(self.cell_design+gap))
+
+        # 各マス　cells[ｙ軸][ｘ軸]
+        self.cells = [[self.rect(248+gap+x*(self.cell_design+gap), 536+gap+y*(self.cell_design+gap), self.cell_design, self.cell_design) for x in range(board.width)] for y in range(board.height)]
+
+        # 移動経路の線の太さ
+        self.route_width = int(16 * self.cell_scale * self.sx)
+
+        # コマンド
+        self.command_back = self.rect(248, 448, 464, 64)
+        self.command_buttons = [self.rect(264+i*(96+16), 456, 96, 48) for i in range(4)]
+
+        # コマンドポップアップ　文字の列と行
+        self.pop_up = self.rect(248, 336, 464, 96)
+        self.pop_up_cols = [252 * self.sx, 406 * self.sx, 559 * self.sx]
+        self.pop_up_rows = [340 * self.sy, 364 * self.sy]
+
+        # サイドメニュー　プレイヤーごと
+        self.player_icons = []
+        self.player_names = []
+        self.gauge_areas = []
+        self.hp_frames = []
+        self.hp_bars = []
+        self.mp_frames = []
+        self.mp_bars = []
+        self.action_frames = []
+        self.action_bars = []
+        self.effect_areas = []
+        self.effect_slots = []
+
+        for i in range(4):
+
+            # プレイヤーごとの間隔
+            dy = i * (128+48+24+16)
+
+            self.player_icons.append(self.rect(1008, 256+dy, 128, 128))
+            self.player_names.append(self.pos(1008, 216+dy))
+
+            # ゲージ（枠とバー）
+            self.gauge_areas.append(self.rect(1200, 216+dy, 264, 168))
+            self.hp_frames.append(self.rect(1200, 216+dy, 264, 48))
+            self.hp_bars.append(self.rect(1204, 236+dy, 256, 24))
+            self.mp_frames.append(self.rect(1200, 276+dy, 264, 48))
+            self.mp_bars.append(self.rect(1204, 296+dy, 256, 24))
+            self.action_frames.append(self.rect(1200, 336+dy, 264, 48))
+            self.action_bars.append(self.rect(1204, 356+dy, 256, 24))
+
+            # 状態異常のアイコン（９個まで）
+            self.effect_areas.append(self.rect(1520, 240+dy, 5*(64+8), 2*(64+8)))
+            self.effect_slots.append([self.rect(1520+(j%5)*(64+8), 240+int(j/5)*(64+8)+dy, 64, 64) for j in range(9)])
+
+        # ゲージのバーの最大の長さ
+        self.gauge_width = 256 * self.sx
+
+        # サイドメニュー　アイテム（１ページ２０個）
+        self.items_area = self.rect(1040, 248, 5*(96+72), 4*(96+72))
+        self.item_slots = [self.rect(1056+(i%5)*(96+72), 264+int(i/5)*(96+72), 96, 96) for i in range(20)]
+        self.item_frames = [self.rect(1056+(i%5)*(96+72)-16, 264+int(i/5)*(96+72)-16, 128, 128) for i in range(20)]
+        self.page_area = self.rect(1056, 960, 768, 48)
+        self.page_text = self.pos(1440, 984)
+
+        # 敵　分類ごと（boss / left / right）
+        self.enemy_sprites = {}
+        self.enemy_names = {}
+        self.enemy_hp_bars = {}
+        self.enemy_hp_widths = {}
+
+        for category, x, width, hp_x, hp_width in [["boss", 480, 384, 288, 384], ["left", 372, 192, 276, 192], ["right", 588, 192, 492, 192]]:
+
+            sprite = self.rect(0, 0, width, 384)
+            sprite.center = self.pos(x, 232)
+            self.enemy_sprites[category] = sprite
+
+            self.enemy_names[category] = self.pos(x, 412)
+            self.enemy_hp_bars[category] = self.rect(hp_x, 40, hp_width, 32)
+            self.enemy_hp_widths[category] = hp_width * self.sx
+
+        # 敵HPバー全体
+        self.enemy_hp_area = self.rect(276, 40, 408, 32)
+
+        # 敵の吹き出し　左の敵は右端、それ以外は左端をそろえる
+        self.bubble_left_x = 260
+        self.bubble_right_x = 700
+
+    # 設計座標の矩形を画面の矩形に
+    def rect(self, x, y, w, h):
+        return pygame.Rect(x * self.sx, y * self.sy, w * self.sx, h * self.sy)
+
+    # 設計座標の点を画面の点に
+    def pos(self, x, y):
+        return [x * self.sx, y * self.sy]
+
+    # 盤面上の位置（小数もあり）のマスの左上
+    def board_pos(self, loc):
+        return [self.board_origin[0] + loc[0] * self.cell_pitch[0], self.board_origin[1] + loc[1] * self.cell_pitch[1]]
+
+    # 盤面上の位置（小数もあり）のマスの矩形
+    def board_rect(self, loc):
+        return [self.board_origin[0] + loc[0] * self.cell_pitch[0], self.board_origin[1] + loc[1] * self.cell_pitch[1], self.cell_size[0], self.cell_size[1]]
+
+    # 移動経路の線の点
+    def route_point(self, loc):
+        return [self.board_origin[0] + (40+7) * self.cell_scale * self.sx + loc[0] * self.cell_pitch[0], self.board_origin[1] + (40+7) * self.cell_scale * self.sy + loc[1] * self.cell_pitch[1]]
+
+    # 移動経路の終点の四角
+    def route_end(self, loc):
+        return [self.board_origin[0] + 40 * self.cell_scale * self.sx + loc[0] * self.cell_pitch[0], self.board_origin[1] + 40 * self.cell_scale * self.sy + loc[1] * self.cell_pitch[1], 16 * self.cell_scale * self.sx, 16 * self.cell_scale * self.sy]
+
+    # 画面の点が盤面のマスの並んでいる範囲の中か
+    def on_board(self, px, py):
+        return (self.board_origin[0] <= px < self.board_origin[0] + (board.width-1) * self.cell_pitch[0] + self.cell_size[0]
+                and self.board_origin[1] <= py < self.board_origin[1] + (board.height-1) * self.cell_pitch[1] + self.cell_size[1])
+
+    # 画面の点の上にあるマス [ｘ, ｙ]（マスの外やすき間なら None）
+    # マスを順に調べずに、間隔で割って求める（盤面が大きくても１回の計算）
+    def cell_at(self, px, py):
+
+        x = math.floor((px - self.board_origin[0]) / self.cell_pitch[0])
+        y = math.floor((py - self.board_origin[1]) / self.cell_pitch[1])
+
+        if not board.inside(x, y):
+            return None
+
+        # すき間
+        if px - self.board_origin[0] - x * self.cell_pitch[0] >= self.cell_size[0] or py - self.board_origin[1] - y * self.cell_pitch[1] >= self.cell_size[1]:
+            return None
+
+        return [x, y]
+
+    # 敵の吹き出しの矩形と文字の中心
+    # row は設計座標での吹き出しの上端（こうどうは104、パッシブは168）
+    def bubble(self, category, text_len, row):
+
+        width = 36 + 24 * text_len
+
+        if category == "left":
+            rect = self.rect(self.bubble_left_x - width, row, width, 64)
+            center = self.pos(self.bubble_left_x - width / 2, row + 26)
+        else:
+            rect = self.rect(self.bubble_right_x, row, width, 64)
+            center = self.pos(self.bubble_right_x + width / 2, row + 26)
+
+        return rect, center
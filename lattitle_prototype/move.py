@@ -5,100 +5,180 @@ import pygame
 #from lattitle_main import *
 import lattitle_main as lm
 import colors
+import dirty
+import layout
+import occupancy
+import pathfinding
+import scheduler
+import sim_clock
 
 # ２点の距離
 def dist(x1, x2):
     d = math.sqrt(pow(x2[0]-x1[0], 2)+pow(x2[1]-x1[1], 2))
     return d
 
-# 一マス移動にかかるフレーム
-def speed_time(spd, start, end):
-    return lm.fps * dist(start, end) * 5 * (1/5) ** (spd/100)
 
-# １以上なら１に
-def over_one(num):
-    if num >= 1:
-        return 1.0
-    else:
-        return num
-
-# ０以下なら０に、３以上なら３に
-def in_field(num):
-    if num <= 0:
-        return 0.0
-    elif num >= 3:
-        return 3.0
-    else:
-        return num
+# 移動の区間
+# 経路の１マス分（今の位置から次のマスまで）を、始めた時刻・かかる時間・速度で表す
+# 区間を始めたときと速さが変わったときだけ計算し、位置は経過時間から求める
+class Segment:
+
+    __slots__ = ('origin', 'to', 'start_time', 'duration', 'velocity', 'key')
+
+    # player の今の位置から経路の次のマスまでの区間を time（秒）から始める
+    def __init__(self, player, time):
+
+        # 始めの位置と次のマス
+        self.origin = list(player.cur_location)
+        self.to = player.route[1]
+
+        # 始めた時刻とかかる時間（秒）
+        self.start_time = time
+        self.duration = dist(self.origin, self.to) * seconds_per_cell(player)
+
+        # １秒あたりの移動量
+        if 0 < self.duration < math.inf:
+            self.velocity = [(self.to[0] - self.origin[0]) / self.duration, (self.to[1] - self.origin[1]) / self.duration]
+        else:
+            self.velocity = [0.0, 0.0]
+
+        # 計算に使った速さ（変わったら区間を作り直す）
+        self.key = speed_key(player)
+
+    # 着く時刻
+    def arrival(self):
+        return self.start_time + self.duration
+
+    # 時刻 time の位置
+    def position(self, time):
+
+        elapsed = time - self.start_time
+
+        return [self.origin[0] + self.velocity[0] * elapsed, self.origin[1] + self.velocity[1] * elapsed]
+
+
+# 移動の速さにかかわる値（すばやさと防御中の移動補正）
+def speed_key(player):
+    return (int(player.Spd), player.Def.speed)
+
+
+# １マス進むのにかかる秒数
+# すばやさ100で１秒、防御中は移動補正（％）で遅くなる
+def seconds_per_cell(player):
+
+    if player.Def.speed <= 0:
+        return math.inf
+
+    return 5 * (1/5) ** (int(player.Spd)/100) / (player.Def.speed / 100)
+
+
+# 今のロジックの更新が終わる時刻（秒）
+def tick_end():
+    return (scheduler.current.now + 1) / lm.fps
+
 
 # プレイヤーを経路にそって移動させる
+# 区間の終わりを過ぎたら次のマスにぴったり置き、余った時間は次の区間に回す
 def move(player):
 
+    time = tick_end()
+
     for i in range(len(player)):
 
-        # 移動可能
-        if player[i].can_move == True:
+        # 移動経路がないとき
+        if len(player[i].route) < 2:
+            player[i].segment = None
+            continue
+
+        # 移動不可のときは止まる（動けるようになったら今の位置から区間を作り直す）
+        if player[i].can_move == False:
+            player[i].segment = None
+            continue
+
+        seg = player[i].segment
+
+        # 区間がない、次のマスが変わった、速さが変わったときは、今の位置からこの回の始めの時刻で区間を作り直す
+        if seg is None or seg.to is not player[i].route[1] or seg.key != speed_key(player[i]):
+            seg = Segment(player[i], time - 1/lm.fps)
+
+        # 次のマスに着いた
+        while seg is not None and time >= seg.arrival():
+
+            player[i].cur_location[0] = float(seg.to[0])
+            player[i].cur_location[1] = float(seg.to[1])
+            player[i].route.pop(0)
 
-            # 移動経路があるとき
             if len(player[i].route) >= 2:
+                seg = Segment(player[i], seg.arrival())
+            else:
+                seg = None
+
+        # 移動中
+        if seg is not None:
+            player[i].cur_location[:] = seg.position(time)
+
+        player[i].segment = seg
+
+
+# 今の速さのまま経路を進んだときの ahead 秒後の位置
+# （敵のプランナーが攻撃の発動するときの位置を予想するのに使う）
+def predict(player, ahead):
+
+    position = list(player.cur_location)
+
+    if len(player.route) < 2 or player.can_move == False:
+        return position
+
+    cells = player.route[1:]
+
+    # 今の区間の残り時間
+    if player.segment is not None and player.segment.to is player.route[1]:
+        hop = player.segment.arrival() - tick_end()
+    else:
+        hop = dist(position, cells[0]) * seconds_per_cell(player)
+
+    for k in range(len(cells)):
+
+        if k > 0:
+            hop = dist(cells[k-1], cells[k]) * seconds_per_cell(player)
 
-                # x軸の計算
-                if player[i].route[1][0] > player[i].route[0][0]:
-                    player[i].cur_location[0] += over_one(float(player[i].Def.speed / 100) * (player[i].route[1][0] - player[i].route[0][0]) / speed_time(int(player[i].Spd), player[i].route[0], player[i].route[1]))
-                elif player[i].route[1][0] < player[i].route[0][0]:
-                    player[i].cur_location[0] -= over_one(float(player[i].Def.speed / 100) * (player[i].route[0][0] - player[i].route[1][0]) / speed_time(int(player[i].Spd), player[i].route[0], player[i].route[1]))
-                
-                # y軸の計算
-                if player[i].route[1][1] > player[i].route[0][1]:
-                    player[i].cur_location[1] += over_one(float(player[i].Def.speed / 100) * (player[i].route[1][1] - player[i].route[0][1]) / speed_time(int(player[i].Spd), player[i].route[0], player[i].route[1]))
-                elif player[i].route[1][1] < player[i].route[0][1]:
-                    player[i].cur_location[1] -= over_one(float(player[i].Def.speed / 100) * (player[i].route[0][1] - player[i].route[1][1]) / speed_time(int(player[i].Spd), player[i].route[0], player[i].route[1]))
-
-                # x座標が右行きすぎたら修正
-                if player[i].route[1][0] > player[i].route[0][0] and player[i].cur_location[0] > player[i].route[1][0]:
-                    player[i].cur_location[0] = float(math.floor(player[i].cur_location[0]))
-                    
-                # y座標が下行きすぎたら修正
-                if player[i].route[1][1] > player[i].route[0][1] and player[i].cur_location[1] > player[i].route[1][1]:
-                    player[i].cur_location[1] = float(math.floor(player[i].cur_location[1]))
-
-                # x座標が左行きすぎたら修正
-                if player[i].route[1][0] < player[i].route[0][0] and player[i].cur_location[0] < player[i].route[1][0]:
-                    player[i].cur_location[0] = float(math.ceil(player[i].cur_location[0]))
-                
-                # y座標が上行きすぎたら修正
-                if player[i].route[1][1] < player[i].route[0][1] and player[i].cur_location[1] < player[i].route[1][1]:
-                    player[i].cur_location[1] = float(math.ceil(player[i].cur_location[1]))
-
-                # 場外なら修正
-                player[i].cur_location[0] = in_field(player[i].cur_location[0])
-                player[i].cur_location[1] = in_field(player[i].cur_location[1])
-                
-                # 次の移動先と一致してたら削除
-                if round(player[i].cur_location[0], 2) == player[i].route[1][0] and round(player[i].cur_location[1], 2) == player[i].route[1][1]:
-                    player[i].route.pop(0)
+        # この区間の途中
+        if ahead < hop:
+            rate = ahead / hop
+            return [position[0] + (cells[k][0] - position[0]) * rate, position[1] + (cells[k][1] - position[1]) * rate]
+
+        ahead -= hop
+        position = [float(cells[k][0]), float(cells[k][1])]
+
+    return position
 
 
 # 各プレイヤーの移動経路表示
 def disp_player_route(player):
 
-    resol = lm.resol
+    lay = layout.get()
 
     for i in range(len(player)):
 
+        # 現在地（ロジックの更新の間を補間）
+        location = sim_clock.lerp(player[i].prev_location, player[i].cur_location)
+
         for j in range(len(player[i].route)):
 
             # 現在地から次の場所まで
             if j == 0 and len(player[i].route) >= 2:
-                pygame.draw.line(lm.screen, player[i].color, [(304+player[i].cur_location[0]*(96+16)+7)*resol[0]/1920, (592+player[i].cur_location[1]*(96+16)+7)*resol[1]/1080], [(304+player[i].route[j+1][0]*(96+16)+7)*resol[0]/1920, (592+player[i].route[j+1][1]*(96+16)+7)*resol[1]/1080], int(16*resol[0]/1920))
+                pygame.draw.line(lm.screen, player[i].color, lay.route_point(location), lay.route_point(player[i].route[j+1]), lay.route_width)
             
             # 移動予定経路
             elif j < len(player[i].route)-1:
-                pygame.draw.line(lm.screen, player[i].color, [(304+player[i].route[j][0]*(96+16)+7)*resol[0]/1920, (592+player[i].route[j][1]*(96+16)+7)*resol[1]/1080], [(304+player[i].route[j+1][0]*(96+16)+7)*resol[0]/1920, (592+player[i].route[j+1][1]*(96+16)+7)*resol[1]/1080], int(16*resol[0]/1920))
+                pygame.draw.line(lm.screen, player[i].color, lay.route_point(player[i].route[j]), lay.route_point(player[i].route[j+1]), lay.route_width)
             
             # 終点
             else:
-                pygame.draw.rect(lm.screen, player[i].color, [(304+player[i].route[j][0]*(96+16))*resol[0]/1920, (592+player[i].route[j][1]*(96+16))*resol[1]/1080, 16*resol[0]/1920, 16*resol[1]/1080])
+                pygame.draw.rect(lm.screen, player[i].color, lay.route_end(player[i].route[j]))
+
+    # 差分描画に報告　経路は盤面全体にまたがるので盤面ごと更新
+    dirty.mark('route', lay.board, tuple((tuple(sim_clock.lerp(player[i].prev_location, player[i].cur_location)), tuple(tuple(r) for r in player[i].route)) for i in range(len(player))))
 
 
 # 左クリックを離したとき
@@ -107,8 +187,12 @@ def left_released(player, field_status, start_point, m_line):
     # 終点を設定
     end_point = m_line[len(m_line)-1]
 
-    # 移動先にプレイヤーがいない（障害物などの判定も追加？）
-    if field_status[end_point[1]][end_point[0]].player_exists == False:
+    # 途中でほかのプレイヤーのマスを通る経路は、よけて通る最短経路に直す
+    if not pathfinding.clear_route(field_status, m_line):
+        m_line = pathfinding.route(field_status, start_point, end_point)
+
+    # 移動先にプレイヤーがいない　かつ　経路がある
+    if m_line and field_status[end_point[1]][end_point[0]].player_exists == False:
         # 目的地が始点のやつを探して目的地を終点に設定
         for i in range(len(player)):
             if player[i].destination == start_point and player[i].alive == True:
@@ -122,21 +206,41 @@ def left_released(player, field_status, start_point, m_line):
 
 
 # 始点が存在するなら
+# 移動予定経路のマス（occupancy.bit をまとめたマスク）
+# m_line と同じマスを持ち、カーソル位置が経路に含まれるかを AND だけで調べる
+route_cells = 0
+
 def start_exists(start_point, cursor, m_line):
 
+    global route_cells
+
     if start_point:
+        # 新しい経路
+        if not m_line:
+            route_cells = 0
+
+        bit = occupancy.bit(cursor.x, cursor.y)
+
         # カーソル位置が移動経路に含まれていないなら追加
-        if [cursor.x, cursor.y] not in m_line:
+        if route_cells & bit == 0:
             m_line.append([cursor.x, cursor.y])
+            route_cells |= bit
         else: # 到達済みならそれ以降を削除
-            del m_line[m_line.index([cursor.x, cursor.y])+1:]
+            while m_line[-1] != [cursor.x, cursor.y]:
+                last = m_line.pop()
+                route_cells &= ~occupancy.bit(last[0], last[1])
+
+        lay = layout.get()
 
         # 移動予定経路を描画
         for i in range(len(m_line)):
             if i < len(m_line)-1:
-                pygame.draw.line(lm.screen, colors.RED, [(304+m_line[i][0]*(96+16)+7)*lm.resol[0]/1920, (592+m_line[i][1]*(96+16)+7)*lm.resol[1]/1080], [(304+m_line[i+1][0]*(96+16)+7)*lm.resol[0]/1920, (592+m_line[i+1][1]*(96+16)+7)*lm.resol[1]/1080], int(16*lm.resol[0]/1920))
+                pygame.draw.line(lm.screen, colors.RED, lay.route_point(m_line[i]), lay.route_point(m_line[i+1]), lay.route_width)
             else:
-                pygame.draw.rect(lm.screen, colors.RED, [(304+m_line[i][0]*(96+16))*lm.resol[0]/1920, (592+m_line[i][1]*(96+16))*lm.resol[1]/1080, 16*lm.resol[0]/1920, 16*lm.resol[1]/1080])
+                pygame.draw.rect(lm.screen, colors.RED, lay.route_end(m_line[i]))
+
+        # 差分描画に報告
+        dirty.mark('m_line', lay.board, tuple(tuple(m) for m in m_line))
 
     
 
@@ -0,0 +1,139 @@
+import board
+
+
+# 盤面のどこに誰がいるかの索引
+# マス (x, y) を y * board.width + x 番目のビットにして、盤面全体を１つの整数（ビットボード）で表す
+# 敵の攻撃はマスのビットをまとめたマスクにしておき、プレイヤーのいるマスとの AND だけで当たりを調べる
+# （Python の整数は桁数に上限がないので、6*6 や 8*8 の盤面でも同じ）
+
+
+# マスの番号
+def cell(x, y):
+    return y * board.width + x
+
+
+# マスのビット（盤面の外なら 0）
+def bit(x, y):
+
+    if 0 <= x < board.width and 0 <= y < board.height:
+        return 1 << cell(x, y)
+
+    return 0
+
+
+# 攻撃のマスをまとめたマスク
+def mask(points):
+
+    result = 0
+
+    for p in points:
+        result |= bit(p.x, p.y)
+
+    return result
+
+
+# ビットの立っている番号を順に返す
+def indices(bits):
+
+    result = []
+
+    while bits:
+        low = bits & -bits
+        result.append(low.bit_length() - 1)
+        bits ^= low
+
+    return result
+
+
+# 索引
+# プレイヤーの位置は動くたびに変わるので、使われたときに必要なら作り直す
+class Occupancy:
+
+    def __init__(self, player, enemy):
+
+        self.player = player
+
+        # 作り直しが必要か
+        self.stale = True
+
+        # プレイヤーのいるマスのビットボード（当たり判定は現在地を四捨五入したマス）
+        self.board = 0
+
+        # マスごとのプレイヤーのビットマスク（キーはマスの番号、ビットはプレイヤーの番号）
+        self.players = {}
+
+        # 列ごとに攻撃が当たる敵の番号（hit_box から作る）
+        # hit_box は設計の盤面の列なので、今の盤面の列に広げる
+        self.columns = [[] for x in range(board.width)]
+
+        for i in range(len(enemy)):
+            for x in range(board.width):
+                if board.design_column(x) in enemy[i].hit_box:
+                    self.columns[x].append(i)
+
+    # プレイヤーが動いたので作り直しが必要（ロジックの更新ごとに移動の後で呼ぶ）
+    def invalidate(self):
+        self.stale = True
+
+    # プレイヤーの位置から作り直す
+    def update(self):
+
+        player = self.player
+
+        self.board = 0
+        self.players = {}
+
+        for i in range(len(player)):
+
+            if player[i].alive == True:
+
+                c = cell(round(player[i].cur_location[0]), round(player[i].cur_location[1]))
+
+                self.board |= 1 << c
+                self.players[c] = self.players.get(c, 0) | (1 << i)
+
+        self.stale = False
+
+    # プレイヤーのいるマスのビットボード
+    def occupied(self):
+
+        if self.stale == True:
+            self.update()
+
+        return self.board
+
+    # マスにいるプレイヤーの番号
+    def players_at(self, x, y):
+
+        if bit(x, y) & self.occupied() == 0:
+            return []
+
+        return indices(self.players[cell(x, y)])
+
+    # 列にいる敵の番号
+    def enemies_at(self, x):
+
+        if 0 <= x < board.width:
+            return self.columns[x]
+
+        return []
+
+
+# 今使っている索引
+current = None
+
+
+# 使う索引を切りかえる
+def use(occupancy):
+
+    global current
+
+    current = occupancy
+
+
+def players_at(x, y):
+    return current.players_at(x, y)
+
+
+def enemies_at(x):
+    return current.enemies_at(x)
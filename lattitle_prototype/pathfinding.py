@@ -0,0 +1,162 @@
+from collections import deque
+
+import board
+import occupancy
+
+
+# 盤面の最短経路
+# 通れないマス（プレイヤーの目的地、危険なマス）の組み合わせごとに、全部のマスからの最短経路の表を１回だけ作っておく
+# 通れないマスはビットボード（occupancy.bit）で表し、表はそのビットボードをキーにして覚えておく
+# プレイヤーが動いて通れないマスが変われば別のキーになるので、古い表を使うことはない
+# 経路を調べるときは表をたどるだけ（経路の長さの分だけ）
+
+# 上下左右
+DIRECTIONS = [[1, 0], [-1, 0], [0, 1], [0, -1]]
+
+# 覚えておく表の数（超えたら全部作り直す）
+MAX_TABLES = 256
+
+# 作った表（キーは（横, 縦, 通れないマス））
+tables = {}
+
+
+# 最短経路の表
+class Path_table:
+
+    def __init__(self, blocked):
+
+        # 通れないマス
+        self.blocked = blocked
+
+        # マスごとのとなりのマスの番号
+        self.neighbours = []
+
+        for c in range(board.width * board.height):
+
+            x = c % board.width
+            y = c // board.width
+
+            self.neighbours.append([occupancy.cell(x + d[0], y + d[1]) for d in DIRECTIONS if board.inside(x + d[0], y + d[1])])
+
+        # parents[始点][マス] はそのマスの１つ前のマス（たどりつけないなら -1）
+        self.parents = [self.search(c) for c in range(board.width * board.height)]
+
+    # 始点から幅優先探索
+    # 通れないマスにも入れるが、その先へは進まない（目的地が通れるかは使う側で調べる）
+    def search(self, source):
+
+        parent = [-1] * len(self.neighbours)
+        parent[source] = source
+
+        queue = deque([source])
+
+        while queue:
+
+            c = queue.popleft()
+
+            for n in self.neighbours[c]:
+
+                if parent[n] == -1:
+
+                    parent[n] = c
+
+                    if self.blocked & (1 << n) == 0:
+                        queue.append(n)
+
+        return parent
+
+    # 始点から終点までのマスのリスト [[ｘ, ｙ], ...]（たどりつけないなら []）
+    def route(self, start, goal):
+
+        s = occupancy.cell(start[0], start[1])
+        c = occupancy.cell(goal[0], goal[1])
+
+        parent = self.parents[s]
+
+        if parent[c] == -1:
+            return []
+
+        result = []
+
+        while c != s:
+            result.append([c % board.width, c // board.width])
+            c = parent[c]
+
+        result.append([start[0], start[1]])
+        result.reverse()
+
+        return result
+
+
+# 通れないマスの表を取得する（なければ作る）
+def table(blocked):
+
+    key = (board.width, board.height, blocked)
+
+    if key not in tables:
+
+        if len(tables) >= MAX_TABLES:
+            clear()
+
+        tables[key] = Path_table(blocked)
+
+    return tables[key]
+
+
+# 作った表を全部捨てる
+def clear():
+    tables.clear()
+
+
+# プレイヤーがいる（移動先にしている）マス
+def blocked_mask(field_status):
+
+    result = 0
+
+    for y in range(len(field_status)):
+        for x in range(len(field_status[y])):
+            if field_status[y][x].player_exists == True:
+                result |= occupancy.bit(x, y)
+
+    return result
+
+
+# 敵の攻撃が表示されているマス
+def hazard_mask(enemy):
+
+    result = 0
+
+    for i in range(len(enemy)):
+        for a in enemy[i].attack:
+            if a.until_disp <= 0:
+                result |= occupancy.bit(a.x, a.y)
+
+    return result
+
+
+# 始点から終点までのプレイヤーをよける最短経路（上下左右の移動）
+# hazards は避けたいマス（危険なマス）で、避けて行けないときは通る
+# 終点にほかのプレイヤーがいる、またはたどりつけないなら []
+def route(field_status, start, goal, hazards=0):
+
+    if list(start) != list(goal) and field_status[goal[1]][goal[0]].player_exists == True:
+        return []
+
+    blocked = blocked_mask(field_status)
+
+    if hazards:
+        result = table(blocked | hazards).route(start, goal)
+        if result:
+            return result
+
+    return table(blocked).route(start, goal)
+
+
+# 経路の途中と終点にほかのプレイヤーがいないか
+def clear_route(field_status, m_line):
+
+    for cell in m_line[1:]:
+        if field_status[cell[1]][cell[0]].player_exists == True:
+            return False
+
+    return True
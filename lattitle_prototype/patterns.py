@@ -0,0 +1,130 @@
+import classes
+import board
+import occupancy
+
+
+# 敵の攻撃パターン
+# こうどうの攻撃範囲は敵のこうどうファイルを読みこむときに１回だけ組み立てておき、
+# こうどうのたびにはランダムに決めた基準のマスに置くだけにする
+# （攻撃のたびにマスごとのリストを作って Enemy_attack に変換しない）
+
+
+# 攻撃パターン
+# cells は基準のマスからのずれ [dx, dy]、または [dx, dy, 時間のずれ]
+# 盤面の大きさで形が変わるもの（縦一列など）は、cells を（横, 縦）からリストを作る関数にする
+# （盤面の大きさごとに１回だけ組み立てる）
+# 時間のずれは予備動作時間と表示までの時間の両方に足す（へびダッシュのように順番に攻撃するとき）
+# sound は最初のマスだけで鳴らす音、effect は追加効果（全部のマスで共有するのでタプルで持つ）
+class Pattern:
+
+    def __init__(self, category, name, power, element, cells, preliminary, sound=None, effect=()):
+
+        # 分類
+        self.category = category
+
+        # 名前
+        self.name = name
+
+        # 威力
+        self.power = power
+
+        # 属性
+        self.element = element
+
+        # 基準のマスからのずれ（リストか関数）
+        self.build = cells
+
+        # 盤面の大きさごとの（ずれ, 時間のずれ）
+        self.compiled = {}
+
+        # 予備動作時間
+        self.preliminary = preliminary
+
+        # 音
+        self.sound = str(sound)
+
+        # 追加効果
+        self.effect = tuple(classes.Buff_Debuff(e) for e in effect)
+
+        # 基準のマスごとのマスク（使ったときに作る）
+        self.masks = {}
+
+        # 今の盤面の大きさで組み立てておく
+        self.shape()
+
+    # 今の盤面の大きさでのマスのずれと時間のずれ
+    def shape(self):
+
+        size = (board.width, board.height)
+
+        if size not in self.compiled:
+
+            cells = self.build(board.width, board.height) if callable(self.build) else self.build
+
+            self.compiled[size] = (tuple((c[0], c[1]) for c in cells), tuple(c[2] if len(c) > 2 else 0 for c in cells))
+
+        return self.compiled[size]
+
+    # 基準のマスに置いたときの盤面内のマス
+    def cells_at(self, ax, ay):
+
+        result = []
+
+        for dx, dy in self.shape()[0]:
+            if board.inside(ax + dx, ay + dy):
+                result.append((ax + dx, ay + dy))
+
+        return result
+
+    # 基準のマスに置いたときのマスク
+    def mask(self, ax, ay):
+
+        key = (board.width, board.height, ax, ay)
+
+        if key not in self.masks:
+
+            m = 0
+            for x, y in self.cells_at(ax, ay):
+                m |= occupancy.bit(x, y)
+
+            self.masks[key] = m
+
+        return self.masks[key]
+
+    # 基準のマスに置いて敵の攻撃のキューに加える
+    # 盤面の外のマスは攻撃しない
+    # delay は全体の時間のずれ（２回攻撃の２回目など）
+    def place(self, enemy, ax, ay, delay=0):
+
+        cells, offsets = self.shape()
+
+        for k in range(len(cells)):
+
+            x = ax + cells[k][0]
+            y = ay + cells[k][1]
+
+            if board.inside(x, y):
+
+                offset = offsets[k] + delay
+
+                enemy.attack.append(classes.Attack_cell(self, x, y, self.preliminary + offset, offset, self.sound if k == 0 else 'None'))
+
+
+# 縦一列（cells にそのまま渡す）
+def column(width, height):
+    return [[0, y] for y in range(height)]
+
+
+# 横一列（cells にそのまま渡す）
+def row(width, height):
+    return [[x, 0] for x in range(width)]
+
+
+# 左上から右下の斜め一列（cells にそのまま渡す）
+def diagonal(width, height):
+    return [[k, k] for k in range(min(width, height))]
+
+
+# 右上から左下の斜め一列（cells にそのまま渡す）
+def anti_diagonal(width, height):
+    return [[min(width, height)-1-k, k] for k in range(min(width, height))]
@@ -0,0 +1,182 @@
+import time
+
+import board
+import move
+import attack
+import magic
+
+
+# 敵のこうどうを選ぶプランナー（使うかどうかは選べる　engine.Battle.planner）
+# 敵のこうどうファイルの candidates が出すこうどうと攻撃する列・位置の候補ごとに、
+# 攻撃が発動する時刻のプレイヤーの予想位置（move.predict）に当たるダメージの見積もりを計算して、一番大きいものを選ぶ
+# ダメージは戦闘と同じ計算式（attack / magic の enemy_base_damage）に乱数の平均をかけたもの
+#
+# １回の判断に使える時間を超えたら、またはどの候補も当たらないなら、今までどおりの重みつきの抽選にする
+# プレイヤー１人へのダメージは、計算式が使う値（位置の列、防御、魔力など）ごとに覚えておき、次の判断からは計算しない
+# （プレイヤーの位置や経路は毎回ちがうので、判断ごとの結果ではなくダメージを覚える）
+
+# １回の判断に使える時間（秒）　ロジックの１回（1/90秒）の間に終わるように
+BUDGET = 0.002
+
+# 乱数（0.85～1.0）の平均
+AVERAGE_ROLL = 0.925
+
+# 覚えておくダメージの数（超えたら全部捨てる）
+MAX_CACHE = 4096
+
+
+class Planner:
+
+    # budget は１回の判断に使える時間（None なら制限なし　結果が実行速度によらない）
+    def __init__(self, budget=BUDGET):
+
+        self.budget = budget
+
+        # ダメージの見積もり（キーは damage_key、残りHPで切る前の値）
+        self.cache = {}
+
+        # 集計（プランナーで選んだ回数、抽選にした回数、時間切れの回数）
+        self.planned = 0
+        self.fallback = 0
+        self.timeout = 0
+
+        # 集計（覚えていたダメージを使った回数、計算した回数）
+        self.hits = 0
+        self.misses = 0
+
+    # 敵のこうどうを選んで実行する
+    # 選べなかったら False（呼ぶ側で重みつきの抽選にする）
+    def choose(self, player, enemy, index):
+
+        start = time.perf_counter()
+
+        module = enemy[index].action_path
+
+        if not hasattr(module, 'candidates'):
+            self.fallback += 1
+            return False
+
+        best, finished = self.search(player, enemy[index], module, start)
+
+        # 時間切れなら途中までの結果は使わずに抽選にする
+        if finished == False:
+            self.timeout += 1
+            self.fallback += 1
+            return False
+
+        if best is None:
+            self.fallback += 1
+            return False
+
+        module.perform(enemy, index, best[0], best[1])
+        self.planned += 1
+
+        return True
+
+    # 候補を順に調べて一番よいもの（[こうどうの名前, 引数]）を探す
+    # 戻り値は（一番よいもの、最後まで調べたか）　当たる候補がなければ一番よいものは None
+    def search(self, player, enemy, module, start):
+
+        # 攻撃が発動するまでの時間ごとのプレイヤーの予想のマスと、マスごとの点数（同じものは１回だけ計算する）
+        predictions = {}
+        scores = {}
+
+        def predicted_cell(i, ahead):
+
+            if (i, ahead) not in predictions:
+                p = move.predict(player[i], ahead)
+                predictions[(i, ahead)] = (round(p[0]), round(p[1]))
+
+            return predictions[(i, ahead)]
+
+        # マスに当たるダメージの見積もり
+        def score_cell(pattern, x, y, ahead):
+
+            key = (id(pattern), x, y, ahead)
+
+            if key not in scores:
+
+                total = 0
+
+                for i in range(len(player)):
+                    if player[i].alive == True and predicted_cell(i, pattern.preliminary + ahead) == (x, y):
+                        total += self.damage(player[i], enemy, pattern, y)
+
+                scores[key] = total
+
+            return scores[key]
+
+        best = None
+        best_score = 0
+
+        # 候補は１つずつ作られるので、次の候補を作る前に時間を調べる
+        generator = module.candidates(enemy, score_cell)
+
+        while True:
+
+            # 時間切れ
+            if self.budget is not None and time.perf_counter() - start > self.budget:
+                return best, False
+
+            candidate = next(generator, None)
+
+            if candidate is None:
+                break
+
+            name, args, placements = candidate
+
+            # この敵が使わないこうどう
+            if name not in enemy.actions:
+                continue
+
+            score = 0
+
+            for pattern, ax, ay, delay in placements:
+
+                cells, offsets = pattern.shape()
+
+                for k in range(len(cells)):
+
+                    x = ax + cells[k][0]
+                    y = ay + cells[k][1]
+
+                    if board.inside(x, y):
+                        score += score_cell(pattern, x, y, offsets[k] + delay)
+
+            if score > best_score:
+                best = [name, args]
+                best_score = score
+
+        return best, True
+
+    # プレイヤー１人に当たったときのダメージの見積もり（残りHPまで）
+    def damage(self, target, enemy, pattern, y):
+
+        key = self.damage_key(target, enemy, pattern, y)
+
+        if key in self.cache:
+            self.hits += 1
+            damage = self.cache[key]
+
+        else:
+            self.misses += 1
+
+            if pattern.category == 'magic':
+                damage = magic.enemy_base_damage(target, enemy, pattern)
+            else:
+                damage = attack.enemy_base_damage(target, enemy, pattern, y)
+
+            if len(self.cache) >= MAX_CACHE:
+                self.cache.clear()
+            self.cache[key] = damage
+
+        return min(damage * AVERAGE_ROLL, max(target.left_HP, 0))
+
+    # ダメージを覚えておくキー（計算式が使う値だけをまとめる）
+    # まほうは両方の残りの魔力を使うので、魔力は10ごとにまとめる（見積もりなので少しずれてもよい）
+    def damage_key(self, target, enemy, pattern, y):
+
+        if pattern.category == 'magic':
+            return (id(pattern), enemy.No, target.No, int(enemy.Mgc.left_MP) // 10, int(target.Mgc.left_MP) // 10)
+
+        return (id(pattern), enemy.No, target.No, y, enemy.Atk, target.Def.valid, target.Def.defense, target.Def.reduce_percent, target.Def.reduce_const)
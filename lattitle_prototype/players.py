@@ -5,6 +5,9 @@ import colors
 import classes
 import fonts
 import images
+import dirty
+import layout
+import sim_clock
 
 import lattitle_main as lm
 
@@ -32,11 +35,16 @@ def player_death(player, field_status):
     for i in range(len(player)):
 
         if player[i].left_HP <= 0 and player[i].alive == True:
-        
-            player[i].route = []
-            field_status[player[i].destination[1]][player[i].destination[0]].player_exists = False
+            kill(player, i, field_status)
+
 
-            player[i].alive = False
+# プレイヤーが倒れる
+def kill(player, i, field_status):
+
+    player[i].route = []
+    field_status[player[i].destination[1]][player[i].destination[0]].player_exists = False
+
+    player[i].alive = False
 
         
 
@@ -44,72 +52,86 @@ def player_death(player, field_status):
 # プレイヤーアイコンを表示
 def disp_player_icon(player):
 
+    lay = layout.get()
+
     # 死んだらグレーにする
     # プレイヤーアイコン表示
     for i in range(len(player)):
-        lm.screen.blit(pygame.transform.scale(player[i].image, [128*lm.resol[0]/1920, 128*lm.resol[1]/1080]), [1008*lm.resol[0]/1920, (256+i*(128+48+24+16))*lm.resol[1]/1080])
+        lm.screen.blit(images.scale(player[i].image, lay.player_icons[i].size), lay.player_icons[i])
 
     
     # プレイヤー名表示
     for i in range(4):
-        name_txt = fonts.name_font.render(player[i].name, True, colors.BLACK)
-        lm.screen.blit(name_txt, name_txt.get_rect(topleft=(1008*lm.resol[0]/1920, (216+i*(128+48+24+16))*lm.resol[1]/1080)))
+        name_txt = fonts.render(fonts.name_font, player[i].name, True, colors.BLACK)
+        lm.screen.blit(name_txt, name_txt.get_rect(topleft=lay.player_names[i]))
 
 
 # プレイヤーを表示
 def disp_player(player, select_player):
 
+    lay = layout.get()
+
     for i in range(len(player)):
 
+        # 現在地のマス（ロジックの更新の間を補間）
+        location = sim_clock.lerp(player[i].prev_location, player[i].cur_location)
+        place = lay.board_pos(location)
+
         # 生存中のプレイヤーを表示
         if player[i].alive == True:
-            lm.screen.blit(pygame.transform.scale(player[i].image, [96*lm.resol[0]/1920, 96*lm.resol[1]/1080]), [(264+player[i].cur_location[0]*(96+16))*lm.resol[0]/1920, (552+player[i].cur_location[1]*(96+16))*lm.resol[1]/1080])
+            lm.screen.blit(images.scale(player[i].image, lay.cell_size), place)
         
         #pygame.draw.rect(lm.screen, player[i].color, [76+int(player[i].cur_location[0]*(72+8)),412+int(player[i].cur_location[1]*(72+8)),72,72])
         # 選択中のプレイヤーをポップアップ
         # (それ用の画像作成　32*32を拡大)
         if select_player == i:
             if player[i].action >= 1000:
-                lm.screen.blit(pygame.transform.scale(images.img_ready, [96*lm.resol[0]/1920, 96*lm.resol[1]/1080]), [(264+player[i].cur_location[0]*(96+16))*lm.resol[0]/1920, (552+player[i].cur_location[1]*(96+16))*lm.resol[1]/1080])
+                lm.screen.blit(images.scale(images.img_ready, lay.cell_size), place)
             else:
-                lm.screen.blit(pygame.transform.scale(images.img_stay, [96*lm.resol[0]/1920, 96*lm.resol[1]/1080]), [(264+player[i].cur_location[0]*(96+16))*lm.resol[0]/1920, (552+player[i].cur_location[1]*(96+16))*lm.resol[1]/1080])
+                lm.screen.blit(images.scale(images.img_stay, lay.cell_size), place)
 
         # 防御時は重ねてプロテクトマーク的なのを表示
         if player[i].Def.valid == True:
-            lm.screen.blit(pygame.transform.scale(images.img_defense, [96*lm.resol[0]/1920, 96*lm.resol[1]/1080]), [(264+player[i].cur_location[0]*(96+16))*lm.resol[0]/1920, (552+player[i].cur_location[1]*(96+16))*lm.resol[1]/1080])
+            lm.screen.blit(images.scale(images.img_defense, lay.cell_size), place)
+
+        # 差分描画に報告
+        dirty.mark(('player', i), lay.board_rect(location), (player[i].alive, select_player == i, player[i].action >= 1000, player[i].Def.valid))
 
 
 # プレイヤーのゲージ類を表示
 def disp_gauge(player):
+
+    lay = layout.get()
+
     # プレイヤーHP表示（仮）
     for i in range(4):
 
-        #lm.screen.blit(pygame.transform.scale(player[i].image, [128*lm.resol[0]/1920, 128*lm.resol[1]/1080]), [1008*lm.resol[0]/1920, (256+i*(128+48+24+16))*lm.resol[1]/1080])
-        lm.screen.blit(pygame.transform.scale(images.img_hp_gauge, [264*lm.resol[0]/1920, 48*lm.resol[1]/1080]), [1200*lm.resol[0]/1920, (216+i*(40+128+48))*lm.resol[1]/1080])
-        #pygame.draw.rect(lm.screen, colors.SILVER, [, 256*lm.resol[0]/1920, 24*lm.resol[1]/1080])
+        lm.screen.blit(images.scale(images.img_hp_gauge, lay.hp_frames[i].size), lay.hp_frames[i])
         
         # HPが半分以上なら緑
         if player[i].disp_HP / player[i].HP >= 0.50:
-            pygame.draw.rect(lm.screen, colors.GREEN, [1204*lm.resol[0]/1920, (236+i*(40+128+48))*lm.resol[1]/1080, 256*(player[i].disp_HP/player[i].HP)*lm.resol[0]/1920, 24*lm.resol[1]/1080])
+            pygame.draw.rect(lm.screen, colors.GREEN, [lay.hp_bars[i].x, lay.hp_bars[i].y, lay.gauge_width*(player[i].disp_HP/player[i].HP), lay.hp_bars[i].height])
         # HPが２割以上半分未満なら黄色
         elif player[i].disp_HP / player[i].HP >= 0.20:
-            pygame.draw.rect(lm.screen, colors.YELLOW, [1204*lm.resol[0]/1920, (236+i*(40+128+48))*lm.resol[1]/1080, 256*(player[i].disp_HP/player[i].HP)*lm.resol[0]/1920, 24*lm.resol[1]/1080])
+            pygame.draw.rect(lm.screen, colors.YELLOW, [lay.hp_bars[i].x, lay.hp_bars[i].y, lay.gauge_width*(player[i].disp_HP/player[i].HP), lay.hp_bars[i].height])
         # HPが２割未満なら赤
         else:
-            pygame.draw.rect(lm.screen, colors.RED, [1204*lm.resol[0]/1920, (236+i*(40+128+48))*lm.resol[1]/1080, 256*(player[i].disp_HP/player[i].HP)*lm.resol[0]/1920, 24*lm.resol[1]/1080])
+            pygame.draw.rect(lm.screen, colors.RED, [lay.hp_bars[i].x, lay.hp_bars[i].y, lay.gauge_width*(player[i].disp_HP/player[i].HP), lay.hp_bars[i].height])
 
 
     # プレイヤー魔力ゲージ表示
     for i in range(4):
-        #pygame.draw.rect(lm.screen, colors.SILVER, [1208*lm.resol[0]/1920, (288+i*(40+128+48))*lm.resol[1]/1080, 256*lm.resol[0]/1920, 24*lm.resol[1]/1080])
-        lm.screen.blit(pygame.transform.scale(images.img_mp_gauge, [264*lm.resol[0]/1920, 48*lm.resol[1]/1080]), [1200*lm.resol[0]/1920, (276+i*(40+128+48))*lm.resol[1]/1080])
-        pygame.draw.rect(lm.screen, colors.BLUEVIOLET, [1204*lm.resol[0]/1920, (296+i*(40+128+48))*lm.resol[1]/1080, 256*(player[i].Mgc.left_MP/player[i].Mgc.MP)*lm.resol[0]/1920, 24*lm.resol[1]/1080])
+        lm.screen.blit(images.scale(images.img_mp_gauge, lay.mp_frames[i].size), lay.mp_frames[i])
+        pygame.draw.rect(lm.screen, colors.BLUEVIOLET, [lay.mp_bars[i].x, lay.mp_bars[i].y, lay.gauge_width*(player[i].Mgc.left_MP/player[i].Mgc.MP), lay.mp_bars[i].height])
 
     # プレイヤー行動ゲージ表示（仮）
     for i in range(4):
-        #pygame.draw.rect(lm.screen, colors.SILVER, [1208*lm.resol[0]/1920, (344+i*(40+128+48))*lm.resol[1]/1080, 256*lm.resol[0]/1920, 24*lm.resol[1]/1080])
-        lm.screen.blit(pygame.transform.scale(images.img_action_gauge, [264*lm.resol[0]/1920, 48*lm.resol[1]/1080]), [1200*lm.resol[0]/1920, (336+i*(40+128+48))*lm.resol[1]/1080])
-        pygame.draw.rect(lm.screen, colors.YELLOW, [1204*lm.resol[0]/1920, (356+i*(40+128+48))*lm.resol[1]/1080, 256*(player[i].action/1000)*lm.resol[0]/1920, 24*lm.resol[1]/1080])
+        lm.screen.blit(images.scale(images.img_action_gauge, lay.action_frames[i].size), lay.action_frames[i])
+        pygame.draw.rect(lm.screen, colors.YELLOW, [lay.action_bars[i].x, lay.action_bars[i].y, lay.gauge_width*(player[i].action/1000), lay.action_bars[i].height])
+
+    # 差分描画に報告　ゲージの長さ（ピクセル）が変わったときだけ更新
+    for i in range(4):
+        dirty.mark(('gauge', i), lay.gauge_areas[i], (int(lay.gauge_width*(player[i].disp_HP/player[i].HP)), int(lay.gauge_width*(player[i].Mgc.left_MP/player[i].Mgc.MP)), int(lay.gauge_width*(player[i].action/1000))))
 
 
 # 今回のプレイヤーを追加
@@ -128,69 +150,39 @@ def player_choice(player, player_data, current_player, field_status):
 
             # 現在地と目的地初期化
             player[i].cur_location = [float(i), float(i)]
+            player[i].prev_location = [float(i), float(i)]
             player[i].destination = [i, i]
             
             # 移動経路配列
             player[i].route = []
             field_status[i][i].player_exists = True
-            
-            # プレイヤー画像
-            player[i].image = pygame.image.load("./data_list/players/" + player[i].No + "/images/" + player[i].img)
-            
-
-# MPの自動回復
-def MP_heal(player):
-
-    for i in range(len(player)):
-        
-        if player[i].Mgc.recover > 0:
-
-            if player[i].Mgc.left_MP + player[i].Mgc.recover * 1/lm.fps <= player[i].Mgc.MP:
 
-                player[i].Mgc.left_MP += player[i].Mgc.recover * 1/lm.fps
 
-            else:
-
-                player[i].Mgc.left_MP = player[i].Mgc.MP
-
-
-# HPをゆっくり変動させる
-def HP_fluct(player):
+# プレイヤー画像を読みこむ（表示するときだけ）
+def load_images(player):
 
     for i in range(len(player)):
-        
-        if player[i].left_HP > player[i].disp_HP:
-            player[i].disp_HP += (player[i].left_HP - player[i].disp_HP) / lm.fps
+        player[i].image = images.get("players/" + player[i].No + "/images/" + player[i].img)
 
-        if player[i].left_HP > player[i].disp_HP:
-            player[i].disp_HP += (player[i].left_HP - player[i].disp_HP) / lm.fps
 
-        if player[i].left_HP > player[i].disp_HP:
-            player[i].disp_HP += (player[i].left_HP - player[i].disp_HP) / lm.fps
+# ロジックの更新前の現在地を保存（描画の補間用）
+def save_location(player):
 
-        if player[i].left_HP > player[i].disp_HP:
-            player[i].disp_HP += (player[i].left_HP - player[i].disp_HP) / lm.fps
+    for i in range(len(player)):
+        player[i].prev_location = list(player[i].cur_location)
 
-        if player[i].left_HP > player[i].disp_HP:
-            player[i].disp_HP += (player[i].left_HP - player[i].disp_HP) / lm.fps
 
+# MPの自動回復
+def MP_heal(player):
 
+    for i in range(len(player)):
         
-        if player[i].left_HP < player[i].disp_HP:
-            player[i].disp_HP -= (player[i].disp_HP - player[i].left_HP) / lm.fps
-
-        if player[i].left_HP < player[i].disp_HP:
-            player[i].disp_HP -= (player[i].disp_HP - player[i].left_HP) / lm.fps
-
-        if player[i].left_HP < player[i].disp_HP:
-            player[i].disp_HP -= (player[i].disp_HP - player[i].left_HP) / lm.fps
+        if player[i].Mgc.recover > 0:
 
-        if player[i].left_HP < player[i].disp_HP:
-            player[i].disp_HP -= (player[i].disp_HP - player[i].left_HP) / lm.fps
+            if player[i].Mgc.left_MP + player[i].Mgc.recover * 1/lm.fps <= player[i].Mgc.MP:
 
-        if player[i].left_HP < player[i].disp_HP:
-            player[i].disp_HP -= (player[i].disp_HP - player[i].left_HP) / lm.fps
+                player[i].Mgc.left_MP += player[i].Mgc.recover * 1/lm.fps
 
+            else:
 
-        if abs(player[i].left_HP - player[i].disp_HP) < 1:
-            player[i].disp_HP = player[i].left_HP
\ No newline at end of file
+                player[i].Mgc.left_MP = player[i].Mgc.MP
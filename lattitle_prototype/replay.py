@@ -0,0 +1,110 @@
+import json
+
+import pygame
+
+
+# 入力の記録と再生
+# main が使う入力（マウスの位置とボタン、クリック・キー・終了のイベント）と
+# フレームごとのロジックの回数、戦闘の乱数の種を記録する
+# 同じ記録を再生すれば同じ結果になる
+
+# 記録するイベント
+EVENT_TYPES = [pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN]
+
+
+# イベントを記録用のリストに
+def pack_event(event):
+
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        return [event.type, event.pos[0], event.pos[1], event.button]
+    if event.type == pygame.KEYDOWN:
+        return [event.type, event.key]
+    return [event.type]
+
+
+# 記録用のリストをイベントに
+def unpack_event(data):
+
+    if data[0] == pygame.MOUSEBUTTONDOWN:
+        return pygame.event.Event(data[0], pos=(data[1], data[2]), button=data[3])
+    if data[0] == pygame.KEYDOWN:
+        return pygame.event.Event(data[0], key=data[1])
+    return pygame.event.Event(data[0])
+
+
+# 記録
+# フレームは [ロジックの回数, マウスｘ, マウスｙ, ボタン（左1 中2 右4）, イベント] で、
+# 同じフレームが続いたら [続いた数, フレーム] にまとめる
+class Recorder:
+
+    def __init__(self, path, seed):
+        self.path = path
+        self.seed = seed
+        self.frames = []
+
+    # フレームの入力を記録
+    def frame(self, steps, pos, pressed, events):
+
+        buttons = (1 if pressed[0] else 0) + (2 if pressed[1] else 0) + (4 if pressed[2] else 0)
+        data = [steps, pos[0], pos[1], buttons, [pack_event(e) for e in events if e.type in EVENT_TYPES]]
+
+        if self.frames and self.frames[-1][1] == data:
+            self.frames[-1][0] += 1
+        else:
+            self.frames.append([1, data])
+
+    # ファイルに保存
+    def save(self):
+
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"seed": self.seed, "frames": self.frames}, f, separators=(',', ':'))
+
+
+# 再生
+class Replayer:
+
+    def __init__(self, path):
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.seed = data["seed"]
+        self.frames = data["frames"]
+
+        # 今のまとまりと、その中で何フレーム目か
+        self.index = 0
+        self.count = 0
+
+        # 今のフレーム
+        self.current = None
+
+    # 次のフレームへ進む（記録が終わったら False）
+    def next_frame(self):
+
+        if self.index >= len(self.frames):
+            return False
+
+        self.current = self.frames[self.index][1]
+        self.count += 1
+
+        if self.count >= self.frames[self.index][0]:
+            self.index += 1
+            self.count = 0
+
+        return True
+
+    # 今のフレームのロジックの回数
+    def steps(self):
+        return self.current[0]
+
+    # 今のフレームのマウスの位置
+    def mouse_pos(self):
+        return (self.current[1], self.current[2])
+
+    # 今のフレームのマウスのボタン
+    def mouse_pressed(self):
+        return (self.current[3] & 1 != 0, self.current[3] & 2 != 0, self.current[3] & 4 != 0)
+
+    # 今のフレームのイベント
+    def events(self):
+        return [unpack_event(e) for e in self.current[4]]
@@ -0,0 +1,34 @@
+import random
+
+
+# 乱数
+# ゲームの乱数はすべてここを通す（ダメージの乱数、状態異常の解除、敵のこうどう、表示のばらつき）
+# 戦闘ごとに種を決めた乱数を持たせて、同じ種と同じ入力なら同じ結果になるようにする
+
+# 今使っている乱数
+current = random.Random()
+
+
+# 種から乱数を作る（None なら毎回ちがう）
+def new(seed=None):
+    return random.Random(seed)
+
+
+# 使う乱数を切りかえる
+def use(stream):
+
+    global current
+
+    current = stream
+
+
+def randrange(*args):
+    return current.randrange(*args)
+
+
+def choices(population, weights=None, k=1):
+    return current.choices(population, weights=weights, k=k)
+
+
+def sample(population, k):
+    return current.sample(population, k)
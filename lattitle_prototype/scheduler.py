@@ -0,0 +1,103 @@
+import heapq
+import math
+
+import lattitle_main as lm
+
+
+# 時間で起きるできごとの予定表
+# 敵の攻撃の発動、攻撃予定の表示、状態異常の効果と終了、チャージの完了を
+# 起きる時刻（ロジックの回数）の順にヒープに入れておき、時刻が来たものだけを実行する
+# 待っている予定がいくつあっても、ロジック１回の処理は起きた予定の数だけになる
+
+# 丸めの誤差
+EPSILON = 1e-9
+
+
+# 予定
+class Event:
+
+    def __init__(self, due, callback, args):
+
+        # 実行する時刻
+        self.due = due
+
+        # 実行する関数と引数
+        self.callback = callback
+        self.args = args
+
+        # 取り消されたか
+        self.cancelled = False
+
+
+# 予定表
+class Scheduler:
+
+    def __init__(self):
+
+        # 今の時刻（進めたロジックの回数）
+        self.now = 0
+
+        # （時刻, 登録順, 予定）のヒープ
+        self.queue = []
+
+        # 同じ時刻の予定は登録順に実行する
+        self.order = 0
+
+    # 秒数をロジックの回数に（経過した回に実行する）
+    def steps(self, seconds):
+        return max(0, math.ceil(seconds * lm.fps - EPSILON))
+
+    # seconds 秒後に callback(*args) を実行する
+    def add(self, seconds, callback, *args):
+
+        event = Event(self.now + self.steps(seconds), callback, args)
+
+        heapq.heappush(self.queue, (event.due, self.order, event))
+        self.order += 1
+
+        return event
+
+    # 予定を取り消す
+    def cancel(self, event):
+        event.cancelled = True
+
+    # 予定までの残り秒数
+    def left(self, event):
+        return (event.due - self.now) / lm.fps
+
+    # 時刻を１回進めて、時刻が来た予定を実行する
+    # 実行中に追加された予定も、時刻が来ていればこの回に実行する
+    def run(self):
+
+        self.now += 1
+
+        while self.queue and self.queue[0][0] <= self.now:
+
+            event = heapq.heappop(self.queue)[2]
+
+            if event.cancelled == False:
+                event.callback(*event.args)
+
+
+# 今使っている予定表
+current = Scheduler()
+
+
+# 使う予定表を切りかえる
+def use(scheduler):
+
+    global current
+
+    current = scheduler
+
+
+def add(seconds, callback, *args):
+    return current.add(seconds, callback, *args)
+
+
+def cancel(event):
+    current.cancel(event)
+
+
+def left(event):
+    return current.left(event)
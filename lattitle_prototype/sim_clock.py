@@ -0,0 +1,72 @@
+import time
+
+import lattitle_main as lm
+
+
+# ゲームの時間
+# 実際に経過した時間から、ロジックを決まった間隔（1/lm.fps 秒）ずつ進める
+# 描画のフレームレートが下がってもゲームの進み方は変わらない
+
+# まだ進めていない時間（秒）
+accumulator = 0.0
+
+# 前回測った時刻
+last_time = None
+
+# 最後のロジックの更新からどれだけ進んでいるか（0～1　描画の補間に使う）
+alpha = 0.0
+
+# １フレームで進める時間の上限（止まっていたときにまとめて進めすぎないように）
+MAX_FRAME_TIME = 0.25
+
+# 浮動小数点の誤差を許す量
+EPSILON = 1e-9
+
+
+# 時間をリセット
+# 画面を切り替えたときなど、それまでの経過時間を捨てる
+def reset():
+
+    global accumulator
+    global last_time
+    global alpha
+
+    accumulator = 0.0
+    last_time = time.perf_counter()
+    alpha = 0.0
+
+
+# 経過時間を測って、今回のフレームでロジックを何回進めるかを返す
+def advance():
+
+    global accumulator
+    global last_time
+    global alpha
+
+    now = time.perf_counter()
+
+    if last_time is None:
+        last_time = now
+
+    accumulator += min(now - last_time, MAX_FRAME_TIME)
+    last_time = now
+
+    step = 1 / lm.fps
+    steps = 0
+
+    while accumulator >= step - EPSILON:
+        accumulator -= step
+        steps += 1
+
+    if accumulator < 0:
+        accumulator = 0.0
+
+    alpha = accumulator / step
+
+    return steps
+
+
+# 前回の位置と今回の位置の間を補間する
+def lerp(prev, cur):
+
+    return [prev[0] + (cur[0] - prev[0]) * alpha, prev[1] + (cur[1] - prev[1]) * alpha]
@@ -0,0 +1,149 @@
+import numpy as np
+
+import lattitle_main as lm
+
+import classes
+import defense
+
+
+# 数値をまとめて NumPy の配列で持つ（構造体の配列ではなく配列の構造体）
+# 敵が何十体もいる戦闘や一括シミュレーション用で、使うかどうかは選べる（engine.Battle.use_store）
+# 使うときは Player / Enemy をこの配列を読み書きする view に置きかえ、
+# 毎回のロジックの MP・行動ゲージの更新と死亡判定を配列の演算１回ずつで行う
+
+# 配列で持つ値（Player / Enemy の属性）
+FIELDS = ['HP', 'left_HP', 'action', 'Itg', 'Itg_Spd', 'cool_down', 'alive']
+
+# 配列で持つ値（Magic の属性）
+MAGIC_FIELDS = ['MP', 'left_MP', 'recover']
+
+# 持っていない値の初期値（敵の Itg_Spd、プレイヤーの cool_down）
+DEFAULTS = {'Itg_Spd': 100, 'cool_down': 0}
+
+
+# 配列の値を読み書きする属性
+def column(name):
+
+    def get(self):
+        return getattr(self.store, name).item(self.index)
+
+    def set(self, value):
+        getattr(self.store, name)[self.index] = value
+
+    return property(get, set)
+
+
+# base を元に、fields の値を配列から読み書きするクラスを作る
+def view_class(base, fields):
+
+    attrs = {'__slots__': ('store', 'index')}
+
+    for name in fields:
+        attrs[name] = column(name)
+
+    return type(base.__name__ + '_view', (base,), attrs)
+
+
+Player_view = view_class(classes.Player, FIELDS)
+Enemy_view = view_class(classes.Enemy, FIELDS)
+Magic_view = view_class(classes.Magic, MAGIC_FIELDS)
+
+
+# 元のオブジェクトの値を view に写す
+def copy_to_view(entity, view_cls, store, index, skip):
+
+    view = view_cls.__new__(view_cls)
+    view.store = store
+    view.index = index
+
+    for cls in type(entity).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if name not in skip and hasattr(entity, name):
+                setattr(view, name, getattr(entity, name))
+
+    return view
+
+
+# 数値の配列
+class Entity_store:
+
+    def __init__(self, entities):
+
+        self.count = len(entities)
+
+        for name in FIELDS:
+            if name == 'alive':
+                setattr(self, name, np.array([e.alive for e in entities], dtype=bool))
+            else:
+                setattr(self, name, np.array([getattr(e, name, DEFAULTS.get(name, 0)) for e in entities], dtype=float))
+
+        for name in MAGIC_FIELDS:
+            setattr(self, name, np.array([getattr(e.Mgc, name) for e in entities], dtype=float))
+
+    # MPの自動回復
+    def MP_heal(self):
+
+        heal = np.minimum(self.left_MP + self.recover / lm.fps, self.MP)
+        np.copyto(self.left_MP, heal, where=self.recover > 0)
+
+    # 行動ゲージが１回でたまる量
+    def charge_rate(self):
+        return 1000 / (lm.fps * 20 * (1/2) ** (self.Itg / 100))
+
+    # プレイヤー行動ゲージチャージ（action.player_action_chaege と同じ）
+    def player_charge(self, player):
+
+        rate = self.charge_rate()
+
+        # 移動中は溜まりにくい
+        moving = np.array([len(p.route) >= 2 for p in player], dtype=bool)
+        rate = np.where(moving, rate * (self.Itg_Spd / 100), rate)
+
+        # 行動ゲージがたまってない　かつ　生存中
+        charging = (self.action < 1000) & self.alive
+        self.action[charging] += rate[charging]
+
+        # 防御が終了
+        for i in np.flatnonzero(~charging):
+            defense.defense_reset(player, i)
+
+    # 敵行動ゲージチャージ（action.enemy_action_charge と同じ）
+    def enemy_charge(self):
+
+        rate = self.charge_rate()
+
+        charging = self.action < 1000
+        cooling = charging & (self.cool_down > 0)
+        ready = charging & (self.cool_down <= 0)
+
+        # 行動後は行動ゲージが溜まるのが遅い
+        self.action[cooling] += rate[cooling] / 10
+        self.cool_down[cooling] -= 1 / lm.fps
+
+        self.action[ready] += rate[ready]
+
+    # HPが０以下になった番号
+    def dying(self):
+        return np.flatnonzero((self.left_HP <= 0) & self.alive)
+
+
+# プレイヤーまたは敵のリストを配列を使う view に置きかえる
+# 戻り値は配列
+def attach(entities):
+
+    store = Entity_store(entities)
+
+    for i in range(len(entities)):
+
+        entity = entities[i]
+
+        if entity.role == 'player':
+            view = copy_to_view(entity, Player_view, store, i, FIELDS)
+        else:
+            view = copy_to_view(entity, Enemy_view, store, i, FIELDS)
+
+        view.Mgc = copy_to_view(entity.Mgc, Magic_view, store, i, MAGIC_FIELDS)
+
+        entities[i] = view
+
+    return store
@@ -0,0 +1,110 @@
+import math
+
+
+# 表示用の値の動き（トゥイーン）
+# 始めの値・目標の値・始めた時刻・動き方（イージング）を覚えておき、使うときにその時刻の値を式で求める
+# 毎回のロジックで少しずつ近づける処理がいらず、止まっている値は何も計算しない
+# 時刻はゲームの時間（秒）なので、lm.fps や描画のフレームレートを変えても同じ動きになる
+
+# 表示用HPが残りHPに近づく速さ（１秒で差が e**-DECAY 倍になる）
+DECAY = 5
+
+# 差がこれより小さくなったら目標の値にそろえて止める
+SNAP = 1
+
+
+# 今のゲームの時刻（秒）
+# 戦闘の予定表の時刻を使う（戦闘が始まる前は０）
+# classes が import するので、lattitle_main（ほぼ全部のモジュールを import する）はここで読む
+def now():
+
+    import scheduler
+    import lattitle_main as lm
+
+    if scheduler.current is None:
+        return 0.0
+
+    return scheduler.current.now / lm.fps
+
+
+# イージング
+# elapsed は始めてからの秒数、duration は全体の秒数で、戻り値は進み具合（0～1）
+
+# 一定の速さ
+def linear(elapsed, duration):
+    return elapsed / duration
+
+
+# 目標に近いほどゆっくり（差が指数的に縮む）
+def approach(elapsed, duration):
+    return 1 - math.exp(-DECAY * elapsed)
+
+
+# 値の動き
+class Tween:
+
+    __slots__ = ('start', 'target', 'start_time', 'duration', 'easing')
+
+    # value で止まっている状態から始める
+    def __init__(self, value):
+        self.rest(value)
+
+    # value で止める
+    def rest(self, value):
+
+        self.start = value
+        self.target = value
+        self.start_time = 0.0
+        self.duration = 0.0
+        self.easing = linear
+
+    # 今の値から target に向かって動き始める
+    def to(self, target, time, duration, easing):
+
+        self.start = self.value(time)
+        self.target = target
+        self.start_time = time
+        self.duration = duration
+        self.easing = easing
+
+    # 時刻 time での値
+    def value(self, time):
+
+        elapsed = time - self.start_time
+
+        if elapsed >= self.duration:
+            return self.target
+
+        return self.start + (self.target - self.start) * self.easing(elapsed, self.duration)
+
+
+# 値を target に近づける（表示用HPなど）
+# target が変わっていたら今の値から動き直す
+# 差が SNAP 未満になる時刻で止まる
+def follow(tw, target):
+
+    time = now()
+
+    if target != tw.target:
+
+        diff = abs(target - tw.value(time))
+
+        if diff > SNAP:
+            tw.to(target, time, math.log(diff / SNAP) / DECAY, approach)
+        else:
+            tw.rest(target)
+
+    return tw.value(time)
+
+
+# ポップアップの動き
+# remaining は残りの表示時間（秒）で、戻り値は縦のずれ
+
+# 上に流れる（回復）
+def float_up(remaining):
+    return -10 * (1 - remaining)
+
+
+# 揺れながら止まる（ダメージとミス）
+def shake(remaining):
+    return 10 * remaining * math.sin(10 * math.pi * (1 - remaining))